@@ -3,7 +3,8 @@ from django.utils.html import format_html
 from django.utils import timezone
 from .models import (
     AdminPreference, AdminActivity, AdminTask, 
-    SystemConfig, AuditLog, SecurityEvent
+    SystemConfig, AuditLog, SecurityEvent,
+    DailyUserStats, DailyBookingStats, DailyVenueBookingStats, DailyCategoryBookingStats
 )
 
 
@@ -152,3 +153,33 @@ class SecurityEventAdmin(admin.ModelAdmin):
             event.resolve(request.user, notes='Resolved in bulk by admin')
         self.message_user(request, f"{queryset.filter(is_resolved=False).count()} events marked as resolved.")
     mark_as_resolved.short_description = "Mark selected events as resolved"
+
+
+@admin.register(DailyUserStats)
+class DailyUserStatsAdmin(admin.ModelAdmin):
+    list_display = ('date', 'new_users')
+    date_hierarchy = 'date'
+
+
+@admin.register(DailyBookingStats)
+class DailyBookingStatsAdmin(admin.ModelAdmin):
+    list_display = ('date', 'status', 'booking_count', 'revenue')
+    list_filter = ('status',)
+    date_hierarchy = 'date'
+
+
+@admin.register(DailyVenueBookingStats)
+class DailyVenueBookingStatsAdmin(admin.ModelAdmin):
+    list_display = ('date', 'venue', 'status', 'booking_count', 'revenue')
+    list_filter = ('status',)
+    search_fields = ('venue__name',)
+    list_select_related = ('venue',)
+    date_hierarchy = 'date'
+
+
+@admin.register(DailyCategoryBookingStats)
+class DailyCategoryBookingStatsAdmin(admin.ModelAdmin):
+    list_display = ('date', 'category', 'status', 'booking_count', 'revenue')
+    list_filter = ('status', 'category')
+    list_select_related = ('category',)
+    date_hierarchy = 'date'
@@ -1,20 +1,28 @@
-from .utils import get_admin_preference, get_unresolved_security_events, get_unresolved_security_events_count
+from utils.context import lazy_request_value
+from .utils import get_cached_admin_preference, get_security_event_summary
 
 def admin_context(request):
     """
     Context processor for admin app
     
-    Adds admin-related context variables to all templates
+    Adds admin-related context variables to all templates. Values are only
+    computed when a template uses them, from briefly cached entries.
     """
     context = {}
     
     # Only add admin context if user is authenticated and is staff/superuser
     if request.user.is_authenticated and (request.user.is_staff or request.user.is_superuser):
         # Add admin preferences
-        context['preference'] = get_admin_preference(request.user)
+        context['preference'] = lazy_request_value(
+            request, 'preference', lambda: get_cached_admin_preference(request.user)
+        )
         
         # Add unresolved security events
-        context['unresolved_security_events'] = get_unresolved_security_events()
-        context['unresolved_security_events_count'] = get_unresolved_security_events_count()
+        context['unresolved_security_events'] = lazy_request_value(
+            request, 'unresolved_security_events', lambda: get_security_event_summary()['events']
+        )
+        context['unresolved_security_events_count'] = lazy_request_value(
+            request, 'unresolved_security_events_count', lambda: get_security_event_summary()['count']
+        )
     
     return context
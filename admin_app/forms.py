@@ -281,6 +281,7 @@ class BulkUserActionForm(forms.Form):
         ('remove_staff', 'Remove Staff Status'),
         ('add_to_group', 'Add to Group'),
         ('remove_from_group', 'Remove from Group'),
+        ('delete', 'Delete Selected Users'),
     ]
     
     action = forms.ChoiceField(
@@ -0,0 +1,68 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.core.management.base import BaseCommand, CommandError
+
+from admin_app.forms import BulkUserActionForm
+from admin_app.utils import run_bulk_user_action, BULK_USER_ACTION_BATCH_SIZE
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Apply a bulk user action (e.g. deactivate or delete) to many users, reporting progress per batch'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'action',
+            choices=[choice for choice, _ in BulkUserActionForm.ACTION_CHOICES],
+            help='Action to apply'
+        )
+        parser.add_argument(
+            '--admin',
+            required=True,
+            help='Email of the admin the action is recorded for'
+        )
+        parser.add_argument(
+            '--ids-file',
+            required=True,
+            help='Path to a file with one user ID per line'
+        )
+        parser.add_argument(
+            '--group',
+            help='Group name for add_to_group and remove_from_group'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=BULK_USER_ACTION_BATCH_SIZE,
+            help='Number of users changed per transaction'
+        )
+
+    def handle(self, *args, **options):
+        action = options['action']
+
+        try:
+            admin_user = User.objects.get(email=options['admin'], is_staff=True)
+        except User.DoesNotExist:
+            raise CommandError(f"No staff user with email {options['admin']}")
+
+        group = None
+        if action in ('add_to_group', 'remove_from_group'):
+            if not options['group']:
+                raise CommandError('--group is required for group actions')
+            try:
+                group = Group.objects.get(name=options['group'])
+            except Group.DoesNotExist:
+                raise CommandError(f"Group not found: {options['group']}")
+
+        with open(options['ids_file'], 'r', encoding='utf-8') as f:
+            user_ids = [int(line) for line in f if line.strip().isdigit()]
+
+        def report_progress(processed, total):
+            self.stdout.write(f'Processed {processed} of {total} users...')
+
+        count = run_bulk_user_action(
+            action, user_ids, admin_user, group=group,
+            batch_size=options['batch_size'], progress=report_progress
+        )
+        self.stdout.write(self.style.SUCCESS(f'Applied {action} to {count} users'))
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from admin_app.utils import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the daily analytics rollups (new users, bookings and revenue by status, venue and category)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of rollup rows to insert per query'
+        )
+
+    def handle(self, *args, **options):
+        written = rebuild_rollups(batch_size=options['batch_size'])
+
+        for table, count in written.items():
+            self.stdout.write(f'{table}: {count} rows')
+        self.stdout.write(self.style.SUCCESS('Rebuilt daily analytics rollups'))
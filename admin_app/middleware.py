@@ -0,0 +1,18 @@
+from .utils import audit_log_batch
+
+
+class AuditLogMiddleware:
+    """
+    Middleware to write audit logs in one batch per request
+
+    Audit log entries created while handling the request are collected as their
+    transactions commit and inserted together with a single query once the response
+    is ready, instead of one insert per model save.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with audit_log_batch(request):
+            response = self.get_response(request)
+        return response
@@ -0,0 +1,133 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:47
+
+from collections import defaultdict
+from decimal import Decimal
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+
+
+def populate_rollups(apps, schema_editor):
+    User = apps.get_model(settings.AUTH_USER_MODEL)
+    Booking = apps.get_model('booking_cart_app', 'Booking')
+    DailyUserStats = apps.get_model('admin_app', 'DailyUserStats')
+    DailyBookingStats = apps.get_model('admin_app', 'DailyBookingStats')
+    DailyVenueBookingStats = apps.get_model('admin_app', 'DailyVenueBookingStats')
+    DailyCategoryBookingStats = apps.get_model('admin_app', 'DailyCategoryBookingStats')
+
+    DailyUserStats.objects.bulk_create([
+        DailyUserStats(date=row['day'], new_users=row['count'])
+        for row in User.objects.annotate(day=TruncDate('date_joined')).values('day').annotate(
+            count=Count('id')
+        ).order_by()
+    ], batch_size=1000)
+
+    platform = defaultdict(lambda: [0, Decimal('0')])
+    categories = defaultdict(lambda: [0, Decimal('0')])
+    venue_rows = []
+    rows = Booking.objects.annotate(day=TruncDate('booking_date')).values(
+        'day', 'status', 'venue_id', 'venue__category_id'
+    ).annotate(count=Count('id'), revenue=Sum('total_price')).order_by()
+    for row in rows:
+        revenue = row['revenue'] or Decimal('0')
+        venue_rows.append(DailyVenueBookingStats(
+            date=row['day'], status=row['status'], venue_id=row['venue_id'],
+            booking_count=row['count'], revenue=revenue
+        ))
+        totals = [platform[(row['day'], row['status'])]]
+        if row['venue__category_id']:
+            totals.append(categories[(row['day'], row['status'], row['venue__category_id'])])
+        for total in totals:
+            total[0] += row['count']
+            total[1] += revenue
+
+    DailyVenueBookingStats.objects.bulk_create(venue_rows, batch_size=1000)
+    DailyBookingStats.objects.bulk_create([
+        DailyBookingStats(date=date, status=status, booking_count=count, revenue=revenue)
+        for (date, status), (count, revenue) in platform.items()
+    ], batch_size=1000)
+    DailyCategoryBookingStats.objects.bulk_create([
+        DailyCategoryBookingStats(
+            date=date, status=status, category_id=category_id, booking_count=count, revenue=revenue
+        )
+        for (date, status, category_id), (count, revenue) in categories.items()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('admin_app', '0001_initial'),
+        ('venues_app', '0003_venue_lat_lng_index'),
+        ('booking_cart_app', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyUserStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(unique=True)),
+                ('new_users', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name_plural': 'Daily user stats',
+                'ordering': ['date'],
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyBookingStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('status', models.CharField(max_length=20)),
+                ('booking_count', models.IntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+            ],
+            options={
+                'verbose_name_plural': 'Daily booking stats',
+                'ordering': ['date'],
+                'abstract': False,
+                'unique_together': {('date', 'status')},
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyCategoryBookingStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('status', models.CharField(max_length=20)),
+                ('booking_count', models.IntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_booking_stats', to='venues_app.category')),
+            ],
+            options={
+                'verbose_name_plural': 'Daily category booking stats',
+                'ordering': ['date'],
+                'abstract': False,
+                'unique_together': {('category', 'date', 'status')},
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyVenueBookingStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('status', models.CharField(max_length=20)),
+                ('booking_count', models.IntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('venue', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_booking_stats', to='venues_app.venue')),
+            ],
+            options={
+                'verbose_name_plural': 'Daily venue booking stats',
+                'ordering': ['date'],
+                'abstract': False,
+                'unique_together': {('venue', 'date', 'status')},
+            },
+        ),
+        migrations.RunPython(populate_rollups, migrations.RunPython.noop),
+    ]
@@ -273,3 +273,67 @@ class SecurityEvent(models.Model):
         self.resolution_notes = notes
         self.save()
         return True
+
+
+class DailyUserStats(models.Model):
+    """Daily rollup of new user signups, maintained incrementally by signals"""
+
+    date = models.DateField(unique=True)
+    new_users = models.IntegerField(default=0)
+
+    class Meta:
+        ordering = ['date']
+        verbose_name_plural = 'Daily user stats'
+
+    def __str__(self):
+        return f"{self.date} - {self.new_users} new users"
+
+
+class BookingRollup(models.Model):
+    """Base model for daily booking rollups, one row per day and booking status"""
+
+    date = models.DateField()
+    status = models.CharField(max_length=20)
+    booking_count = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+    class Meta:
+        abstract = True
+        ordering = ['date']
+
+
+class DailyBookingStats(BookingRollup):
+    """Platform-wide daily booking counts and revenue by status"""
+
+    class Meta(BookingRollup.Meta):
+        unique_together = ['date', 'status']
+        verbose_name_plural = 'Daily booking stats'
+
+    def __str__(self):
+        return f"{self.date} - {self.status} - {self.booking_count} bookings"
+
+
+class DailyVenueBookingStats(BookingRollup):
+    """Daily booking counts and revenue by status for each venue"""
+
+    venue = models.ForeignKey('venues_app.Venue', on_delete=models.CASCADE, related_name='daily_booking_stats')
+
+    class Meta(BookingRollup.Meta):
+        unique_together = ['venue', 'date', 'status']
+        verbose_name_plural = 'Daily venue booking stats'
+
+    def __str__(self):
+        return f"{self.venue_id} - {self.date} - {self.status} - {self.booking_count} bookings"
+
+
+class DailyCategoryBookingStats(BookingRollup):
+    """Daily booking counts and revenue by status for each venue category"""
+
+    category = models.ForeignKey('venues_app.Category', on_delete=models.CASCADE, related_name='daily_booking_stats')
+
+    class Meta(BookingRollup.Meta):
+        unique_together = ['category', 'date', 'status']
+        verbose_name_plural = 'Daily category booking stats'
+
+    def __str__(self):
+        return f"{self.category_id} - {self.date} - {self.status} - {self.booking_count} bookings"
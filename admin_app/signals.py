@@ -1,12 +1,17 @@
 from django.db.models.signals import post_save, pre_save, post_delete
 from django.dispatch import receiver
+from django.core.cache import cache
 from django.contrib.auth import get_user_model
 from django.utils import timezone
-from django.contrib.contenttypes.models import ContentType
 from django.db import models
 import json
 
-from .models import AdminPreference, AdminActivity, AuditLog, SystemConfig, SecurityEvent
+from booking_cart_app.models import Booking
+from .models import AdminPreference, AdminActivity, SystemConfig, SecurityEvent
+from .utils import (
+    queue_audit_log, record_user_signups, update_booking_rollups,
+    get_admin_preference_cache_key, SECURITY_EVENT_SUMMARY_KEY
+)
 
 User = get_user_model()
 
@@ -19,80 +24,35 @@ def create_admin_preferences(sender, instance, created, **kwargs):
 
 
 @receiver(post_save, sender=User)
-def log_user_changes(sender, instance, created, **kwargs):
+def log_user_changes(sender, instance, created, update_fields=None, **kwargs):
     """Log changes to user accounts"""
-    if not hasattr(instance, '_skip_audit_log') or not instance._skip_audit_log:
-        content_type = ContentType.objects.get_for_model(sender)
-        if created:
-            AuditLog.objects.create(
-                user=None,  # System action or will be set by the view
-                action='create',
-                model_name='User',
-                object_id=str(instance.id),
-                content_type=content_type,
-                object_pk=str(instance.id),
-                changes={'email': instance.email}
-            )
-        else:
-            # This is simplified - in a real app, you'd compare old and new values
-            AuditLog.objects.create(
-                user=None,  # System action or will be set by the view
-                action='update',
-                model_name='User',
-                object_id=str(instance.id),
-                content_type=content_type,
-                object_pk=str(instance.id),
-                changes={'updated': True}
-            )
+    if getattr(instance, '_skip_audit_log', False):
+        return
+    if created:
+        queue_audit_log(sender, instance, 'create', {'email': instance.email}, model_name='User')
+    elif update_fields is None or set(update_fields) != {'last_login'}:
+        # Last login stamps on every sign-in are not account changes
+        # This is simplified - in a real app, you'd compare old and new values
+        queue_audit_log(sender, instance, 'update', {'updated': True}, model_name='User')
 
 
 def log_model_changes(sender, instance, created, **kwargs):
     """Generic function to log model changes"""
-    if hasattr(instance, '_skip_audit_log') and instance._skip_audit_log:
+    if getattr(instance, '_skip_audit_log', False):
         return
-    
-    content_type = ContentType.objects.get_for_model(sender)
-    model_name = sender.__name__
-    
+
     if created:
-        AuditLog.objects.create(
-            user=None,  # Will be set by the view
-            action='create',
-            model_name=model_name,
-            object_id=str(instance.id),
-            content_type=content_type,
-            object_pk=str(instance.id),
-            changes={'created': True}
-        )
+        queue_audit_log(sender, instance, 'create', {'created': True})
     else:
-        AuditLog.objects.create(
-            user=None,  # Will be set by the view
-            action='update',
-            model_name=model_name,
-            object_id=str(instance.id),
-            content_type=content_type,
-            object_pk=str(instance.id),
-            changes={'updated': True}
-        )
+        queue_audit_log(sender, instance, 'update', {'updated': True})
 
 
 def log_model_deletion(sender, instance, **kwargs):
     """Generic function to log model deletion"""
-    if hasattr(instance, '_skip_audit_log') and instance._skip_audit_log:
+    if getattr(instance, '_skip_audit_log', False):
         return
-    
-    content_type = ContentType.objects.get_for_model(sender)
-    model_name = sender.__name__
-    
-    AuditLog.objects.create(
-        user=None,  # Will be set by the view
-        action='delete',
-        model_name=model_name,
-        object_id=str(instance.id),
-        content_type=content_type,
-        object_pk=str(instance.id),
-        changes={'deleted': True}
-    )
+
+    queue_audit_log(sender, instance, 'delete', {'deleted': True})
 
 
 # You can connect these signals to specific models you want to audit
@@ -109,3 +69,55 @@ def update_system_config_timestamp(sender, instance, **kwargs):
         instance._skip_audit_log = True  # Prevent infinite loop
         instance.save(update_fields=['updated_at'])
         instance._skip_audit_log = False
+
+
+@receiver(post_save, sender=AdminPreference)
+def clear_admin_preference_cache(sender, instance, **kwargs):
+    """Clear the cached preferences of an admin when they are saved"""
+    cache.delete(get_admin_preference_cache_key(instance.user_id))
+
+
+@receiver(post_save, sender=SecurityEvent)
+@receiver(post_delete, sender=SecurityEvent)
+def clear_security_event_summary_cache(sender, instance, **kwargs):
+    """Clear the cached unresolved security event summary when an event changes"""
+    cache.delete(SECURITY_EVENT_SUMMARY_KEY)
+
+
+@receiver(post_save, sender=User)
+def update_user_rollups(sender, instance, created, **kwargs):
+    """Count new users in the daily signup rollup"""
+    if created:
+        record_user_signups([instance])
+
+
+@receiver(post_delete, sender=User)
+def update_user_rollups_on_delete(sender, instance, **kwargs):
+    """Remove deleted users from the daily signup rollup"""
+    record_user_signups([instance], sign=-1)
+
+
+def _get_rollup_category_ids(booking):
+    """Get the category of an already loaded venue, saving a query when updating rollups"""
+    if Booking.venue.is_cached(booking):
+        return {booking.venue_id: booking.venue.category_id}
+    return None
+
+
+@receiver(post_save, sender=Booking)
+def update_booking_rollups_on_save(sender, instance, created, **kwargs):
+    """Move a booking between daily rollups when it is created or its status, venue or price changes"""
+    old_state = None if created else instance._old_rollup_state
+    if not created and old_state is None:
+        # Loaded without its rollup fields, so the previously counted state is unknown
+        return
+
+    new_state = instance.get_rollup_state()
+    if old_state != new_state:
+        update_booking_rollups([(old_state, -1), (new_state, 1)], _get_rollup_category_ids(instance))
+
+
+@receiver(post_delete, sender=Booking)
+def update_booking_rollups_on_delete(sender, instance, **kwargs):
+    """Remove deleted bookings from the daily rollups"""
+    update_booking_rollups([(instance._old_rollup_state, -1)], _get_rollup_category_ids(instance))
@@ -1,10 +1,26 @@
-from django.test import TestCase, RequestFactory
+from django.test import TestCase, RequestFactory, override_settings
 from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
 from django.contrib.sessions.middleware import SessionMiddleware
 from django.contrib.messages.middleware import MessageMiddleware
+from django.core.management import call_command
+from django.db import transaction
+from django.utils import timezone
+from decimal import Decimal
+import gzip
+from io import StringIO
+from unittest import mock
 
-from admin_app.utils import log_admin_activity, get_client_ip, get_admin_preference
-from admin_app.models import AdminActivity, AdminPreference
+from admin_app.utils import (
+    log_admin_activity, get_client_ip, get_admin_preference, get_daily_stats, get_top_venues,
+    iter_csv, stream_csv_response, audit_log_batch, write_audit_logs, run_bulk_user_action
+)
+from admin_app import utils as admin_utils
+from admin_app.models import (
+    AdminActivity, AuditLog, AdminPreference, DailyUserStats, DailyBookingStats, DailyCategoryBookingStats
+)
+from venues_app.models import Category, Venue
+from booking_cart_app.models import Booking
 
 User = get_user_model()
 
@@ -114,3 +130,236 @@ class AdminUtilsTest(TestCase):
         self.assertFalse(preference.sidebar_collapsed)  # Default value
         self.assertTrue(preference.show_quick_actions)  # Default value
         self.assertEqual(preference.items_per_page, 20)  # Default value
+
+
+class AnalyticsRollupTest(TestCase):
+    """Test the daily analytics rollups"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.today = timezone.localdate()
+        self.customer = User.objects.create_user(
+            email='customer@example.com',
+            password='testpass123',
+            is_customer=True
+        )
+        self.provider = User.objects.create_user(
+            email='provider@example.com',
+            password='testpass123',
+            is_service_provider=True
+        )
+        self.category = Category.objects.create(name='Spa')
+        self.venue = Venue.objects.create(
+            owner=self.provider,
+            name='Test Spa',
+            category=self.category,
+            state='New York',
+            county='New York County',
+            city='New York',
+            street_number='123',
+            street_name='Main St',
+            about='A luxury spa.'
+        )
+
+    def create_booking(self, status='confirmed', total_price='100.00'):
+        return Booking.objects.create(
+            user=self.customer, venue=self.venue, status=status, total_price=Decimal(total_price)
+        )
+
+    def test_rollups_follow_users_and_bookings(self):
+        """Test that the rollups are updated incrementally"""
+        self.assertEqual(DailyUserStats.objects.get(date=self.today).new_users, 2)
+
+        booking = self.create_booking()
+        self.create_booking(status='pending', total_price='50.00')
+        stats = get_daily_stats(self.today, self.today)[self.today.strftime('%Y-%m-%d')]
+        self.assertEqual(stats['new_users'], 2)
+        self.assertEqual(stats['new_bookings'], 2)
+        self.assertEqual(stats['revenue'], Decimal('100.00'))
+
+        # A status change moves the booking's revenue between statuses
+        booking.status = 'cancelled'
+        booking.save()
+        self.assertEqual(DailyBookingStats.objects.get(date=self.today, status='confirmed').booking_count, 0)
+        cancelled = DailyCategoryBookingStats.objects.get(date=self.today, status='cancelled', category=self.category)
+        self.assertEqual(cancelled.revenue, Decimal('100.00'))
+        stats = get_daily_stats(self.today, self.today)[self.today.strftime('%Y-%m-%d')]
+        self.assertEqual(stats['new_bookings'], 2)
+        self.assertEqual(stats['revenue'], 0)
+
+        # Deleted bookings are removed
+        booking.delete()
+        self.assertEqual(DailyBookingStats.objects.get(date=self.today, status='cancelled').booking_count, 0)
+
+    def test_get_daily_stats_fills_gaps(self):
+        """Test that days without activity are included and read in a fixed number of queries"""
+        start_date = self.today - timezone.timedelta(days=364)
+        with self.assertNumQueries(2):
+            daily_stats = get_daily_stats(start_date, self.today)
+        self.assertEqual(len(daily_stats), 365)
+        self.assertEqual(daily_stats[start_date.strftime('%Y-%m-%d')]['new_users'], 0)
+
+    def test_rebuild_command(self):
+        """Test that the rebuild command repairs drifted rollups"""
+        self.create_booking(total_price='80.00')
+        DailyBookingStats.objects.all().update(booking_count=5, revenue=0)
+        DailyUserStats.objects.all().delete()
+
+        call_command('rebuild_analytics_rollups', stdout=StringIO())
+
+        stats = get_daily_stats(self.today, self.today)[self.today.strftime('%Y-%m-%d')]
+        self.assertEqual(stats['new_users'], 2)
+        self.assertEqual(stats['new_bookings'], 1)
+        self.assertEqual(stats['revenue'], Decimal('80.00'))
+        top_venue = get_top_venues(self.today, self.today, order_by='revenue')[0]
+        self.assertEqual(top_venue, self.venue)
+        self.assertEqual(top_venue.revenue, Decimal('80.00'))
+
+
+class StreamingCsvTest(TestCase):
+    """Test the streaming CSV export helpers"""
+
+    def test_iter_csv_chunks(self):
+        """Test that rows are yielded in bounded chunks"""
+        rows = ([i, f'row {i}'] for i in range(1000))
+        chunks = list(iter_csv(['ID', 'Name'], rows, chunk_size=1024))
+        self.assertGreater(len(chunks), 1)
+        self.assertTrue(all(len(chunk) < 1100 for chunk in chunks))
+        lines = ''.join(chunks).splitlines()
+        self.assertEqual(lines[0], 'ID,Name')
+        self.assertEqual(lines[-1], '999,row 999')
+
+    def test_stream_csv_response_gzip(self):
+        """Test plain and gzipped streaming downloads"""
+        response = stream_csv_response('export.csv', ['ID'], ([i] for i in range(3)))
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        self.assertEqual(b''.join(response.streaming_content), b'ID\r\n0\r\n1\r\n2\r\n')
+
+        response = stream_csv_response('export.csv', ['ID'], ([i] for i in range(3)), compress=True)
+        self.assertEqual(response['Content-Type'], 'application/gzip')
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="export.csv.gz"')
+        self.assertEqual(gzip.decompress(b''.join(response.streaming_content)), b'ID\r\n0\r\n1\r\n2\r\n')
+
+
+class AuditLogBatchTest(TestCase):
+    """Test the batched audit log writer"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.request = RequestFactory().get('/', REMOTE_ADDR='10.0.0.1', HTTP_USER_AGENT='Test Agent')
+
+    def test_entries_written_together_on_batch_exit(self):
+        """Test that committed entries are inserted with one query when the batch ends"""
+        with audit_log_batch(self.request):
+            with self.captureOnCommitCallbacks(execute=True):
+                user = User.objects.create_user(email='one@example.com', password='testpass123')
+                User.objects.create_user(email='two@example.com', password='testpass123')
+                user.first_name = 'One'
+                user.save()
+            self.assertEqual(AuditLog.objects.count(), 0)
+
+        logs = AuditLog.objects.order_by('id')
+        self.assertEqual([log.action for log in logs], ['create', 'create', 'update'])
+        self.assertEqual(logs[0].model_name, 'User')
+        self.assertEqual(logs[0].changes, {'email': 'one@example.com'})
+        self.assertEqual(logs[0].ip_address, '10.0.0.1')
+        self.assertEqual(logs[0].user_agent, 'Test Agent')
+
+        entries = [AuditLog(action='update', model_name='User', object_id=str(i)) for i in range(3)]
+        with self.assertNumQueries(1):
+            with audit_log_batch():
+                for entry in entries:
+                    admin_utils._buffer_audit_logs([entry])
+
+    def test_rolled_back_and_last_login_changes_not_logged(self):
+        """Test that rolled back saves and last login stamps leave no audit log"""
+        user = User.objects.create_user(email='one@example.com', password='testpass123')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    user.save()
+                    raise ValueError
+            except ValueError:
+                pass
+            user.last_login = timezone.now()
+            user.save(update_fields=['last_login'])
+        self.assertFalse(AuditLog.objects.exists())
+
+        # Outside of a batch committed entries are written straight away
+        with self.captureOnCommitCallbacks(execute=True):
+            user.save()
+        self.assertEqual(AuditLog.objects.get().action, 'update')
+
+    @override_settings(AUDIT_LOG_WRITER='background')
+    def test_background_writer_queues_entries(self):
+        """Test that the background mode hands entries to the writer queue"""
+        entries = [AuditLog(action='create', model_name='User', object_id='1')]
+        with mock.patch.object(admin_utils, '_start_audit_log_writer') as start_writer:
+            write_audit_logs(entries)
+
+        start_writer.assert_called_once()
+        self.assertEqual(admin_utils._audit_log_queue.get_nowait(), entries)
+        admin_utils._audit_log_queue.task_done()
+        self.assertFalse(AuditLog.objects.exists())
+
+
+class BulkUserActionTest(TestCase):
+    """Test the set-based bulk user actions"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.admin_user = User.objects.create_superuser(
+            email='admin@example.com',
+            password='testpass123'
+        )
+        self.users = [
+            User.objects.create_user(email=f'user{i}@example.com', password='testpass123')
+            for i in range(5)
+        ]
+        self.user_ids = [user.id for user in self.users]
+
+    def test_deactivate_in_batches(self):
+        """Test that users are deactivated batch by batch, skipping the acting admin"""
+        progress = []
+        with self.captureOnCommitCallbacks(execute=True):
+            count = run_bulk_user_action(
+                'deactivate', self.user_ids + [self.admin_user.id], self.admin_user,
+                batch_size=4, progress=lambda processed, total: progress.append((processed, total))
+            )
+
+        self.assertEqual(count, 5)
+        self.assertEqual(progress, [(4, 6), (6, 6)])
+        self.assertFalse(User.objects.filter(id__in=self.user_ids, is_active=True).exists())
+        self.admin_user.refresh_from_db()
+        self.assertTrue(self.admin_user.is_active)
+
+        logs = AuditLog.objects.filter(user=self.admin_user, action='update')
+        self.assertEqual(logs.count(), 5)
+        self.assertEqual(logs.get(object_id=str(self.users[0].id)).changes, {'email': 'user0@example.com', 'is_active': False})
+        self.assertEqual(AdminActivity.objects.filter(user=self.admin_user, target_model='User').count(), 5)
+
+        # Users already in the target state are not changed again
+        self.assertEqual(run_bulk_user_action('deactivate', self.user_ids, self.admin_user), 0)
+
+    def test_query_count_does_not_grow_with_selection(self):
+        """Test that a batch uses the same number of queries for one or many users"""
+        # Savepoint, select, update, activity insert and release
+        with self.assertNumQueries(5):
+            run_bulk_user_action('make_staff', self.user_ids[:1], self.admin_user)
+        with self.assertNumQueries(5):
+            run_bulk_user_action('make_staff', self.user_ids[1:], self.admin_user)
+        self.assertEqual(User.objects.filter(id__in=self.user_ids, is_staff=True).count(), 5)
+
+    def test_group_and_delete_actions(self):
+        """Test adding to and removing from groups and deleting users"""
+        group = Group.objects.create(name='Moderators')
+
+        self.assertEqual(run_bulk_user_action('add_to_group', self.user_ids, self.admin_user, group=group), 5)
+        self.assertEqual(group.user_set.count(), 5)
+        self.assertEqual(run_bulk_user_action('remove_from_group', self.user_ids[:2], self.admin_user, group=group), 2)
+        self.assertEqual(group.user_set.count(), 3)
+
+        self.assertEqual(run_bulk_user_action('delete', self.user_ids + [self.admin_user.id], self.admin_user), 5)
+        self.assertEqual(list(User.objects.values_list('id', flat=True)), [self.admin_user.id])
+        self.assertEqual(AdminActivity.objects.filter(action_type='delete').count(), 5)
@@ -947,7 +947,7 @@ class AdminAuditLogViewsTest(TestCase):
         )
 
         # Check CSV content
-        content = response.content.decode('utf-8')
+        content = b''.join(response.streaming_content).decode('utf-8')
         self.assertIn('User ID,Action,Resource Type,Resource ID,Details,IP Address,Timestamp', content)
         for i in range(5):
             self.assertIn(f'admin@example.com,create,User,{i},Created user {i},127.0.0.1', content)
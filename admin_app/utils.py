@@ -1,5 +1,66 @@
+import csv
+import io
+import logging
+import queue
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import timedelta
+from decimal import Decimal
+from functools import partial
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.contrib.contenttypes.models import ContentType
+from django.db import DatabaseError, IntegrityError, close_old_connections, transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncDate
+from django.http import StreamingHttpResponse
 from django.utils import timezone
-from .models import AdminActivity, SecurityEvent, AdminPreference
+from django.utils.text import compress_sequence
+
+from venues_app.models import Venue
+from booking_cart_app.models import Booking
+from .models import (
+    AdminActivity, AuditLog, SecurityEvent, AdminPreference,
+    DailyUserStats, DailyBookingStats, DailyVenueBookingStats, DailyCategoryBookingStats
+)
+
+# Booking statuses counted as revenue in analytics
+REVENUE_STATUSES = ['confirmed', 'completed']
+
+# Approximate size in characters of each chunk sent by streaming CSV exports
+CSV_STREAM_CHUNK_SIZE = 64 * 1024
+
+# Number of rows fetched per database round trip by streaming exports
+EXPORT_ITERATOR_CHUNK_SIZE = 2000
+
+# Lifetime of the cached admin preferences and security event summary used by admin pages, in seconds
+ADMIN_CONTEXT_CACHE_TIMEOUT = 60
+
+# Cache key of the unresolved security event summary shared by all admins
+SECURITY_EVENT_SUMMARY_KEY = 'admin_app:unresolved_security_events'
+
+# Maximum number of audit log rows inserted per query
+AUDIT_LOG_BATCH_SIZE = 500
+
+# Number of users changed per query and transaction by bulk user actions
+BULK_USER_ACTION_BATCH_SIZE = 1000
+
+# Field values set by the bulk user update actions
+BULK_USER_UPDATES = {
+    'activate': {'is_active': True},
+    'deactivate': {'is_active': False},
+    'make_staff': {'is_staff': True},
+    'remove_staff': {'is_staff': False},
+}
+
+# Bulk user actions that are never applied to the acting admin's own account
+BULK_USER_SELF_EXCLUDED_ACTIONS = {'deactivate', 'remove_staff', 'delete'}
+
+logger = logging.getLogger(__name__)
 
 def log_admin_activity(request, action_type, target_model=None, target_id=None, description=None):
     """
@@ -116,6 +177,51 @@ def get_unresolved_security_events_count():
     """
     return SecurityEvent.objects.filter(is_resolved=False).count()
 
+def get_admin_preference_cache_key(user_id):
+    """
+    Get the cache key of an admin's preferences
+
+    Args:
+        user_id: ID of the admin
+
+    Returns:
+        str: Cache key
+    """
+    return f'admin_app:preference:{user_id}'
+
+def get_cached_admin_preference(user):
+    """
+    Get admin preferences for a user through a short-lived per-user cache entry
+
+    Args:
+        user: User object
+
+    Returns:
+        AdminPreference: User's admin preferences
+    """
+    key = get_admin_preference_cache_key(user.id)
+    preference = cache.get(key)
+    if preference is None:
+        preference = get_admin_preference(user)
+        cache.set(key, preference, ADMIN_CONTEXT_CACHE_TIMEOUT)
+    return preference
+
+def get_security_event_summary():
+    """
+    Get the most important unresolved security events and their total count, cached briefly
+
+    Returns:
+        dict: events, a list of SecurityEvent objects, and count
+    """
+    summary = cache.get(SECURITY_EVENT_SUMMARY_KEY)
+    if summary is None:
+        summary = {
+            'events': list(get_unresolved_security_events()),
+            'count': get_unresolved_security_events_count(),
+        }
+        cache.set(SECURITY_EVENT_SUMMARY_KEY, summary, ADMIN_CONTEXT_CACHE_TIMEOUT)
+    return summary
+
 def format_date_range(start_date, end_date):
     """
     Format date range for display
@@ -137,3 +243,503 @@ def format_date_range(start_date, end_date):
         return f"{start_date.strftime('%B %d')} - {end_date.strftime('%B %d, %Y')}"
     
     return f"{start_date.strftime('%B %d, %Y')} - {end_date.strftime('%B %d, %Y')}"
+
+
+def _increment_rollup(model, lookup, **deltas):
+    """
+    Add deltas to the counters of a rollup row with a single UPDATE.
+    The row is created for increments only, so removing data that predates the rollups
+    never produces negative rows.
+
+    Args:
+        model: Rollup model
+        lookup: Field values identifying the row
+        **deltas: Counter fields and the amounts to add
+    """
+    updates = {field: F(field) + value for field, value in deltas.items()}
+    if model.objects.filter(**lookup).update(**updates) or min(deltas.values()) < 0:
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(**lookup, **deltas)
+    except IntegrityError:
+        # Another request created the row first
+        model.objects.filter(**lookup).update(**updates)
+
+
+def record_user_signups(users, sign=1):
+    """
+    Add users to (or with sign=-1 remove them from) the daily signup rollup
+
+    Args:
+        users: Iterable of users
+        sign: 1 to add the users, -1 to remove them
+    """
+    counts = defaultdict(int)
+    for user in users:
+        counts[timezone.localdate(user.date_joined)] += sign
+    for date, count in counts.items():
+        if count:
+            _increment_rollup(DailyUserStats, {'date': date}, new_users=count)
+
+
+def update_booking_rollups(changes, category_ids=None):
+    """
+    Apply booking changes to the platform, venue and category daily rollups.
+    Changes to the same row are combined, so each affected row costs a single UPDATE.
+
+    Args:
+        changes: Iterable of (state, sign) pairs, where state is a Booking.get_rollup_state()
+            tuple and sign is 1 to add the booking or -1 to remove it
+        category_ids: Optional dictionary of venue id to category id for venues already loaded
+    """
+    changes = [(state, sign) for state, sign in changes if state]
+    if not changes:
+        return
+
+    category_ids = dict(category_ids or {})
+    missing_venue_ids = {state[1] for state, _ in changes} - set(category_ids)
+    if missing_venue_ids:
+        category_ids.update(Venue.objects.filter(pk__in=missing_venue_ids).values_list('id', 'category_id'))
+
+    deltas = defaultdict(lambda: [0, Decimal('0')])
+    for (date, venue_id, status, total_price), sign in changes:
+        keys = [
+            (DailyBookingStats, (('date', date), ('status', status))),
+            (DailyVenueBookingStats, (('date', date), ('status', status), ('venue_id', venue_id))),
+        ]
+        category_id = category_ids.get(venue_id)
+        if category_id:
+            keys.append((DailyCategoryBookingStats, (('date', date), ('status', status), ('category_id', category_id))))
+        for key in keys:
+            deltas[key][0] += sign
+            deltas[key][1] += sign * Decimal(str(total_price or 0))
+
+    for (model, lookup), (booking_count, revenue) in deltas.items():
+        if booking_count or revenue:
+            _increment_rollup(model, dict(lookup), booking_count=booking_count, revenue=revenue)
+
+
+def record_bookings(bookings):
+    """
+    Add new bookings to the daily rollups. Used for bookings created with bulk_create,
+    which does not send the post_save signal that normally does this.
+
+    Args:
+        bookings: Iterable of saved bookings
+    """
+    bookings = list(bookings)
+    category_ids = {
+        booking.venue_id: booking.venue.category_id
+        for booking in bookings if Booking.venue.is_cached(booking)
+    }
+    for booking in bookings:
+        booking._old_rollup_state = booking.get_rollup_state()
+    update_booking_rollups([(booking._old_rollup_state, 1) for booking in bookings], category_ids)
+
+
+def rebuild_rollups(batch_size=1000):
+    """
+    Rebuild all daily rollups from the users and bookings tables with grouped queries
+
+    Args:
+        batch_size: Number of rows inserted per query
+
+    Returns:
+        dict: Number of rows written to each rollup table
+    """
+    User = get_user_model()
+
+    user_rows = [
+        DailyUserStats(date=row['day'], new_users=row['count'])
+        for row in User.objects.annotate(day=TruncDate('date_joined')).values('day').annotate(
+            count=Count('id')
+        ).order_by()
+    ]
+
+    platform = defaultdict(lambda: [0, Decimal('0')])
+    categories = defaultdict(lambda: [0, Decimal('0')])
+    venue_rows = []
+    booking_groups = Booking.objects.annotate(day=TruncDate('booking_date')).values(
+        'day', 'status', 'venue_id', 'venue__category_id'
+    ).annotate(count=Count('id'), revenue=Sum('total_price')).order_by()
+    for row in booking_groups:
+        revenue = row['revenue'] or Decimal('0')
+        venue_rows.append(DailyVenueBookingStats(
+            date=row['day'], status=row['status'], venue_id=row['venue_id'],
+            booking_count=row['count'], revenue=revenue
+        ))
+        totals = [platform[(row['day'], row['status'])]]
+        if row['venue__category_id']:
+            totals.append(categories[(row['day'], row['status'], row['venue__category_id'])])
+        for total in totals:
+            total[0] += row['count']
+            total[1] += revenue
+
+    platform_rows = [
+        DailyBookingStats(date=date, status=status, booking_count=count, revenue=revenue)
+        for (date, status), (count, revenue) in platform.items()
+    ]
+    category_rows = [
+        DailyCategoryBookingStats(
+            date=date, status=status, category_id=category_id, booking_count=count, revenue=revenue
+        )
+        for (date, status, category_id), (count, revenue) in categories.items()
+    ]
+
+    written = {}
+    with transaction.atomic():
+        for model, rows in [
+            (DailyUserStats, user_rows),
+            (DailyBookingStats, platform_rows),
+            (DailyVenueBookingStats, venue_rows),
+            (DailyCategoryBookingStats, category_rows),
+        ]:
+            model.objects.all().delete()
+            model.objects.bulk_create(rows, batch_size=batch_size)
+            written[model.__name__] = len(rows)
+    return written
+
+
+def get_daily_stats(start_date, end_date, revenue_statuses=REVENUE_STATUSES):
+    """
+    Get new users, new bookings and revenue for every day in a date range from the daily rollups
+
+    Args:
+        start_date: First day of the range
+        end_date: Last day of the range
+        revenue_statuses: Booking statuses counted as revenue
+
+    Returns:
+        dict: Stats dictionaries keyed by 'YYYY-MM-DD', including days without activity
+    """
+    daily_stats = {}
+    current_date = start_date
+    while current_date <= end_date:
+        daily_stats[current_date.strftime('%Y-%m-%d')] = {
+            'date': current_date,
+            'new_users': 0,
+            'new_bookings': 0,
+            'revenue': 0,
+        }
+        current_date += timedelta(days=1)
+
+    for date, new_users in DailyUserStats.objects.filter(
+        date__range=[start_date, end_date]
+    ).values_list('date', 'new_users'):
+        daily_stats[date.strftime('%Y-%m-%d')]['new_users'] = new_users
+
+    booking_stats = DailyBookingStats.objects.filter(date__range=[start_date, end_date]).values('date').annotate(
+        new_bookings=Sum('booking_count'),
+        revenue=Sum('revenue', filter=Q(status__in=revenue_statuses))
+    ).order_by()
+    for row in booking_stats:
+        day = daily_stats[row['date'].strftime('%Y-%m-%d')]
+        day['new_bookings'] = row['new_bookings']
+        day['revenue'] = row['revenue'] or 0
+
+    return daily_stats
+
+
+def get_top_venues(start_date, end_date, order_by='booking_count', limit=10, revenue_statuses=REVENUE_STATUSES):
+    """
+    Get the venues with the most bookings or revenue in a date range from the daily rollups
+
+    Args:
+        start_date: First day of the range
+        end_date: Last day of the range
+        order_by: 'booking_count' or 'revenue'
+        limit: Maximum number of venues to return
+        revenue_statuses: Booking statuses counted as revenue
+
+    Returns:
+        QuerySet: Venues annotated with booking_count and revenue
+    """
+    return Venue.objects.filter(
+        daily_booking_stats__date__range=[start_date, end_date]
+    ).annotate(
+        booking_count=Sum('daily_booking_stats__booking_count'),
+        revenue=Sum('daily_booking_stats__revenue', filter=Q(daily_booking_stats__status__in=revenue_statuses))
+    ).filter(**{f'{order_by}__gt': 0}).order_by(f'-{order_by}', 'name')[:limit]
+
+
+def iter_csv(header, rows, chunk_size=CSV_STREAM_CHUNK_SIZE):
+    """
+    Write CSV rows into a small buffer and yield its contents whenever it fills up,
+    so memory use does not depend on the number of rows
+
+    Args:
+        header: List of column titles
+        rows: Iterable of row lists, typically a generator over queryset.iterator()
+        chunk_size: Approximate number of characters per yielded chunk
+
+    Returns:
+        generator: CSV text chunks
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+    for row in rows:
+        writer.writerow(row)
+        if buffer.tell() >= chunk_size:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def stream_csv_response(filename, header, rows, compress=False):
+    """
+    Build a streaming CSV download
+
+    Args:
+        filename: Download file name, without the .gz suffix
+        header: List of column titles
+        rows: Iterable of row lists, consumed lazily while the response is sent
+        compress: Whether to gzip the file
+
+    Returns:
+        StreamingHttpResponse: The CSV (or gzipped CSV) download
+    """
+    content = iter_csv(header, rows)
+    if compress:
+        response = StreamingHttpResponse(
+            compress_sequence(chunk.encode('utf-8') for chunk in content),
+            content_type='application/gzip'
+        )
+        filename = f'{filename}.gz'
+    else:
+        response = StreamingHttpResponse(content, content_type='text/csv')
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+# Audit log entries collected by the innermost audit_log_batch() of the current thread or task
+_audit_log_buffer = ContextVar('audit_log_buffer', default=None)
+
+# Batches waiting for the background audit log writer
+_audit_log_queue = queue.Queue()
+_audit_log_thread = None
+_audit_log_thread_lock = threading.Lock()
+
+
+def queue_audit_log(sender, instance, action, changes, model_name=None, **fields):
+    """
+    Queue an audit log entry for a model change.
+    The entry is only kept if the surrounding transaction commits, and is written together
+    with the other entries of the current audit_log_batch() when it ends.
+
+    Args:
+        sender: Model class of the changed object
+        instance: The changed object
+        action: Audit action (create, update, delete)
+        changes: Dictionary describing the change
+        model_name: Name recorded for the model, defaults to the class name
+        **fields: Other AuditLog fields, e.g. user or ip_address
+    """
+    # get_for_model is served from the content type cache after the first lookup
+    entry = AuditLog(
+        action=action,
+        model_name=model_name or sender.__name__,
+        object_id=str(instance.pk),
+        content_type=ContentType.objects.get_for_model(sender),
+        object_pk=str(instance.pk),
+        changes=changes,
+        **fields
+    )
+    transaction.on_commit(partial(_buffer_audit_logs, [entry]))
+
+
+def _buffer_audit_logs(entries):
+    """Add committed entries to the current batch, or write them straight away outside of one"""
+    buffer = _audit_log_buffer.get()
+    if buffer is None:
+        write_audit_logs(entries)
+    else:
+        buffer.extend(entries)
+
+
+@contextmanager
+def audit_log_batch(request=None):
+    """
+    Collect the audit log entries committed inside the block and write them when it exits.
+    Nested blocks share the outermost batch.
+
+    Args:
+        request: Optional HTTP request whose IP address and user agent are recorded on the entries
+    """
+    if _audit_log_buffer.get() is not None:
+        yield
+        return
+
+    buffer = []
+    token = _audit_log_buffer.set(buffer)
+    try:
+        yield
+    finally:
+        _audit_log_buffer.reset(token)
+        if buffer and request is not None:
+            ip_address = get_client_ip(request)
+            user_agent = request.META.get('HTTP_USER_AGENT', '')
+            for entry in buffer:
+                entry.ip_address = entry.ip_address or ip_address
+                entry.user_agent = entry.user_agent or user_agent
+        write_audit_logs(buffer)
+
+
+def write_audit_logs(entries):
+    """
+    Write audit log entries using the configured AUDIT_LOG_WRITER.
+    'sync' inserts them right away with bulk_create, 'background' hands them to a writer
+    thread so the inserts happen off the request path.
+
+    Args:
+        entries: List of unsaved AuditLog objects
+    """
+    if not entries:
+        return
+    if getattr(settings, 'AUDIT_LOG_WRITER', 'sync') == 'background':
+        _start_audit_log_writer()
+        _audit_log_queue.put(list(entries))
+    else:
+        AuditLog.objects.bulk_create(entries, batch_size=AUDIT_LOG_BATCH_SIZE)
+
+
+def _start_audit_log_writer():
+    """Start the background audit log writer thread of this process if it is not running"""
+    global _audit_log_thread
+
+    if _audit_log_thread is not None and _audit_log_thread.is_alive():
+        return
+    with _audit_log_thread_lock:
+        if _audit_log_thread is None or not _audit_log_thread.is_alive():
+            _audit_log_thread = threading.Thread(
+                target=_run_audit_log_writer, name='audit-log-writer', daemon=True
+            )
+            _audit_log_thread.start()
+
+
+def _run_audit_log_writer():
+    """Insert queued audit log batches, combining everything queued since the last insert"""
+    while True:
+        batches = [_audit_log_queue.get()]
+        while True:
+            try:
+                batches.append(_audit_log_queue.get_nowait())
+            except queue.Empty:
+                break
+
+        close_old_connections()
+        try:
+            AuditLog.objects.bulk_create(
+                [entry for batch in batches for entry in batch], batch_size=AUDIT_LOG_BATCH_SIZE
+            )
+        except DatabaseError:
+            logger.exception('Failed to write %d audit log batches', len(batches))
+        finally:
+            for _ in batches:
+                _audit_log_queue.task_done()
+
+
+def flush_audit_log_queue():
+    """
+    Wait until the background audit log writer has written everything queued so far
+    """
+    if _audit_log_thread is not None and _audit_log_thread.is_alive():
+        _audit_log_queue.join()
+
+
+def run_bulk_user_action(action, user_ids, admin_user, group=None, request=None,
+                         batch_size=BULK_USER_ACTION_BATCH_SIZE, progress=None):
+    """
+    Apply a bulk action to users with set-based queries, one batch of users at a time.
+    Each batch is changed, audited and recorded as admin activity in its own transaction
+    with a fixed number of queries, whatever its size. Users the action would not change
+    are skipped.
+
+    Args:
+        action: Action name from BulkUserActionForm.ACTION_CHOICES
+        user_ids: IDs of the selected users
+        admin_user: Admin performing the action
+        group: Group for the add_to_group and remove_from_group actions
+        request: Optional HTTP request, for the IP address and user agent of the records
+        batch_size: Number of users handled per batch
+        progress: Optional callable receiving (processed, total) after each batch
+
+    Returns:
+        int: Number of users changed
+    """
+    user_ids = list(dict.fromkeys(user_ids))
+    total = len(user_ids)
+    details = {
+        'ip_address': get_client_ip(request) if request is not None else None,
+        'user_agent': request.META.get('HTTP_USER_AGENT', '') if request is not None else '',
+    }
+
+    changed = 0
+    for start in range(0, total, batch_size):
+        with transaction.atomic():
+            changed += _apply_bulk_user_action(action, user_ids[start:start + batch_size], admin_user, group, details)
+        if progress is not None:
+            progress(min(start + batch_size, total), total)
+    return changed
+
+
+def _apply_bulk_user_action(action, user_ids, admin_user, group, details):
+    """Apply a bulk user action to one batch of users, returning the number changed"""
+    User = get_user_model()
+    users = User.objects.filter(id__in=user_ids)
+    if action in BULK_USER_SELF_EXCLUDED_ACTIONS:
+        users = users.exclude(id=admin_user.id)
+
+    if action in BULK_USER_UPDATES:
+        changes = BULK_USER_UPDATES[action]
+        changed = dict(users.exclude(**changes).values_list('id', 'email'))
+        User.objects.filter(id__in=changed).update(**changes)
+    elif action == 'add_to_group':
+        changes = {'group_added': group.name}
+        changed = dict(users.exclude(groups=group).values_list('id', 'email'))
+        group.user_set.add(*changed)
+    elif action == 'remove_from_group':
+        changes = {'group_removed': group.name}
+        changed = dict(users.filter(groups=group).values_list('id', 'email'))
+        group.user_set.remove(*changed)
+    elif action == 'delete':
+        changes = {'deleted': True}
+        changed = dict(users.values_list('id', 'email'))
+        User.objects.filter(id__in=changed).delete()
+    else:
+        raise ValueError(f'Unknown bulk user action: {action}')
+
+    if not changed:
+        return 0
+
+    audit_action = 'delete' if action == 'delete' else 'update'
+    content_type = ContentType.objects.get_for_model(User)
+    entries = [
+        AuditLog(
+            user=admin_user,
+            action=audit_action,
+            model_name='User',
+            object_id=str(user_id),
+            content_type=content_type,
+            object_pk=str(user_id),
+            changes={'email': email, **changes},
+            **details
+        )
+        for user_id, email in changed.items()
+    ]
+    transaction.on_commit(partial(_buffer_audit_logs, entries))
+
+    AdminActivity.objects.bulk_create([
+        AdminActivity(
+            user=admin_user,
+            action_type=audit_action,
+            target_model='User',
+            target_id=str(user_id),
+            description=f'Bulk action: {action} on user {email}',
+            **details
+        )
+        for user_id, email in changed.items()
+    ], batch_size=AUDIT_LOG_BATCH_SIZE)
+    return len(changed)
@@ -4,7 +4,7 @@ from django.contrib.auth import get_user_model, authenticate, login, logout
 from django.contrib import messages
 from django.utils import timezone
 from django.db.models import Count, Sum, Q, F
-from django.http import JsonResponse, HttpResponseRedirect, HttpResponse
+from django.http import JsonResponse, HttpResponseRedirect
 from django.urls import reverse
 from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
 from django.contrib.auth.models import Group, Permission
@@ -12,10 +12,13 @@ from django.contrib.contenttypes.models import ContentType
 from django.contrib.auth.forms import AuthenticationForm
 from datetime import timedelta, datetime
 from functools import wraps
-import csv
 import json
+import logging
 
-from .utils import log_admin_activity, get_client_ip, get_admin_preference
+from .utils import (
+    log_admin_activity, get_client_ip, get_admin_preference, get_daily_stats, get_top_venues,
+    stream_csv_response, run_bulk_user_action, EXPORT_ITERATOR_CHUNK_SIZE, BULK_USER_SELF_EXCLUDED_ACTIONS
+)
 
 from accounts_app.models import ServiceProviderProfile, CustomerProfile, StaffMember
 from venues_app.models import Venue, Service, Category, Tag
@@ -34,6 +37,8 @@ from .forms import (
 
 User = get_user_model()
 
+logger = logging.getLogger(__name__)
+
 
 # Helper functions
 def is_admin(user):
@@ -450,51 +455,32 @@ def user_bulk_actions(request):
         if form.is_valid():
             action = form.cleaned_data.get('action')
             group = form.cleaned_data.get('group')
+            user_ids = [user_id for user_id in selected_users if user_id.isdigit()]
+
+            if action in BULK_USER_SELF_EXCLUDED_ACTIONS and str(request.user.id) in user_ids:
+                messages.warning(request, 'You cannot apply this action to your own account.')
 
-            users = User.objects.filter(id__in=selected_users)
-            count = users.count()
+            def report_progress(processed, total):
+                logger.info('Bulk action %s: %d of %d selected users processed', action, processed, total)
+
+            count = run_bulk_user_action(
+                action, user_ids, request.user, group=group, request=request, progress=report_progress
+            )
 
             if action == 'activate':
-                users.update(is_active=True)
                 message = f'{count} users have been activated.'
             elif action == 'deactivate':
-                # Prevent deactivating yourself
-                if str(request.user.id) in selected_users:
-                    users = users.exclude(id=request.user.id)
-                    count = users.count()
-                    messages.warning(request, 'You cannot deactivate your own account.')
-
-                users.update(is_active=False)
                 message = f'{count} users have been deactivated.'
             elif action == 'make_staff':
-                users.update(is_staff=True)
                 message = f'{count} users have been given staff status.'
             elif action == 'remove_staff':
-                # Prevent removing staff status from yourself
-                if str(request.user.id) in selected_users:
-                    users = users.exclude(id=request.user.id)
-                    count = users.count()
-                    messages.warning(request, 'You cannot remove your own staff status.')
-
-                users.update(is_staff=False)
                 message = f'{count} users have had staff status removed.'
-            elif action == 'add_to_group' and group:
-                for user in users:
-                    user.groups.add(group)
+            elif action == 'add_to_group':
                 message = f'{count} users have been added to the group "{group.name}".'
-            elif action == 'remove_from_group' and group:
-                for user in users:
-                    user.groups.remove(group)
+            elif action == 'remove_from_group':
                 message = f'{count} users have been removed from the group "{group.name}".'
-
-            # Log admin activity
-            log_admin_activity(
-                request,
-                'update',
-                'User',
-                ','.join(selected_users),
-                f'Bulk action: {action} on {count} users'
-            )
+            else:
+                message = f'{count} users have been deleted.'
 
             messages.success(request, message)
             return redirect('admin_app:user_list')
@@ -843,18 +829,14 @@ def export_audit_logs(request):
         except ValueError:
             pass
 
-    # Order by
-    logs = logs.order_by('-timestamp')
-
-    # Create CSV response
-    response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = 'attachment; filename="audit_logs.csv"'
+    # Order by, loading only the exported columns and the user in the same query
+    logs = logs.select_related('user').only(
+        'id', 'user__email', 'action', 'model_name', 'object_id', 'timestamp', 'ip_address', 'changes'
+    ).order_by('-timestamp')
 
-    writer = csv.writer(response)
-    writer.writerow(['ID', 'User', 'Action', 'Model', 'Object ID', 'Timestamp', 'IP Address', 'Changes'])
-
-    for log in logs:
-        writer.writerow([
+    # Rows are produced while the response streams, fetched in chunks with a server-side cursor
+    rows = (
+        [
             log.id,
             log.user.email if log.user else 'System',
             log.action,
@@ -863,7 +845,15 @@ def export_audit_logs(request):
             log.timestamp,
             log.ip_address or 'N/A',
             json.dumps(log.changes)
-        ])
+        ]
+        for log in logs.iterator(chunk_size=EXPORT_ITERATOR_CHUNK_SIZE)
+    )
+    response = stream_csv_response(
+        'audit_logs.csv',
+        ['ID', 'User', 'Action', 'Model', 'Object ID', 'Timestamp', 'IP Address', 'Changes'],
+        rows,
+        compress=request.GET.get('compress') == 'gzip'
+    )
 
     # Log admin activity
     log_admin_activity(request, 'export', 'AuditLog', None, 'Exported audit logs to CSV')
@@ -1281,9 +1271,12 @@ def analytics_dashboard(request):
     else:
         form = DateRangeForm(initial={'start_date': start_date, 'end_date': end_date})
 
+    # Get daily statistics from the daily rollups
+    daily_stats = get_daily_stats(start_date, end_date)
+
     # Get user statistics
     total_users = User.objects.count()
-    new_users = User.objects.filter(date_joined__date__range=[start_date, end_date]).count()
+    new_users = sum(day['new_users'] for day in daily_stats.values())
     active_users = User.objects.filter(last_login__date__range=[start_date, end_date]).count()
 
     # Get venue statistics
@@ -1293,41 +1286,12 @@ def analytics_dashboard(request):
 
     # Get booking statistics
     total_bookings = Booking.objects.count()
-    new_bookings = Booking.objects.filter(booking_date__date__range=[start_date, end_date]).count()
+    new_bookings = sum(day['new_bookings'] for day in daily_stats.values())
     completed_bookings = Booking.objects.filter(status='completed').count()
 
     # Get revenue statistics
     total_revenue = Booking.objects.filter(status__in=['confirmed', 'completed']).aggregate(total=Sum('total_price'))['total'] or 0
-    period_revenue = Booking.objects.filter(
-        status__in=['confirmed', 'completed'],
-        booking_date__date__range=[start_date, end_date]
-    ).aggregate(total=Sum('total_price'))['total'] or 0
-
-    # Get daily statistics
-    daily_stats = {}
-    current_date = start_date
-    while current_date <= end_date:
-        # Get new users for this day
-        day_new_users = User.objects.filter(date_joined__date=current_date).count()
-
-        # Get new bookings for this day
-        day_new_bookings = Booking.objects.filter(booking_date__date=current_date).count()
-
-        # Get revenue for this day
-        day_revenue = Booking.objects.filter(
-            status__in=['confirmed', 'completed'],
-            booking_date__date=current_date
-        ).aggregate(total=Sum('total_price'))['total'] or 0
-
-        # Store daily stats
-        daily_stats[current_date.strftime('%Y-%m-%d')] = {
-            'date': current_date,
-            'new_users': day_new_users,
-            'new_bookings': day_new_bookings,
-            'revenue': day_revenue,
-        }
-
-        current_date += timedelta(days=1)
+    period_revenue = sum(day['revenue'] for day in daily_stats.values())
 
     # Log admin activity
     log_admin_activity(request, 'view', 'Analytics', None, 'Viewed analytics dashboard')
@@ -1372,36 +1336,17 @@ def export_analytics(request):
             end_date = timezone.now().date()
             start_date = end_date - timedelta(days=30)  # Default to last 30 days
 
-    # Create CSV response
-    response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = f'attachment; filename="analytics_{start_date}_to_{end_date}.csv"'
-
-    writer = csv.writer(response)
-    writer.writerow(['Date', 'New Users', 'New Bookings', 'Revenue'])
-
-    # Get daily statistics
-    current_date = start_date
-    while current_date <= end_date:
-        # Get new users for this day
-        day_new_users = User.objects.filter(date_joined__date=current_date).count()
-
-        # Get new bookings for this day
-        day_new_bookings = Booking.objects.filter(booking_date__date=current_date).count()
-
-        # Get revenue for this day
-        day_revenue = Booking.objects.filter(
-            status__in=['confirmed', 'completed'],
-            booking_date__date=current_date
-        ).aggregate(total=Sum('total_price'))['total'] or 0
-
-        writer.writerow([
-            current_date,
-            day_new_users,
-            day_new_bookings,
-            day_revenue
-        ])
-
-        current_date += timedelta(days=1)
+    # Get daily statistics from the daily rollups and stream them as CSV
+    rows = (
+        [day['date'], day['new_users'], day['new_bookings'], day['revenue']]
+        for day in get_daily_stats(start_date, end_date).values()
+    )
+    response = stream_csv_response(
+        f'analytics_{start_date}_to_{end_date}.csv',
+        ['Date', 'New Users', 'New Bookings', 'Revenue'],
+        rows,
+        compress=request.GET.get('compress') == 'gzip'
+    )
 
     # Log admin activity
     log_admin_activity(request, 'export', 'Analytics', None, 'Exported analytics data to CSV')
@@ -1443,13 +1388,10 @@ def user_report(request):
         login_count=Count('admin_activities', filter=Q(admin_activities__action_type='login'))
     ).order_by('-login_count')[:10]
 
-    # Get new users by day
-    new_users_by_day = {}
-    current_date = start_date
-    while current_date <= end_date:
-        day_new_users = User.objects.filter(date_joined__date=current_date).count()
-        new_users_by_day[current_date.strftime('%Y-%m-%d')] = day_new_users
-        current_date += timedelta(days=1)
+    # Get new users by day from the daily rollups
+    new_users_by_day = {
+        date: day['new_users'] for date, day in get_daily_stats(start_date, end_date).items()
+    }
 
     # Log admin activity
     log_admin_activity(request, 'view', 'UserReport', None, 'Viewed user report')
@@ -1501,18 +1443,13 @@ def booking_report(request):
     completed_count = Booking.objects.filter(status='completed').count()
     cancelled_count = Booking.objects.filter(status='cancelled').count()
 
-    # Get top venues by bookings
-    top_venues = Venue.objects.annotate(
-        booking_count=Count('booking_cart_app_bookings')
-    ).order_by('-booking_count')[:10]
+    # Get top venues by bookings in the period from the daily rollups
+    top_venues = get_top_venues(start_date, end_date, order_by='booking_count')
 
-    # Get bookings by day
-    bookings_by_day = {}
-    current_date = start_date
-    while current_date <= end_date:
-        day_bookings = Booking.objects.filter(booking_date__date=current_date).count()
-        bookings_by_day[current_date.strftime('%Y-%m-%d')] = day_bookings
-        current_date += timedelta(days=1)
+    # Get bookings by day from the daily rollups
+    bookings_by_day = {
+        date: day['new_bookings'] for date, day in get_daily_stats(start_date, end_date).items()
+    }
 
     # Log admin activity
     log_admin_activity(request, 'view', 'BookingReport', None, 'Viewed booking report')
@@ -1554,28 +1491,17 @@ def revenue_report(request):
     else:
         form = DateRangeForm(initial={'start_date': start_date, 'end_date': end_date})
 
+    # Get revenue by day from the daily rollups
+    revenue_by_day = {
+        date: day['revenue'] for date, day in get_daily_stats(start_date, end_date).items()
+    }
+
     # Get revenue statistics
     total_revenue = Booking.objects.filter(status__in=['confirmed', 'completed']).aggregate(total=Sum('total_price'))['total'] or 0
-    period_revenue = Booking.objects.filter(
-        status__in=['confirmed', 'completed'],
-        booking_date__date__range=[start_date, end_date]
-    ).aggregate(total=Sum('total_price'))['total'] or 0
-
-    # Get top venues by revenue
-    top_venues_by_revenue = Venue.objects.annotate(
-        revenue=Sum('booking_cart_app_bookings__total_price', filter=Q(booking_cart_app_bookings__status__in=['confirmed', 'completed']))
-    ).filter(revenue__isnull=False).order_by('-revenue')[:10]
-
-    # Get revenue by day
-    revenue_by_day = {}
-    current_date = start_date
-    while current_date <= end_date:
-        day_revenue = Booking.objects.filter(
-            status__in=['confirmed', 'completed'],
-            booking_date__date=current_date
-        ).aggregate(total=Sum('total_price'))['total'] or 0
-        revenue_by_day[current_date.strftime('%Y-%m-%d')] = day_revenue
-        current_date += timedelta(days=1)
+    period_revenue = sum(revenue_by_day.values())
+
+    # Get top venues by revenue in the period from the daily rollups
+    top_venues_by_revenue = get_top_venues(start_date, end_date, order_by='revenue')
 
     # Log admin activity
     log_admin_activity(request, 'view', 'RevenueReport', None, 'Viewed revenue report')
@@ -1,4 +1,6 @@
 from django.db import models
+from django.db.models import Case, F, Value, When
+from django.db.models.functions import Greatest
 from django.conf import settings
 from django.utils import timezone
 from venues_app.models import Service, Venue
@@ -57,6 +59,9 @@ class Booking(models.Model):
         ('no_show', 'No Show'),  # Added for no-show handling
     ]
 
+    # Fields that make up the booking's state in the daily analytics rollups
+    ROLLUP_FIELDS = {'booking_date', 'venue_id', 'status', 'total_price'}
+
     booking_id = models.UUIDField(default=uuid.uuid4, editable=False, unique=True)
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='bookings')
     venue = models.ForeignKey(Venue, on_delete=models.CASCADE, related_name='bookings')
@@ -72,6 +77,10 @@ class Booking(models.Model):
         super().__init__(*args, **kwargs)
         # Store the original status to track changes
         self._old_status = self.status if self.pk else None
+        # Store the originally counted state to update analytics rollups incrementally
+        self._old_rollup_state = (
+            self.get_rollup_state() if self.pk and not self.ROLLUP_FIELDS & self.get_deferred_fields() else None
+        )
 
     def save(self, *args, **kwargs):
         # Update last_status_change if status has changed
@@ -80,13 +89,26 @@ class Booking(models.Model):
         super().save(*args, **kwargs)
         # Update _old_status after save
         self._old_status = self.status
+        self._old_rollup_state = self.get_rollup_state()
 
     class Meta:
         ordering = ['-booking_date']
+        indexes = [
+            # Keyset pagination of the booking lists, see get_booking_list_page()
+            models.Index(fields=['-booking_date', '-id'], name='booking_date_id_idx'),
+            models.Index(fields=['venue', '-booking_date', '-id'], name='booking_venue_date_idx'),
+            models.Index(fields=['status', '-booking_date', '-id'], name='booking_status_date_idx'),
+        ]
 
     def __str__(self):
         return f"Booking {self.booking_id} - {self.user.email}"
 
+    def get_rollup_state(self):
+        """Return the (date, venue_id, status, total_price) counted in analytics rollups, or None if unsaved"""
+        if self.booking_date is None:
+            return None
+        return (timezone.localdate(self.booking_date), self.venue_id, self.status, self.total_price)
+
     def get_earliest_service_datetime(self):
         """Get the earliest service datetime for this booking"""
         earliest_item = self.items.order_by('date', 'time_slot').first()
@@ -201,19 +223,77 @@ class ServiceAvailability(models.Model):
 
     def increment_bookings(self):
         """Increment the number of bookings for this time slot"""
-        if not self.is_fully_booked():
-            self.current_bookings += 1
-            if self.current_bookings >= self.max_bookings:
-                self.is_available = False
-            self.save()
+        if self._reserve_places(ServiceAvailability.objects.filter(pk=self.pk)):
+            self.refresh_from_db(fields=['current_bookings', 'is_available'])
             return True
         return False
 
     def decrement_bookings(self):
         """Decrement the number of bookings for this time slot"""
-        if self.current_bookings > 0:
-            self.current_bookings -= 1
-            self.is_available = True
-            self.save()
+        if self._release_places(ServiceAvailability.objects.filter(pk=self.pk)):
+            self.refresh_from_db(fields=['current_bookings', 'is_available'])
             return True
         return False
+
+    @classmethod
+    def reserve(cls, service, date, time_slot, quantity=1):
+        """
+        Atomically reserve places in a time slot with a single conditional UPDATE.
+        The slot is created with the default capacity if it does not exist yet.
+        Returns True if the places were reserved, False if the slot is unavailable or full
+        """
+        service_id = getattr(service, 'pk', service)
+        slot = cls.objects.filter(service_id=service_id, date=date, time_slot=time_slot)
+        if cls._reserve_places(slot, quantity):
+            return True
+
+        # Another request may have created the slot in the meantime, so retry either way
+        cls.objects.get_or_create(
+            service_id=service_id,
+            date=date,
+            time_slot=time_slot,
+            defaults={
+                'max_bookings': 10,
+                'current_bookings': 0,
+                'is_available': True
+            }
+        )
+        return bool(cls._reserve_places(slot, quantity))
+
+    @classmethod
+    def release(cls, service, date, time_slot, quantity=1):
+        """
+        Atomically release places in a time slot with a single UPDATE.
+        Returns True if a booked slot was released
+        """
+        service_id = getattr(service, 'pk', service)
+        slot = cls.objects.filter(service_id=service_id, date=date, time_slot=time_slot)
+        return bool(cls._release_places(slot, quantity))
+
+    @staticmethod
+    def _reserve_places(queryset, quantity=1):
+        """
+        Increment current_bookings only where current_bookings + quantity <= max_bookings.
+        The slot is marked unavailable once it becomes full. Returns the affected row count
+        """
+        return queryset.filter(
+            is_available=True,
+            current_bookings__lte=F('max_bookings') - quantity
+        ).update(
+            current_bookings=F('current_bookings') + quantity,
+            is_available=Case(
+                When(current_bookings__gte=F('max_bookings') - quantity, then=Value(False)),
+                default=Value(True)
+            )
+        )
+
+    @staticmethod
+    def _release_places(queryset, quantity=1):
+        """
+        Decrement current_bookings without going below zero and reopen the slot.
+        Returns the affected row count
+        """
+        return queryset.filter(current_bookings__gt=0).update(
+            current_bookings=Greatest(F('current_bookings') - quantity, Value(0)),
+            is_available=True
+        )
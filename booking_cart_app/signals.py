@@ -1,8 +1,11 @@
 from django.db.models.signals import post_save, post_delete
+from django.db import transaction
 from django.dispatch import receiver
 from django.utils import timezone
+from functools import partial
 
-from .models import Booking, BookingItem, ServiceAvailability
+from .models import Booking, BookingItem, CartItem, ServiceAvailability
+from .utils import invalidate_cart_summary
 
 
 @receiver(post_save, sender=BookingItem)
@@ -11,23 +14,9 @@ def update_service_availability_on_booking_item_create(sender, instance, created
     Update service availability when a booking item is created
     """
     if created and instance.booking.status in ['pending', 'confirmed']:
-        try:
-            availability = ServiceAvailability.objects.get(
-                service=instance.service,
-                date=instance.date,
-                time_slot=instance.time_slot
-            )
-            availability.increment_bookings()
-        except ServiceAvailability.DoesNotExist:
-            # Create availability if it doesn't exist
-            availability = ServiceAvailability.objects.create(
-                service=instance.service,
-                date=instance.date,
-                time_slot=instance.time_slot,
-                max_bookings=10,
-                current_bookings=1,
-                is_available=True
-            )
+        ServiceAvailability.reserve(
+            instance.service_id, instance.date, instance.time_slot, instance.quantity
+        )
 
 
 @receiver(post_delete, sender=BookingItem)
@@ -35,15 +24,9 @@ def update_service_availability_on_booking_item_delete(sender, instance, **kwarg
     """
     Update service availability when a booking item is deleted
     """
-    try:
-        availability = ServiceAvailability.objects.get(
-            service=instance.service,
-            date=instance.date,
-            time_slot=instance.time_slot
-        )
-        availability.decrement_bookings()
-    except ServiceAvailability.DoesNotExist:
-        pass
+    ServiceAvailability.release(
+        instance.service_id, instance.date, instance.time_slot, instance.quantity
+    )
 
 
 @receiver(post_save, sender=Booking)
@@ -58,36 +41,21 @@ def update_service_availability_on_booking_status_change(sender, instance, **kwa
     if old_status and instance.status != old_status:
         # If booking was active and now is cancelled/completed
         if old_status in ['pending', 'confirmed'] and instance.status in ['cancelled', 'completed', 'disputed', 'no_show']:
-            # Decrement availability for all booking items
+            # Release availability for all booking items
             for item in instance.items.all():
-                try:
-                    availability = ServiceAvailability.objects.get(
-                        service=item.service,
-                        date=item.date,
-                        time_slot=item.time_slot
-                    )
-                    availability.decrement_bookings()
-                except ServiceAvailability.DoesNotExist:
-                    pass
+                ServiceAvailability.release(item.service_id, item.date, item.time_slot, item.quantity)
         
         # If booking was cancelled/completed and now is active again
         elif old_status in ['cancelled', 'completed', 'disputed', 'no_show'] and instance.status in ['pending', 'confirmed']:
-            # Increment availability for all booking items
+            # Reserve availability for all booking items
             for item in instance.items.all():
-                try:
-                    availability = ServiceAvailability.objects.get(
-                        service=item.service,
-                        date=item.date,
-                        time_slot=item.time_slot
-                    )
-                    availability.increment_bookings()
-                except ServiceAvailability.DoesNotExist:
-                    # Create availability if it doesn't exist
-                    availability = ServiceAvailability.objects.create(
-                        service=item.service,
-                        date=item.date,
-                        time_slot=item.time_slot,
-                        max_bookings=10,
-                        current_bookings=1,
-                        is_available=True
-                    )
+                ServiceAvailability.reserve(item.service_id, item.date, item.time_slot, item.quantity)
+
+
+@receiver(post_save, sender=CartItem)
+@receiver(post_delete, sender=CartItem)
+def invalidate_cart_summary_on_cart_change(sender, instance, **kwargs):
+    """
+    Discard the owner's cached cart summary once a cart item change is committed
+    """
+    transaction.on_commit(partial(invalidate_cart_summary, instance.user_id))
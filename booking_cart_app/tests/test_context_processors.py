@@ -1,4 +1,4 @@
-from django.test import TestCase, RequestFactory
+from django.test import TestCase, RequestFactory, override_settings
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 from decimal import Decimal
@@ -6,7 +6,7 @@ from datetime import timedelta
 
 from venues_app.models import Category, Venue, Service
 from booking_cart_app.models import CartItem
-from booking_cart_app.context_processors import cart_count
+from booking_cart_app.context_processors import cart_context as cart_count
 
 User = get_user_model()
 
@@ -112,3 +112,35 @@ class ContextProcessorsTest(TestCase):
         # Check the context
         self.assertIn('cart_count', context)
         self.assertEqual(context['cart_count'], 0)  # No cart items
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    def test_cart_context_is_lazy_and_cached(self):
+        """Test that cart values are computed on first use and served from the per-user cache"""
+        self.service.discounted_price = Decimal("80.00")
+        self.service.save()
+
+        request = self.factory.get('/')
+        request.user = self.customer
+
+        # Nothing is queried until a template uses a value
+        with self.assertNumQueries(0):
+            context = cart_count(request)
+
+        # Count and total come from one aggregate query, memoized for the request
+        with self.assertNumQueries(1):
+            self.assertEqual(context['cart_count'], 2)
+            self.assertEqual(context['cart_total'], Decimal("240.00"))
+            self.assertEqual(cart_count(request)['cart_count'], 2)
+
+        # Later requests use the cached summary until the cart changes
+        request = self.factory.get('/')
+        request.user = self.customer
+        with self.assertNumQueries(0):
+            self.assertEqual(cart_count(request)['cart_count'], 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.cart_item2.delete()
+        request = self.factory.get('/')
+        request.user = self.customer
+        self.assertEqual(cart_count(request)['cart_count'], 1)
+        self.assertEqual(cart_count(request)['cart_total'], Decimal("80.00"))
@@ -4,6 +4,7 @@ from django.utils import timezone
 from django.core.exceptions import ValidationError
 from decimal import Decimal
 from datetime import timedelta
+from unittest.mock import patch
 
 from venues_app.models import Category, Venue, Service
 from booking_cart_app.models import CartItem, Booking, BookingItem, ServiceAvailability
@@ -534,3 +535,66 @@ class ServiceAvailabilityModelTest(TestCase):
         result = self.availability.decrement_bookings()
         self.assertFalse(result)
         self.assertEqual(self.availability.current_bookings, 0)
+    
+    def test_reserve(self):
+        """Test reserving places with a conditional update"""
+        date = self.availability.date
+        time_slot = self.availability.time_slot
+        
+        # Reserve two places
+        self.assertTrue(ServiceAvailability.reserve(self.service, date, time_slot, 2))
+        self.availability.refresh_from_db()
+        self.assertEqual(self.availability.current_bookings, 2)
+        self.assertTrue(self.availability.is_available)
+        
+        # Not enough places left for two more
+        self.assertFalse(ServiceAvailability.reserve(self.service, date, time_slot, 2))
+        self.availability.refresh_from_db()
+        self.assertEqual(self.availability.current_bookings, 2)
+        
+        # Last place fills the slot
+        self.assertTrue(ServiceAvailability.reserve(self.service.id, date, time_slot))
+        self.availability.refresh_from_db()
+        self.assertEqual(self.availability.current_bookings, 3)
+        self.assertFalse(self.availability.is_available)
+    
+    def test_reserve_creates_missing_slot(self):
+        """Test reserving a slot that has no availability record yet"""
+        date = self.availability.date + timedelta(days=1)
+        time_slot = self.availability.time_slot
+        
+        self.assertTrue(ServiceAvailability.reserve(self.service, date, time_slot))
+        availability = ServiceAvailability.objects.get(service=self.service, date=date, time_slot=time_slot)
+        self.assertEqual(availability.max_bookings, 10)
+        self.assertEqual(availability.current_bookings, 1)
+    
+    def test_reserve_slot_created_concurrently(self):
+        """Test reserving a missing slot that another request creates first"""
+        date = self.availability.date + timedelta(days=1)
+        time_slot = self.availability.time_slot
+        
+        def create_concurrently(**kwargs):
+            defaults = kwargs.pop('defaults')
+            return ServiceAvailability.objects.create(**kwargs, **defaults), False
+        
+        with patch('django.db.models.query.QuerySet.get_or_create', side_effect=create_concurrently):
+            self.assertTrue(ServiceAvailability.reserve(self.service, date, time_slot))
+        availability = ServiceAvailability.objects.get(service=self.service, date=date, time_slot=time_slot)
+        self.assertEqual(availability.current_bookings, 1)
+    
+    def test_release(self):
+        """Test releasing places never goes below zero"""
+        date = self.availability.date
+        time_slot = self.availability.time_slot
+        ServiceAvailability.reserve(self.service, date, time_slot, 3)
+        
+        self.assertTrue(ServiceAvailability.release(self.service, date, time_slot, 2))
+        self.availability.refresh_from_db()
+        self.assertEqual(self.availability.current_bookings, 1)
+        self.assertTrue(self.availability.is_available)
+        
+        self.assertTrue(ServiceAvailability.release(self.service, date, time_slot, 2))
+        self.availability.refresh_from_db()
+        self.assertEqual(self.availability.current_bookings, 0)
+        
+        self.assertFalse(ServiceAvailability.release(self.service, date, time_slot))
@@ -3,11 +3,12 @@ from django.urls import reverse
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 from decimal import Decimal
-from datetime import timedelta
+from datetime import time, timedelta
 import uuid
 
 from venues_app.models import Category, Venue, Service
 from booking_cart_app.models import CartItem, Booking, BookingItem, ServiceAvailability
+from booking_cart_app.utils import bulk_set_service_availability
 from booking_cart_app.forms import (
     AddToCartForm, UpdateCartItemForm, CheckoutForm,
     BookingCancellationForm, ServiceAvailabilityForm, DateRangeAvailabilityForm
@@ -248,6 +249,69 @@ class CustomerViewsTest(TestCase):
         self.assertIn('venues', response.context)
         self.assertIn('total_price', response.context)
 
+    def test_checkout_view_post(self):
+        """Test the checkout view POST request with items from two venues"""
+        from payments_app.models import CheckoutSession, Invoice
+
+        # Login as customer
+        self.client.login(username='customer@example.com', password='testpass123')
+
+        # Add a service from a second venue to the cart
+        other_venue = Venue.objects.create(
+            owner=self.provider,
+            name="Other Spa",
+            category=self.category,
+            venue_type="all",
+            state="New York",
+            county="New York County",
+            city="New York",
+            street_number="456",
+            street_name="Side St",
+            about="Another spa.",
+            approval_status="approved"
+        )
+        other_service = Service.objects.create(
+            venue=other_venue,
+            title="Facial",
+            short_description="A refreshing facial.",
+            price=Decimal("50.00"),
+            duration=30,
+            is_active=True
+        )
+        CartItem.objects.create(
+            user=self.customer,
+            service=other_service,
+            quantity=2,
+            date=timezone.now().date() + timedelta(days=2),
+            time_slot='11:00',
+            expires_at=timezone.now() + timedelta(hours=24)
+        )
+
+        # Complete checkout
+        response = self.client.post(self.checkout_url, {'notes': 'See you soon'})
+
+        # Check that one booking per venue was created in a single checkout session
+        checkout_session = CheckoutSession.objects.get(user=self.customer)
+        bookings = Booking.objects.filter(checkout_session_booking__checkout_session=checkout_session)
+        self.assertEqual(bookings.count(), 2)
+        self.assertRedirects(
+            response,
+            reverse('payments_app:payment_process_with_session', kwargs={
+                'booking_id': bookings.get(venue=self.venue).booking_id,
+                'checkout_session_id': checkout_session.session_id,
+            }),
+            fetch_redirect_response=False
+        )
+        self.assertEqual(bookings.get(venue=other_venue).total_price, Decimal("100.00"))
+        self.assertEqual(BookingItem.objects.filter(booking__in=bookings).count(), 2)
+        self.assertEqual(Invoice.objects.filter(booking__in=bookings).count(), 2)
+        self.assertEqual(checkout_session.total_amount, Decimal("200.00"))
+
+        # Check that the cart was cleared and the slots were reserved once
+        self.assertFalse(CartItem.objects.filter(user=self.customer).exists())
+        other_availability = ServiceAvailability.objects.get(service=other_service)
+        self.assertEqual(other_availability.current_bookings, 2)
+
     def test_checkout_with_empty_cart(self):
         """Test the checkout view with an empty cart"""
         # Login as customer
@@ -433,6 +497,56 @@ class ProviderViewsTest(TestCase):
         self.assertEqual(len(response.context['bookings']), 1)
         self.assertEqual(response.context['bookings'][0], self.booking)
 
+    def test_provider_booking_list_pages(self):
+        """Test the keyset pagination behind the provider booking list"""
+        from booking_cart_app.utils import get_booking_list, get_booking_list_page
+
+        for _ in range(4):
+            booking = Booking.objects.create(
+                user=self.customer,
+                venue=self.venue,
+                total_price=Decimal("100.00"),
+                status='confirmed'
+            )
+            BookingItem.objects.create(
+                booking=booking,
+                service=self.service,
+                service_title=self.service.title,
+                service_price=self.service.price,
+                quantity=1,
+                date=timezone.now().date(),
+                time_slot=timezone.now().time().replace(hour=11, minute=0)
+            )
+        # Equal booking dates are ordered by id
+        Booking.objects.update(booking_date=timezone.now())
+        expected = list(Booking.objects.order_by('-id'))
+
+        bookings = get_booking_list(owner=self.provider)
+        with self.assertNumQueries(2):
+            first_page = get_booking_list_page(bookings, page_size=2)
+            for booking in first_page['bookings']:
+                list(booking.items.all())
+                booking.user.email
+                booking.venue.name
+        self.assertEqual(first_page['bookings'], expected[:2])
+        self.assertIsNone(first_page['previous_cursor'])
+
+        second_page = get_booking_list_page(bookings, after=first_page['next_cursor'], page_size=2)
+        self.assertEqual(second_page['bookings'], expected[2:4])
+        last_page = get_booking_list_page(bookings, after=second_page['next_cursor'], page_size=2)
+        self.assertEqual(last_page['bookings'], expected[4:])
+        self.assertIsNone(last_page['next_cursor'])
+
+        previous_page = get_booking_list_page(bookings, before=second_page['previous_cursor'], page_size=2)
+        self.assertEqual(previous_page['bookings'], expected[:2])
+        self.assertIsNone(previous_page['previous_cursor'])
+
+        # Filters and invalid cursors
+        self.assertEqual(list(get_booking_list(owner=self.provider, status='pending')), [self.booking])
+        self.assertEqual(len(get_booking_list(owner=self.provider, date_filter='today')), 4)
+        self.assertEqual(list(get_booking_list(owner=self.customer)), [])
+        self.assertEqual(get_booking_list_page(bookings, after='invalid', page_size=2)['bookings'], expected[:2])
+
     def test_provider_booking_detail_view(self):
         """Test the provider_booking_detail view"""
         # Login as provider
@@ -539,6 +653,50 @@ class ProviderViewsTest(TestCase):
         self.assertIn('form', response.context)
         self.assertEqual(response.context['service'], self.service)
 
+    def test_provider_bulk_availability_view_post(self):
+        """Test the provider_bulk_availability view POST request"""
+        # Login as provider
+        self.client.login(username='provider@example.com', password='testpass123')
+
+        # Existing slot on the generated grid with bookings already taken
+        start_date = timezone.now().date() + timedelta(days=1)
+        existing = ServiceAvailability.objects.create(
+            service=self.service,
+            date=start_date,
+            time_slot='10:00',
+            max_bookings=3,
+            current_bookings=2,
+            is_available=True
+        )
+
+        # Post a three day range with three hourly slots per day
+        data = {
+            'start_date': start_date.isoformat(),
+            'end_date': (start_date + timedelta(days=2)).isoformat(),
+            'start_time': '09:00',
+            'end_time': '12:00',
+            'interval': 60,
+            'max_bookings': 5,
+            'is_available': True
+        }
+        response = self.client.post(self.provider_bulk_availability_url, data)
+
+        # Check response
+        self.assertRedirects(response, self.provider_service_availability_url, fetch_redirect_response=False)
+
+        # Check that the missing slots were created and the existing one updated
+        self.assertEqual(ServiceAvailability.objects.filter(service=self.service, max_bookings=5).count(), 9)
+        existing.refresh_from_db()
+        self.assertEqual(existing.max_bookings, 5)
+        self.assertEqual(existing.current_bookings, 2)
+
+        # Unchanged slots are not counted as updated
+        counts = bulk_set_service_availability(
+            self.service, start_date, start_date + timedelta(days=2),
+            time(9, 0), time(12, 0), 60, 5
+        )
+        self.assertEqual(counts, (0, 0))
+
     def test_provider_delete_availability_view(self):
         """Test the provider_delete_availability view"""
         # Login as provider
@@ -1,7 +1,13 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
 from django.utils import timezone
-from datetime import timedelta
-from django.db.models import Q
-from .models import CartItem, Booking, ServiceAvailability
+from datetime import datetime, time, timedelta
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Case, Count, DecimalField, Exists, F, Min, OuterRef, Q, Sum, When
+from .models import CartItem, Booking, BookingItem, ServiceAvailability
+
+# Lifetime of the per-user cart summary shown in page headers, in seconds
+CART_SUMMARY_TIMEOUT = 60
 
 def clean_expired_cart_items():
     """
@@ -32,6 +38,52 @@ def get_cart_total(user):
     cart_items = get_cart_items_for_user(user)
     return sum(item.get_total_price() for item in cart_items)
 
+def get_cart_summary_cache_key(user_id):
+    """
+    Get the cache key of a user's cart summary
+    """
+    return f'booking_cart_app:cart_summary:{user_id}'
+
+def get_cart_summary(user):
+    """
+    Get the number of active cart items and their total price with one aggregate query.
+    The summary is cached per user until the cart changes, the first item expires or
+    CART_SUMMARY_TIMEOUT passes, whichever comes first.
+    Returns a dictionary with count and total
+    """
+    if user is None or not user.is_authenticated or not hasattr(user, 'is_customer') or not user.is_customer:
+        return {'count': 0, 'total': 0}
+
+    key = get_cart_summary_cache_key(user.id)
+    summary = cache.get(key)
+    if summary is None:
+        now = timezone.now()
+        # Same price as CartItem.get_total_price: the discounted price when one is set
+        unit_price = Case(
+            When(service__discounted_price__gt=0, then=F('service__discounted_price')),
+            default=F('service__price'),
+            output_field=DecimalField(max_digits=10, decimal_places=2)
+        )
+        summary = CartItem.objects.filter(user=user, expires_at__gt=now).aggregate(
+            count=Count('id'),
+            total=Sum(unit_price * F('quantity'), output_field=DecimalField(max_digits=12, decimal_places=2)),
+            next_expiry=Min('expires_at')
+        )
+        next_expiry = summary.pop('next_expiry')
+        summary['total'] = summary['total'] or 0
+
+        timeout = CART_SUMMARY_TIMEOUT
+        if next_expiry is not None:
+            timeout = max(1, min(timeout, int((next_expiry - now).total_seconds())))
+        cache.set(key, summary, timeout)
+    return summary
+
+def invalidate_cart_summary(user_id):
+    """
+    Discard a user's cached cart summary
+    """
+    cache.delete(get_cart_summary_cache_key(user_id))
+
 def get_bookings_for_customer(user, status=None):
     """
     Get bookings for a customer, optionally filtered by status
@@ -53,16 +105,12 @@ def get_bookings_for_provider(user, status=None):
     if not user.is_authenticated or not hasattr(user, 'is_service_provider') or not user.is_service_provider:
         return Booking.objects.none()
     
-    # Get all venues owned by the service provider
-    from venues_app.models import Venue
-    venues = Venue.objects.filter(owner=user)
-    
-    bookings = Booking.objects.filter(venue__in=venues)
+    bookings = Booking.objects.filter(venue__owner=user)
     
     if status:
         bookings = bookings.filter(status=status)
     
-    return bookings.order_by('-booking_date')
+    return bookings.order_by('-booking_date', '-id')
 
 def get_upcoming_bookings_for_provider(user, days=7):
     """
@@ -79,6 +127,110 @@ def get_upcoming_bookings_for_provider(user, days=7):
         items__date__lte=end_date
     ).distinct()
 
+# Number of bookings shown per page of the provider and admin booking lists
+BOOKING_LIST_PAGE_SIZE = 25
+
+# Appointment date filters offered by the booking lists
+BOOKING_DATE_FILTERS = ('today', 'tomorrow', 'week', 'month')
+
+def get_booking_date_range(date_filter):
+    """
+    Get the appointment date range of a booking list date filter
+    Returns a tuple (start_date, end_date), or None for an unknown filter
+    """
+    today = timezone.localdate()
+    if date_filter == 'today':
+        return today, today
+    if date_filter == 'tomorrow':
+        tomorrow = today + timedelta(days=1)
+        return tomorrow, tomorrow
+    if date_filter == 'week':
+        start_date = today - timedelta(days=today.weekday())
+        return start_date, start_date + timedelta(days=6)
+    if date_filter == 'month':
+        start_date = today.replace(day=1)
+        next_month = (start_date + timedelta(days=32)).replace(day=1)
+        return start_date, next_month - timedelta(days=1)
+    return None
+
+def get_booking_list(owner=None, status=None, venue_id=None, date_filter=None):
+    """
+    Get bookings for the provider and admin booking lists, newest first.
+    Venue and customer are joined and items prefetched, so rendering a page costs a
+    fixed number of queries. Owner, venue and status filters use the (venue|status,
+    booking_date, id) indexes; the date filter matches bookings with an item on those days.
+    """
+    bookings = Booking.objects.select_related('venue', 'user').prefetch_related('items')
+
+    if owner is not None:
+        bookings = bookings.filter(venue__owner=owner)
+    if venue_id:
+        bookings = bookings.filter(venue_id=venue_id)
+    if status:
+        bookings = bookings.filter(status=status)
+
+    date_range = get_booking_date_range(date_filter)
+    if date_range:
+        bookings = bookings.filter(
+            Exists(BookingItem.objects.filter(booking=OuterRef('pk'), date__range=date_range))
+        )
+
+    return bookings.order_by('-booking_date', '-id')
+
+def encode_booking_cursor(booking):
+    """
+    Encode the (booking_date, id) position of a booking as an opaque URL-safe cursor
+    """
+    position = f'{booking.booking_date.isoformat()}|{booking.id}'
+    return urlsafe_b64encode(position.encode()).decode().rstrip('=')
+
+def decode_booking_cursor(cursor):
+    """
+    Decode a cursor made by encode_booking_cursor()
+    Returns a tuple (booking_date, id), or None if the cursor is invalid
+    """
+    try:
+        position = urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        booking_date, booking_id = position.split('|')
+        return datetime.fromisoformat(booking_date), int(booking_id)
+    except (TypeError, ValueError):
+        return None
+
+def get_booking_list_page(bookings, after=None, before=None, page_size=BOOKING_LIST_PAGE_SIZE):
+    """
+    Get one page of a get_booking_list() queryset by keyset pagination on (booking_date, id).
+    Pages start after or end before the booking a cursor points at, so deep pages cost the
+    same as the first one instead of scanning every skipped row as OFFSET does.
+    Returns a dictionary with the page's bookings and the next/previous cursors (None at either end)
+    """
+    after = decode_booking_cursor(after) if after else None
+    before = decode_booking_cursor(before) if before else None
+
+    if before:
+        booking_date, booking_id = before
+        page = list(bookings.filter(
+            Q(booking_date__gt=booking_date) | Q(booking_date=booking_date, id__gt=booking_id)
+        ).order_by('booking_date', 'id')[:page_size + 1])
+        has_previous = len(page) > page_size
+        page = page[:page_size][::-1]
+        has_next = True
+    else:
+        if after:
+            booking_date, booking_id = after
+            bookings = bookings.filter(
+                Q(booking_date__lt=booking_date) | Q(booking_date=booking_date, id__lt=booking_id)
+            )
+        page = list(bookings[:page_size + 1])
+        has_next = len(page) > page_size
+        page = page[:page_size]
+        has_previous = after is not None
+
+    return {
+        'bookings': page,
+        'next_cursor': encode_booking_cursor(page[-1]) if page and has_next else None,
+        'previous_cursor': encode_booking_cursor(page[0]) if page and has_previous else None,
+    }
+
 def check_service_availability(service, date, time_slot, quantity=1):
     """
     Check if a service is available for the specified date, time, and quantity
@@ -126,6 +278,257 @@ def check_service_availability(service, date, time_slot, quantity=1):
     except Exception as e:
         return False, f"Error checking availability: {str(e)}", None
 
+def generate_time_slots(start_time, end_time, interval):
+    """
+    Generate the time slots between start_time (inclusive) and end_time (exclusive)
+    spaced interval minutes apart. Slots never wrap past midnight.
+    """
+    slots = []
+    if interval <= 0:
+        return slots
+    current_minutes = start_time.hour * 60 + start_time.minute
+    end_minutes = end_time.hour * 60 + end_time.minute
+    while current_minutes < end_minutes and current_minutes < 24 * 60:
+        hours, minutes = divmod(current_minutes, 60)
+        slots.append(time(hour=hours, minute=minutes))
+        current_minutes += interval
+    return slots
+
+def bulk_set_service_availability(service, start_date, end_date, start_time, end_time,
+                                  interval, max_bookings, is_available=True, batch_size=500):
+    """
+    Create or update availability records for every date and time slot in a range.
+    The whole slot grid is built in memory, existing records are fetched with a single
+    query and the rest is written with batched bulk_create/bulk_update in one transaction.
+    Returns a tuple (created_count, updated_count)
+    """
+    time_slots = generate_time_slots(start_time, end_time, interval)
+    if not time_slots or end_date < start_date:
+        return 0, 0
+
+    dates = [start_date + timedelta(days=offset) for offset in range((end_date - start_date).days + 1)]
+
+    with transaction.atomic():
+        existing = {
+            (availability.date, availability.time_slot): availability
+            for availability in ServiceAvailability.objects.select_for_update().filter(
+                service=service,
+                date__gte=start_date,
+                date__lte=end_date,
+                time_slot__in=time_slots
+            ).only('id', 'date', 'time_slot', 'max_bookings', 'is_available')
+        }
+
+        to_create = []
+        to_update = []
+        for date in dates:
+            for time_slot in time_slots:
+                availability = existing.get((date, time_slot))
+                if availability is None:
+                    to_create.append(ServiceAvailability(
+                        service=service,
+                        date=date,
+                        time_slot=time_slot,
+                        max_bookings=max_bookings,
+                        current_bookings=0,
+                        is_available=is_available
+                    ))
+                elif availability.max_bookings != max_bookings or availability.is_available != is_available:
+                    availability.max_bookings = max_bookings
+                    availability.is_available = is_available
+                    to_update.append(availability)
+
+        ServiceAvailability.objects.bulk_create(to_create, batch_size=batch_size)
+        ServiceAvailability.objects.bulk_update(
+            to_update, ['max_bookings', 'is_available'], batch_size=batch_size
+        )
+
+    return len(to_create), len(to_update)
+
+def get_checkout_items_for_user(user):
+    """
+    Get active cart items for checkout with their services and venues joined
+    """
+    return get_cart_items_for_user(user).select_related('service', 'service__venue')
+
+def apply_cart_item_prices(cart_items):
+    """
+    Apply the precomputed effective price of each service to a list of cart items
+    Returns the cart items as a list
+    """
+    from discount_app.utils import apply_effective_prices
+
+    cart_items = list(cart_items)
+    apply_effective_prices([item.service for item in cart_items])
+    return cart_items
+
+def check_cart_availability(cart_items):
+    """
+    Check availability for a list of cart items in a single query.
+    Mirrors check_service_availability without creating missing availability records.
+    Returns a list of (cart_item, message) tuples for the items that cannot be booked
+    """
+    cart_items = list(cart_items)
+    if not cart_items:
+        return []
+
+    availability_map = {
+        (availability.service_id, availability.date, availability.time_slot): availability
+        for availability in ServiceAvailability.objects.filter(
+            service_id__in={item.service_id for item in cart_items},
+            date__in={item.date for item in cart_items}
+        )
+    }
+
+    today = timezone.now().date()
+    unavailable = []
+    for item in cart_items:
+        service = item.service
+        availability = availability_map.get((item.service_id, item.date, item.time_slot))
+        max_bookings = availability.max_bookings if availability else 10
+        current_bookings = availability.current_bookings if availability else 0
+
+        if item.date < today:
+            message = "Cannot book services for past dates"
+        elif not service.is_active:
+            message = "This service is not currently available"
+        elif not service.venue.is_active or service.venue.approval_status != 'approved':
+            message = "This venue is not currently available"
+        elif availability and not availability.is_available:
+            message = "This service is not available at the selected time"
+        elif current_bookings >= max_bookings:
+            message = "This service is fully booked for the selected time"
+        elif current_bookings + item.quantity > max_bookings:
+            message = f"Only {max_bookings - current_bookings} slots available"
+        else:
+            continue
+        unavailable.append((item, message))
+
+    return unavailable
+
+def group_cart_items_by_venue(cart_items):
+    """
+    Group cart items by venue
+    Returns a list of dictionaries with venue, items and total keys
+    """
+    venues_dict = {}
+    for item in cart_items:
+        venue = item.service.venue
+        if venue.id not in venues_dict:
+            venues_dict[venue.id] = {
+                'venue': venue,
+                'items': [],
+                'total': 0,
+            }
+
+        venues_dict[venue.id]['items'].append(item)
+        venues_dict[venue.id]['total'] += item.get_total_price()
+
+    return list(venues_dict.values())
+
+def create_bookings_from_checkout(user, venues, notes=''):
+    """
+    Create one booking per venue for the grouped cart items using bulk inserts.
+    Slots are reserved atomically, discount usage is resolved by discount id and
+    the checked out cart items are deleted with a single statement.
+    Must be called inside a transaction; raises ValueError if a slot is fully booked.
+    Returns a tuple (checkout_session, bookings)
+    """
+    from payments_app.models import CheckoutSession, CheckoutSessionBooking, Invoice
+    from discount_app.models import DiscountUsage
+    from admin_app.utils import record_bookings
+    from dashboard_app.utils import invalidate_provider_snapshots
+
+    checkout_session = CheckoutSession.objects.create(
+        user=user,
+        total_amount=sum(venue_data['total'] for venue_data in venues)
+    )
+
+    # Reserve every slot before writing anything else
+    for venue_data in venues:
+        for cart_item in venue_data['items']:
+            if not ServiceAvailability.reserve(
+                cart_item.service_id, cart_item.date, cart_item.time_slot, cart_item.quantity
+            ):
+                raise ValueError(
+                    f"Service '{cart_item.service.title}' is fully booked for the selected time"
+                )
+
+    # Bookings are confirmed immediately for the MVP
+    bookings = Booking.objects.bulk_create([
+        Booking(
+            user=user,
+            venue=venue_data['venue'],
+            total_price=venue_data['total'],
+            status='confirmed',
+            notes=notes
+        )
+        for venue_data in venues
+    ])
+
+    # bulk_create skips the post_save receivers that normally update the analytics rollups
+    # and the providers' dashboard snapshots
+    record_bookings(bookings)
+    owner_ids = {venue_data['venue'].owner_id for venue_data in venues}
+    transaction.on_commit(lambda: invalidate_provider_snapshots(owner_ids))
+
+    CheckoutSessionBooking.objects.bulk_create([
+        CheckoutSessionBooking(checkout_session=checkout_session, booking=booking)
+        for booking in bookings
+    ])
+
+    # bulk_create skips the post_save receiver that normally creates invoices
+    due_date = timezone.now() + timedelta(hours=24)
+    Invoice.objects.bulk_create([
+        Invoice(
+            user=user,
+            booking=booking,
+            amount=booking.total_price,
+            status='pending',
+            due_date=due_date
+        )
+        for booking in bookings
+    ])
+
+    booking_items = []
+    discount_usages = []
+    for booking, venue_data in zip(bookings, venues):
+        for cart_item in venue_data['items']:
+            service = cart_item.service
+            booking_items.append(BookingItem(
+                booking=booking,
+                service=service,
+                service_title=service.title,
+                service_price=service.discounted_price or service.price,
+                quantity=cart_item.quantity,
+                date=cart_item.date,
+                time_slot=cart_item.time_slot
+            ))
+
+            # Record discount usage if applicable
+            discount_info = getattr(service, 'discount_info', None)
+            if service.discounted_price and discount_info and discount_info.get('id'):
+                discount_usages.append(DiscountUsage(
+                    user=user,
+                    discount_type=discount_info['model'],
+                    discount_id=discount_info['id'],
+                    booking=booking,
+                    original_price=discount_info['original_price'],
+                    discount_amount=discount_info['amount'],
+                    final_price=discount_info['final_price']
+                ))
+
+    BookingItem.objects.bulk_create(booking_items)
+    if discount_usages:
+        DiscountUsage.objects.bulk_create(discount_usages)
+
+    CartItem.objects.filter(
+        user=user,
+        id__in=[item.id for venue_data in venues for item in venue_data['items']]
+    ).delete()
+
+    return checkout_session, bookings
+
 def get_booking_analytics():
     """
     Get booking analytics data
@@ -9,16 +9,18 @@ from django.urls import reverse
 from datetime import timedelta
 
 from venues_app.models import Service, Venue
-from .models import CartItem, Booking, BookingItem, ServiceAvailability
-from payments_app.models import CheckoutSession, CheckoutSessionBooking
+from .models import CartItem, Booking, ServiceAvailability
 from .forms import (
     AddToCartForm, UpdateCartItemForm, CheckoutForm,
     BookingCancellationForm, ServiceAvailabilityForm, DateRangeAvailabilityForm
 )
 from .utils import (
-    clean_expired_cart_items, get_cart_items_for_user, get_cart_total,
+    clean_expired_cart_items,
     get_bookings_for_customer, get_bookings_for_provider, get_upcoming_bookings_for_provider,
-    check_service_availability, get_booking_analytics
+    get_booking_list, get_booking_list_page,
+    check_service_availability, get_booking_analytics, bulk_set_service_availability,
+    get_checkout_items_for_user, check_cart_availability, group_cart_items_by_venue,
+    create_bookings_from_checkout, apply_cart_item_prices
 )
 
 # Try to import notification utilities if available
@@ -126,11 +128,11 @@ def cart_view(request):
     if expired_count > 0:
         messages.info(request, f"{expired_count} expired item(s) removed from your cart.")
 
-    # Get active cart items
-    cart_items = get_cart_items_for_user(request.user)
+    # Get active cart items with their precomputed effective prices
+    cart_items = apply_cart_item_prices(get_checkout_items_for_user(request.user))
 
     # Calculate total price
-    total_price = get_cart_total(request.user)
+    total_price = sum(item.get_total_price() for item in cart_items)
 
     context = {
         'cart_items': cart_items,
@@ -217,42 +219,23 @@ def checkout(request):
     # Clean expired cart items
     clean_expired_cart_items()
 
-    # Get active cart items
-    cart_items = get_cart_items_for_user(request.user)
+    # Get active cart items with services, venues and effective prices
+    cart_items = apply_cart_item_prices(get_checkout_items_for_user(request.user))
 
     # Check if cart is empty
-    if not cart_items.exists():
+    if not cart_items:
         messages.error(request, "Your cart is empty.")
         return redirect('booking_cart_app:cart')
 
-    # Group cart items by venue
-    venues_dict = {}
-    for item in cart_items:
-        # Verify service is still available
-        is_available, message, _ = check_service_availability(
-            item.service, item.date, item.time_slot, item.quantity
-        )
-
-        if not is_available:
-            messages.error(request, f"Service '{item.service.title}' is no longer available: {message}")
-            return redirect('booking_cart_app:cart')
-
-        venue = item.service.venue
-        if not venue:
-            messages.error(request, f"Service '{item.service.title}' has no associated venue.")
-            return redirect('booking_cart_app:cart')
-
-        if venue.id not in venues_dict:
-            venues_dict[venue.id] = {
-                'venue': venue,
-                'items': [],
-                'total': 0,
-            }
-
-        venues_dict[venue.id]['items'].append(item)
-        venues_dict[venue.id]['total'] += item.get_total_price()
+    # Verify all services are still available
+    unavailable = check_cart_availability(cart_items)
+    if unavailable:
+        item, message = unavailable[0]
+        messages.error(request, f"Service '{item.service.title}' is no longer available: {message}")
+        return redirect('booking_cart_app:cart')
 
-    venues = list(venues_dict.values())
+    # Group cart items by venue
+    venues = group_cart_items_by_venue(cart_items)
 
     # Calculate total price
     total_price = sum(venue['total'] for venue in venues)
@@ -260,106 +243,17 @@ def checkout(request):
     if request.method == 'POST':
         form = CheckoutForm(request.POST)
         if form.is_valid():
-            bookings_created = []
-
             try:
                 with transaction.atomic():
-                    # Create a checkout session to track all bookings from this checkout
-                    checkout_session = CheckoutSession.objects.create(
-                        user=request.user,
-                        total_amount=total_price
+                    # Create all bookings from this checkout in bulk
+                    checkout_session, bookings_created = create_bookings_from_checkout(
+                        request.user, venues, notes=form.cleaned_data['notes']
                     )
 
-                    # Create a booking for each venue
-                    for venue_data in venues:
-                        venue = venue_data['venue']
-                        venue_items = venue_data['items']
-                        venue_total = venue_data['total']
-
-                        # Create the booking
-                        booking = Booking.objects.create(
-                            user=request.user,
-                            venue=venue,
-                            total_price=venue_total,
-                            status='confirmed',  # For MVP, bookings are automatically confirmed
-                            notes=form.cleaned_data['notes']
-                        )
-
-                        bookings_created.append(booking)
-
-                        # Associate booking with checkout session
-                        CheckoutSessionBooking.objects.create(
-                            checkout_session=checkout_session,
-                            booking=booking
-                        )
-
-                        # Create booking items
-                        for cart_item in venue_items:
-                            # Create booking item
-                            # Get the service price (with discount if applicable)
-                            service_price = cart_item.service.discounted_price or cart_item.service.price
-
-                            # Create booking item
-                            booking_item = BookingItem.objects.create(
-                                booking=booking,
-                                service=cart_item.service,
-                                service_title=cart_item.service.title,
-                                service_price=service_price,
-                                quantity=cart_item.quantity,
-                                date=cart_item.date,
-                                time_slot=cart_item.time_slot
-                            )
-
-                            # Record discount usage if applicable
-                            if cart_item.service.discounted_price and hasattr(cart_item.service, 'discount_info'):
-                                from discount_app.utils import record_discount_usage
-                                discount_info = cart_item.service.discount_info
-
-                                # Get the discount object
-                                if discount_info['type'] == 'percentage':
-                                    from discount_app.models import VenueDiscount, ServiceDiscount, PlatformDiscount
-
-                                    # Try to find the discount object based on the name
-                                    discount = None
-                                    for model in [ServiceDiscount, VenueDiscount, PlatformDiscount]:
-                                        try:
-                                            discount = model.objects.get(name=discount_info['name'])
-                                            break
-                                        except model.DoesNotExist:
-                                            continue
-
-                                    if discount:
-                                        # Record the discount usage
-                                        record_discount_usage(
-                                            discount=discount,
-                                            user=request.user,
-                                            booking=booking,
-                                            original_price=discount_info['original_price'],
-                                            discount_amount=discount_info['amount'],
-                                            final_price=discount_info['final_price']
-                                        )
-
-                            # Update service availability
-                            availability, _ = ServiceAvailability.objects.get_or_create(
-                                service=cart_item.service,
-                                date=cart_item.date,
-                                time_slot=cart_item.time_slot,
-                                defaults={
-                                    'max_bookings': 10,
-                                    'current_bookings': 0,
-                                    'is_available': True
-                                }
-                            )
-
-                            availability.increment_bookings()
-
-                            # Delete cart item
-                            cart_item.delete()
-
-                    # Send notifications for all bookings
-                    if NOTIFICATIONS_ENABLED:
-                        for booking in bookings_created:
-                            notify_new_booking(booking)
+                # Send notifications for all bookings
+                if NOTIFICATIONS_ENABLED:
+                    for booking in bookings_created:
+                        notify_new_booking(booking)
 
                 # Redirect to payment with the checkout session ID
                 if bookings_created:
@@ -524,20 +418,32 @@ def provider_booking_list(request):
         messages.error(request, "Only service providers can access this page.")
         return redirect('venues_app:home')
 
-    # Get all venues owned by the service provider
-    venues = Venue.objects.filter(owner=request.user)
-
-    # Get all bookings for the venues
-    bookings = Booking.objects.filter(venue__in=venues).order_by('-booking_date')
-
-    # Filter by status if provided
     status_filter = request.GET.get('status')
-    if status_filter:
-        bookings = bookings.filter(status=status_filter)
+    date_filter = request.GET.get('date')
+
+    # Get one page of the bookings for the provider's venues
+    bookings = get_booking_list(owner=request.user, status=status_filter, date_filter=date_filter)
+    page = get_booking_list_page(bookings, after=request.GET.get('after'), before=request.GET.get('before'))
+
+    # Count the provider's bookings by status for the summary
+    status_counts = dict(
+        Booking.objects.filter(venue__owner=request.user)
+        .values_list('status')
+        .annotate(count=Count('id'))
+        .order_by()
+    )
 
     context = {
-        'bookings': bookings,
+        'bookings': page['bookings'],
+        'next_cursor': page['next_cursor'],
+        'previous_cursor': page['previous_cursor'],
         'status_filter': status_filter,
+        'date_filter': date_filter,
+        'total_count': sum(status_counts.values()),
+        'pending_count': status_counts.get('pending', 0),
+        'confirmed_count': status_counts.get('confirmed', 0),
+        'completed_count': status_counts.get('completed', 0),
+        'cancelled_count': status_counts.get('cancelled', 0),
     }
 
     return render(request, 'booking_cart_app/provider/booking_list.html', context)
@@ -682,51 +588,11 @@ def provider_bulk_availability(request, service_id):
             max_bookings = form.cleaned_data['max_bookings']
             is_available = form.cleaned_data['is_available']
 
-            # Generate time slots
-            time_slots = []
-            current_time = start_time
-            while current_time < end_time:
-                time_slots.append(current_time)
-                # Add interval minutes to current time
-                hours, minutes = divmod(current_time.hour * 60 + current_time.minute + interval, 60)
-                current_time = timezone.datetime.time(hour=hours, minute=minutes)
-
-            # Generate dates
-            dates = []
-            current_date = start_date
-            while current_date <= end_date:
-                dates.append(current_date)
-                current_date += timedelta(days=1)
-
-            # Create availability records
-            created_count = 0
-            updated_count = 0
-            for date in dates:
-                for time_slot in time_slots:
-                    # Check if a record already exists
-                    existing = ServiceAvailability.objects.filter(
-                        service=service,
-                        date=date,
-                        time_slot=time_slot
-                    ).first()
-
-                    if existing:
-                        # Update existing record
-                        existing.max_bookings = max_bookings
-                        existing.is_available = is_available
-                        existing.save()
-                        updated_count += 1
-                    else:
-                        # Create new record
-                        ServiceAvailability.objects.create(
-                            service=service,
-                            date=date,
-                            time_slot=time_slot,
-                            max_bookings=max_bookings,
-                            current_bookings=0,
-                            is_available=is_available
-                        )
-                        created_count += 1
+            # Create and update all availability records in bulk
+            created_count, updated_count = bulk_set_service_availability(
+                service, start_date, end_date, start_time, end_time,
+                interval, max_bookings, is_available
+            )
 
             messages.success(
                 request,
@@ -805,25 +671,26 @@ def admin_booking_list(request):
         messages.error(request, "Only administrators can access this page.")
         return redirect('venues_app:home')
 
-    # Get all bookings
-    bookings = Booking.objects.all().order_by('-booking_date')
-    print(f"Bookings count: {bookings.count()}")
-
-    # Filter by status if provided
     status_filter = request.GET.get('status')
-    if status_filter:
-        bookings = bookings.filter(status=status_filter)
-
-    # Filter by venue if provided
     venue_filter = request.GET.get('venue')
-    if venue_filter:
-        bookings = bookings.filter(venue_id=venue_filter)
+    date_filter = request.GET.get('date')
+
+    # Get one page of all bookings, ignoring a malformed venue filter
+    bookings = get_booking_list(
+        status=status_filter,
+        venue_id=venue_filter if venue_filter and venue_filter.isdigit() else None,
+        date_filter=date_filter
+    )
+    page = get_booking_list_page(bookings, after=request.GET.get('after'), before=request.GET.get('before'))
 
     context = {
-        'bookings': bookings,
+        'bookings': page['bookings'],
+        'next_cursor': page['next_cursor'],
+        'previous_cursor': page['previous_cursor'],
         'status_filter': status_filter,
         'venue_filter': venue_filter,
-        'venues': Venue.objects.all(),
+        'date_filter': date_filter,
+        'venues': Venue.objects.only('id', 'name').order_by('name'),
     }
 
     return render(request, 'booking_cart_app/admin/booking_list.html', context)
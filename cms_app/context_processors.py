@@ -1,5 +1,6 @@
 from django.utils import timezone
 from django.core.cache import cache
+from utils.context import lazy_request_value
 from .models import Announcement, SiteConfiguration
 
 
@@ -22,18 +23,22 @@ def get_current_announcements():
     return announcements
 
 
-def cms_context(request):
-    """Add CMS-related context to all templates"""
-    # Get site configuration
+def get_site_configuration():
+    """Get the site configuration, cached for a day"""
     config = cache.get('site_configuration')
     if config is None:
         config = SiteConfiguration.get_instance()
         cache.set('site_configuration', config, 86400)  # Cache for 24 hours
-    
-    # Get active announcements
-    announcements = get_current_announcements()
-    
+    return config
+
+
+def cms_context(request):
+    """
+    Add CMS-related context to all templates
+
+    Values are only looked up when a template uses them, once per request.
+    """
     return {
-        'site_config': config,
-        'announcements': announcements,
+        'site_config': lazy_request_value(request, 'site_config', get_site_configuration),
+        'announcements': lazy_request_value(request, 'announcements', get_current_announcements),
     }
@@ -5,3 +5,6 @@ class DashboardAppConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "dashboard_app"
     verbose_name = "Dashboard"
+
+    def ready(self):
+        import dashboard_app.signals  # noqa
@@ -17,6 +17,12 @@ class DateRangeForm(forms.Form):
         ('custom', 'Custom Range'),
     ]
 
+    GRANULARITY_CHOICES = [
+        ('day', 'Daily'),
+        ('week', 'Weekly'),
+        ('month', 'Monthly'),
+    ]
+
     period = forms.ChoiceField(
         choices=PERIOD_CHOICES,
         widget=forms.Select(attrs={'class': 'form-select'}),
@@ -34,6 +40,13 @@ class DateRangeForm(forms.Form):
         required=False
     )
 
+    granularity = forms.ChoiceField(
+        choices=GRANULARITY_CHOICES,
+        widget=forms.Select(attrs={'class': 'form-select'}),
+        required=False,
+        initial='day'
+    )
+
     def clean(self):
         cleaned_data = super().clean()
         period = cleaned_data.get('period')
@@ -0,0 +1,47 @@
+import time
+
+from .utils import (
+    QueryRecorder, current_query_recorder, current_view_name, query_stats_collector, record_request_stats,
+    request_stats_collector
+)
+
+
+class QueryBudgetMiddleware:
+    """
+    Middleware to record the database work and latency of every request
+
+    Each request's query count, database time, repeated query fingerprints and latency
+    are added to this process's rolling per-view statistics, keyed by the resolved URL
+    name, which are published to the cache on an interval for the admin system health page. Requests running more queries than their view's
+    budget (QUERY_BUDGETS / QUERY_BUDGET_DEFAULT) are logged as warnings.
+
+    The URL name is also made available to the slow query log while the view runs, and
+    the process's query aggregates are published along with the request statistics.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        # The query stats collector adds every statement of the request to the recorder
+        recorder = QueryRecorder()
+        start = time.perf_counter()
+        recorder_token = current_query_recorder.set(recorder)
+        view_token = current_view_name.set(None)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_view_name.reset(view_token)
+            current_query_recorder.reset(recorder_token)
+        latency = time.perf_counter() - start
+
+        # Requests that did not resolve to a view are not recorded
+        match = request.resolver_match
+        if match is not None and match.view_name:
+            record_request_stats(match.view_name, recorder, latency)
+        request_stats_collector.flush()
+        query_stats_collector.flush()
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        current_view_name.set(request.resolver_match.view_name if request.resolver_match else None)
+        return None
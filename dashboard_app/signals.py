@@ -0,0 +1,47 @@
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from venues_app.models import Venue
+from booking_cart_app.models import Booking, BookingItem
+from review_app.models import Review
+from .utils import invalidate_provider_snapshots, install_query_stats_collector
+
+
+@receiver(connection_created)
+def time_connection_queries(sender, connection, **kwargs):
+    """Record the duration of every statement run on new database connections"""
+    install_query_stats_collector(connection)
+
+
+def _invalidate_owner_snapshots(venues):
+    """Invalidate the dashboard snapshots of the owners of a venue queryset once the transaction commits"""
+    owner_ids = set(venues.values_list('owner_id', flat=True))
+    if owner_ids:
+        transaction.on_commit(lambda: invalidate_provider_snapshots(owner_ids))
+
+
+@receiver(post_save, sender=Booking)
+@receiver(post_delete, sender=Booking)
+def invalidate_snapshot_on_booking_change(sender, instance, **kwargs):
+    """Invalidate the provider's dashboard snapshot when one of their bookings changes"""
+    venue_ids = {instance.venue_id}
+    if instance._old_rollup_state:
+        # The venue the booking was previously counted for
+        venue_ids.add(instance._old_rollup_state[1])
+    _invalidate_owner_snapshots(Venue.objects.filter(pk__in=venue_ids))
+
+
+@receiver(post_save, sender=BookingItem)
+@receiver(post_delete, sender=BookingItem)
+def invalidate_snapshot_on_booking_item_change(sender, instance, **kwargs):
+    """Invalidate the provider's dashboard snapshot when one of their booking items changes"""
+    _invalidate_owner_snapshots(Venue.objects.filter(services__id=instance.service_id))
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def invalidate_snapshot_on_review_change(sender, instance, **kwargs):
+    """Invalidate the provider's dashboard snapshot when a review of one of their venues changes"""
+    _invalidate_owner_snapshots(Venue.objects.filter(pk=instance.venue_id))
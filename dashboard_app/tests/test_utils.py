@@ -0,0 +1,304 @@
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from django.db.models import Count, Sum
+from django.utils import timezone
+
+from venues_app.models import Category, Venue
+from booking_cart_app.models import Booking, BookingItem
+from review_app.models import Review
+from dashboard_app.utils import (
+    get_buckets, get_time_series, get_provider_snapshot, get_upcoming_booking_items, get_upcoming_bookings,
+    fingerprint_sql, percentile, get_request_stats, get_performance_metrics, get_query_stats,
+    query_stats_collector, request_stats_collector, QueryStatsCollector
+)
+from dashboard_app import utils as dashboard_utils
+
+User = get_user_model()
+
+
+class TimeSeriesTest(TestCase):
+    """Test the time-series query helpers"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.customer = User.objects.create_user(
+            email='customer@example.com',
+            password='testpass123',
+            is_customer=True
+        )
+        self.provider = User.objects.create_user(
+            email='provider@example.com',
+            password='testpass123',
+            is_service_provider=True
+        )
+        self.venue = Venue.objects.create(
+            owner=self.provider,
+            name='Test Spa',
+            category=Category.objects.create(name='Spa'),
+            state='New York',
+            county='New York County',
+            city='New York',
+            street_number='123',
+            street_name='Main St',
+            about='A luxury spa.'
+        )
+
+        # Two bookings on Monday 2024-01-01 and one on Wednesday 2024-01-10
+        for day, price in [(1, '100.00'), (1, '50.00'), (10, '25.00')]:
+            booking = Booking.objects.create(
+                user=self.customer, venue=self.venue, status='confirmed', total_price=Decimal(price)
+            )
+            Booking.objects.filter(pk=booking.pk).update(
+                booking_date=timezone.make_aware(datetime(2024, 1, day, 12))
+            )
+
+    def test_get_buckets(self):
+        """Test bucket boundaries for every granularity"""
+        self.assertEqual(len(get_buckets(date(2024, 1, 1), date(2024, 1, 31))), 31)
+        self.assertEqual(
+            get_buckets(date(2024, 1, 3), date(2024, 1, 15), 'week'),
+            [date(2024, 1, 1), date(2024, 1, 8), date(2024, 1, 15)]
+        )
+        self.assertEqual(
+            get_buckets(date(2024, 1, 31), date(2024, 3, 1), 'month'),
+            [date(2024, 1, 1), date(2024, 2, 1), date(2024, 3, 1)]
+        )
+
+    def test_get_time_series(self):
+        """Test that series are filled in and use a single query for any range"""
+        with self.assertNumQueries(1):
+            series = get_time_series(
+                Booking.objects.all(), 'booking_date', date(2023, 1, 1), date(2024, 1, 31),
+                count=Count('id'), revenue=Sum('total_price')
+            )
+        self.assertEqual(len(series), 396)
+        self.assertEqual(series['2024-01-01'], {'date': date(2024, 1, 1), 'count': 2, 'revenue': Decimal('150.00')})
+        self.assertEqual(series['2024-01-02']['revenue'], 0)
+
+        weekly = get_time_series(
+            Booking.objects.all(), 'booking_date', date(2024, 1, 1), date(2024, 1, 14), 'week',
+            revenue=Sum('total_price')
+        )
+        self.assertEqual(list(weekly), ['2024-01-01', '2024-01-08'])
+        self.assertEqual(weekly['2024-01-08']['revenue'], Decimal('25.00'))
+
+        monthly = get_time_series(
+            Booking.objects.all(), 'booking_date', date(2024, 1, 1), date(2024, 1, 5), 'month',
+            count=Count('id')
+        )
+        self.assertEqual(monthly, {'2024-01-01': {'date': date(2024, 1, 1), 'count': 2}})
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class ProviderSnapshotTest(TestCase):
+    """Test the cached provider dashboard snapshot"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.customer = User.objects.create_user(
+            email='customer@example.com',
+            password='testpass123',
+            is_customer=True
+        )
+        self.provider = User.objects.create_user(
+            email='provider@example.com',
+            password='testpass123',
+            is_service_provider=True
+        )
+        self.venue = Venue.objects.create(
+            owner=self.provider,
+            name='Test Spa',
+            state='New York',
+            county='New York County',
+            city='New York',
+            street_number='123',
+            street_name='Main St',
+            about='A luxury spa.'
+        )
+        self.service = self.venue.services.create(title='Massage', price=Decimal('80.00'), duration=60)
+        self.booking = Booking.objects.create(
+            user=self.customer, venue=self.venue, status='confirmed', total_price=Decimal('80.00')
+        )
+        BookingItem.objects.create(
+            booking=self.booking, service=self.service, service_title='Massage',
+            service_price=Decimal('80.00'), date=timezone.localdate(), time_slot='10:00'
+        )
+
+    def test_snapshot_is_cached_and_invalidated(self):
+        """Test that the snapshot is served from the cache until the provider's data changes"""
+        snapshot = get_provider_snapshot(self.provider.id)
+        self.assertEqual(snapshot['total_bookings'], 1)
+        self.assertEqual(snapshot['revenue_by_status'], {'confirmed': Decimal('80.00')})
+        self.assertEqual(snapshot['services'][self.service.id]['total_bookings'], 1)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(get_provider_snapshot(self.provider.id), snapshot)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.booking.status = 'cancelled'
+            self.booking.save()
+        snapshot = get_provider_snapshot(self.provider.id)
+        self.assertEqual(snapshot['bookings_by_status'], {'cancelled': 1})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Review.objects.create(venue=self.venue, user=self.customer, rating=4, comment='Nice')
+        snapshot = get_provider_snapshot(self.provider.id)
+        self.assertEqual(snapshot['review_count'], 1)
+        self.assertEqual(snapshot['average_rating'], 4.0)
+
+
+class CustomerTimelineTest(TestCase):
+    """Test the customer upcoming booking queries"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.customer = User.objects.create_user(
+            email='customer@example.com',
+            password='testpass123',
+            is_customer=True
+        )
+        provider = User.objects.create_user(
+            email='provider@example.com',
+            password='testpass123',
+            is_service_provider=True
+        )
+        self.venue = Venue.objects.create(
+            owner=provider,
+            name='Test Spa',
+            state='New York',
+            county='New York County',
+            city='New York',
+            street_number='123',
+            street_name='Main St',
+            about='A luxury spa.'
+        )
+        self.service = self.venue.services.create(title='Massage', price=Decimal('80.00'), duration=60)
+        self.today = timezone.localdate()
+
+    def create_booking(self, days, status='confirmed'):
+        booking = Booking.objects.create(
+            user=self.customer, venue=self.venue, status=status, total_price=Decimal('80.00')
+        )
+        for day in days:
+            BookingItem.objects.create(
+                booking=booking, service=self.service, service_title='Massage',
+                service_price=Decimal('80.00'), date=self.today + timedelta(days=day), time_slot=time(10)
+            )
+        return booking
+
+    def test_upcoming_bookings(self):
+        """Test that bookings are ordered by their next upcoming item"""
+        later = self.create_booking([-1, 5, 7])
+        sooner = self.create_booking([2])
+        self.create_booking([-3])
+        self.create_booking([1], status='cancelled')
+
+        with self.assertNumQueries(1):
+            upcoming = get_upcoming_bookings(self.customer)
+            self.assertEqual([entry['booking'] for entry in upcoming], [sooner, later])
+            self.assertEqual(upcoming[1]['next_item'].date, self.today + timedelta(days=5))
+            self.assertEqual(upcoming[1]['booking'].venue, self.venue)
+
+        with self.assertNumQueries(1):
+            items = list(get_upcoming_booking_items(self.customer))
+            self.assertEqual([item.date for item in items], [self.today + timedelta(days=day) for day in (2, 5, 7)])
+            self.assertEqual(items[0].service, self.service)
+
+
+@override_settings(
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'request-stats'}},
+    QUERY_BUDGETS={'venues_app:home': 1}
+)
+class RequestStatsTest(TestCase):
+    """Test the query budget middleware and the request statistics it records"""
+
+    def setUp(self):
+        """Set up test data"""
+        cache.clear()
+        request_stats_collector.clear()
+
+    def test_fingerprint_sql(self):
+        """Test that statements differing only in literals share a fingerprint"""
+        self.assertEqual(
+            fingerprint_sql('SELECT  "id" FROM "venue" WHERE "id" IN (%s, %s, %s) AND "name" = \'Spa\' LIMIT 21'),
+            'SELECT "id" FROM "venue" WHERE "id" IN (...) AND "name" = ? LIMIT ?'
+        )
+        self.assertEqual(fingerprint_sql('SELECT 1 WHERE "a" = %s'), fingerprint_sql('SELECT 2 WHERE "a" = %s'))
+        self.assertEqual(percentile([5, 1, 3, 2, 4], 50), 3)
+        self.assertEqual(percentile([5, 1, 3, 2, 4], 95), 5)
+        self.assertEqual(percentile([], 95), 0)
+
+    def test_request_stats(self):
+        """Test that requests are recorded per view and budget violations are logged"""
+        with self.assertLogs('dashboard_app.utils', 'WARNING') as logs:
+            self.client.get(reverse('venues_app:home'))
+            self.client.get(reverse('venues_app:home'))
+        self.assertEqual(len(logs.records), 2)
+        self.assertIn('venues_app:home', logs.output[0])
+
+        stats = {view_stats['view_name']: view_stats for view_stats in get_request_stats()}
+        home_stats = stats['venues_app:home']
+        self.assertEqual(home_stats['requests'], 2)
+        self.assertEqual(home_stats['budget'], 1)
+        self.assertEqual(home_stats['budget_violations'], 2)
+        self.assertGreater(home_stats['queries_p95'], 1)
+
+        # Samples are published per process, each repeated query stored once
+        snapshot = cache.get(request_stats_collector.key)
+        self.assertEqual(len(snapshot['views']['venues_app:home']), 2)
+        self.assertEqual(len(snapshot['queries']), len(set(snapshot['queries'])))
+
+        metrics = get_performance_metrics(list(stats.values()))
+        self.assertEqual(metrics['requests'], 2)
+        self.assertEqual(metrics['requests_per_minute'], 2)
+        self.assertEqual(metrics['budget_violations'], 2)
+        self.assertEqual(metrics['views_over_budget'], 1)
+
+    @override_settings(SLOW_QUERY_THRESHOLD=0, QUERY_BUDGETS={})
+    def test_query_stats(self):
+        """Test that statements are aggregated by fingerprint and slow ones logged with their view"""
+        self.assertIn(query_stats_collector, connection.execute_wrappers)
+
+        with self.assertLogs('dashboard_app.slow_queries', 'WARNING') as logs:
+            User.objects.filter(email='first@example.com').exists()
+            User.objects.filter(email='second@example.com').exists()
+            self.client.get(reverse('venues_app:home'))
+        self.assertTrue(any('venues_app:home' in line for line in logs.output))
+
+        # Both lookups share one fingerprint
+        query_stats = get_query_stats(limit=1000)
+        exists_counts = [
+            query['count'] for query in query_stats['by_count']
+            if query['query'].startswith('SELECT ? AS "a" FROM "accounts_app_customuser"')
+        ]
+        self.assertEqual(len(exists_counts), 1)
+        self.assertGreaterEqual(exists_counts[0], 2)
+        self.assertIn('venues_app:home', {query['view_name'] for query in query_stats['by_total_time']})
+        self.assertEqual(query_stats['slow_queries'][0]['view_name'], 'venues_app:home')
+
+    @override_settings(SLOW_QUERY_THRESHOLD=1000)
+    def test_query_stats_probation(self):
+        """Test that new fingerprints accumulate on probation before replacing tracked ones"""
+        collector = QueryStatsCollector()
+        with patch.multiple(dashboard_utils, QUERY_STATS_TRACKED_LIMIT=2, QUERY_STATS_PROBATION_LIMIT=2):
+            collector.record('SELECT 1 FROM "a"', 10)
+            collector.record('SELECT 1 FROM "b"', 10)
+
+            # Newcomers do not evict each other or the tracked fingerprints
+            collector.record('SELECT 1 FROM "c"', 1)
+            collector.record('SELECT 1 FROM "d"', 1)
+            self.assertEqual(set(collector.fingerprints), {'SELECT ? FROM "a"', 'SELECT ? FROM "b"'})
+            self.assertEqual(set(collector.probation), {'SELECT ? FROM "c"', 'SELECT ? FROM "d"'})
+
+            # Once a newcomer outweighs the least time consuming tracked fingerprint it takes its place
+            collector.record('SELECT 2 FROM "c"', 20)
+            self.assertEqual(len(collector.fingerprints), 2)
+            self.assertEqual(collector.fingerprints['SELECT ? FROM "c"']['count'], 2)
+            self.assertNotIn('SELECT ? FROM "c"', collector.probation)
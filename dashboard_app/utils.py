@@ -0,0 +1,643 @@
+import logging
+import math
+import re
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict, deque
+from contextvars import ContextVar
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, DateField, F, FloatField, OuterRef, Subquery, Sum
+from django.db.models.functions import TruncDay, TruncMonth, TruncWeek
+from django.utils import timezone
+
+from venues_app.models import Venue
+from booking_cart_app.models import Booking, BookingItem
+
+
+logger = logging.getLogger(__name__)
+slow_query_logger = logging.getLogger('dashboard_app.slow_queries')
+
+
+# Database truncation function for each supported series granularity
+GRANULARITY_FUNCTIONS = {
+    'day': TruncDay,
+    'week': TruncWeek,
+    'month': TruncMonth,
+}
+
+
+def get_bucket_start(date, granularity='day'):
+    """
+    Get the first day of the bucket containing a date; weeks start on Monday as in TruncWeek
+    """
+    if granularity == 'week':
+        return date - timedelta(days=date.weekday())
+    if granularity == 'month':
+        return date.replace(day=1)
+    return date
+
+
+def get_buckets(start_date, end_date, granularity='day'):
+    """
+    Get the start dates of every bucket overlapping a date range
+    Returns a list of dates, oldest first
+    """
+    buckets = []
+    current_date = get_bucket_start(start_date, granularity)
+    while current_date <= end_date:
+        buckets.append(current_date)
+        if granularity == 'week':
+            current_date += timedelta(days=7)
+        elif granularity == 'month':
+            current_date = (current_date + timedelta(days=32)).replace(day=1)
+        else:
+            current_date += timedelta(days=1)
+    return buckets
+
+
+def get_time_series(queryset, date_field, start_date, end_date, granularity='day', **metrics):
+    """
+    Aggregate a queryset into a bucketed time series with a single GROUP BY query.
+    date_field is the DateTimeField rows are bucketed by and metrics maps names to aggregate expressions, e.g. revenue=Sum('total_price').
+    Buckets without rows are filled in with zeros.
+    Returns a dictionary keyed by the bucket start as 'YYYY-MM-DD', oldest first, where each value
+    has the bucket 'date' and a value for every metric
+    """
+    truncate = GRANULARITY_FUNCTIONS[granularity]
+
+    series = {
+        bucket.strftime('%Y-%m-%d'): dict({'date': bucket}, **{name: 0 for name in metrics})
+        for bucket in get_buckets(start_date, end_date, granularity)
+    }
+
+    rows = queryset.filter(**{
+        f'{date_field}__date__gte': start_date,
+        f'{date_field}__date__lte': end_date,
+    }).annotate(
+        bucket=truncate(date_field, output_field=DateField())
+    ).values('bucket').annotate(**metrics).order_by()
+
+    for row in rows:
+        point = series[row['bucket'].strftime('%Y-%m-%d')]
+        for name in metrics:
+            point[name] = row[name] or 0
+
+    return series
+
+
+# Cache key prefix of provider dashboard snapshots; bump the suffix when the snapshot layout changes
+PROVIDER_SNAPSHOT_KEY_PREFIX = 'dashboard_app:provider_snapshot:1'
+
+# Lifetime of a provider snapshot in seconds, a safety net for changes made without signals
+PROVIDER_SNAPSHOT_TIMEOUT = 60 * 60
+
+
+def _get_provider_snapshot_version_key(provider_id):
+    return f'{PROVIDER_SNAPSHOT_KEY_PREFIX}:version:{provider_id}'
+
+
+def build_provider_snapshot(provider_id):
+    """
+    Compute the dashboard metrics of a service provider's venues with grouped queries
+    Returns a dictionary of booking, per-service and review metrics
+    """
+    bookings_by_status = {}
+    revenue_by_status = {}
+    for status, count, revenue in Booking.objects.filter(venue__owner_id=provider_id).values_list(
+        'status'
+    ).annotate(count=Count('id'), revenue=Sum('total_price')).order_by():
+        bookings_by_status[status] = count
+        revenue_by_status[status] = revenue or 0
+
+    services = {
+        service_id: {'total_bookings': count, 'total_revenue': revenue or 0}
+        for service_id, count, revenue in BookingItem.objects.filter(
+            service__venue__owner_id=provider_id
+        ).values_list('service_id').annotate(count=Count('id'), revenue=Sum('service_price')).order_by()
+    }
+
+    reviews = Venue.objects.filter(owner_id=provider_id).aggregate(
+        review_count=Sum('rating_count'),
+        rating_total=Sum(F('rating_avg') * F('rating_count'), output_field=FloatField())
+    )
+    review_count = reviews['review_count'] or 0
+
+    return {
+        'total_bookings': sum(bookings_by_status.values()),
+        'bookings_by_status': bookings_by_status,
+        'revenue_by_status': revenue_by_status,
+        'services': services,
+        'review_count': review_count,
+        'average_rating': round(reviews['rating_total'] / review_count, 1) if review_count else 0,
+    }
+
+
+def get_provider_snapshot(provider_id):
+    """
+    Get a service provider's dashboard metrics from the cache, computing them on a miss.
+    Snapshots are stored under a per-provider version, so invalidating one only changes that version.
+    Returns the snapshot dictionary built by build_provider_snapshot
+    """
+    version_key = _get_provider_snapshot_version_key(provider_id)
+    version = cache.get(version_key)
+    if version is None:
+        version = uuid.uuid4().hex
+        cache.set(version_key, version, None)
+
+    key = f'{PROVIDER_SNAPSHOT_KEY_PREFIX}:{provider_id}:{version}'
+    snapshot = cache.get(key)
+    if snapshot is None:
+        snapshot = build_provider_snapshot(provider_id)
+        cache.set(key, snapshot, PROVIDER_SNAPSHOT_TIMEOUT)
+    return snapshot
+
+
+def invalidate_provider_snapshots(provider_ids):
+    """
+    Discard the cached dashboard snapshots of the given service providers
+    """
+    cache.set_many({
+        _get_provider_snapshot_version_key(provider_id): uuid.uuid4().hex
+        for provider_id in set(provider_ids) if provider_id
+    }, None)
+
+
+def get_upcoming_booking_items(user, limit=None):
+    """
+    Get a customer's upcoming items of confirmed bookings, soonest first, with their booking,
+    venue and service joined in the same query
+    Returns a queryset of booking items, sliced to limit items if given
+    """
+    items = BookingItem.objects.filter(
+        booking__user=user,
+        booking__status='confirmed',
+        date__gte=timezone.localdate()
+    ).select_related('booking__venue', 'service').order_by('date', 'time_slot', 'id')
+    return items[:limit] if limit else items
+
+
+def get_upcoming_bookings(user, limit=5):
+    """
+    Get a customer's confirmed bookings that still have upcoming items, ordered by their next item,
+    with a single query
+    Returns a list of dictionaries with the booking and its next_item
+    """
+    next_item = BookingItem.objects.filter(
+        booking=OuterRef('booking'),
+        date__gte=timezone.localdate()
+    ).order_by('date', 'time_slot', 'id').values('id')[:1]
+
+    next_items = get_upcoming_booking_items(user).filter(id=Subquery(next_item))[:limit]
+    return [{'booking': item.booking, 'next_item': item} for item in next_items]
+
+
+# Number of recent requests kept per view for the rolling performance statistics
+REQUEST_STATS_WINDOW = 200
+
+# How often a process publishes its request statistics to the cache, in seconds
+REQUEST_STATS_FLUSH_INTERVAL = 30
+
+# Cache key prefix of the per-process request statistics
+REQUEST_STATS_KEY_PREFIX = 'dashboard_app:request_stats:2'
+
+# Cache key holding the keys of the published per-process request statistics
+REQUEST_STATS_PROCESSES_KEY = f'{REQUEST_STATS_KEY_PREFIX}:processes'
+
+# How long a process's published request statistics are kept, in seconds
+REQUEST_STATS_TIMEOUT = 24 * 60 * 60
+
+# Number of repeated query fingerprints kept per request
+REQUEST_DUPLICATES_LIMIT = 3
+
+SQL_LITERAL_PATTERN = re.compile(r"'(?:[^']|'')*'|%s|\b\d+(?:\.\d+)?\b")
+SQL_IN_LIST_PATTERN = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+
+
+def fingerprint_sql(sql):
+    """
+    Normalize a SQL statement into a fingerprint: parameters and literals become ?, value
+    lists collapse to (...) and whitespace is squeezed, so repeats of a query compare equal
+    """
+    fingerprint = SQL_LITERAL_PATTERN.sub('?', sql)
+    fingerprint = SQL_IN_LIST_PATTERN.sub('(...)', fingerprint)
+    return ' '.join(fingerprint.split())
+
+
+def percentile(values, percent):
+    """
+    Get the nearest-rank percentile of a list of numbers, or 0 for an empty list
+    """
+    if not values:
+        return 0
+    values = sorted(values)
+    return values[max(math.ceil(percent / 100 * len(values)), 1) - 1]
+
+
+class QueryRecorder:
+    """
+    Counts the queries of one request, their total time in milliseconds and how often
+    each query fingerprint repeats. Statements are timed and fingerprinted once by the
+    query stats collector, which adds them to the recorder in current_query_recorder.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.fingerprints = Counter()
+
+    def add(self, fingerprint, duration):
+        """Add a statement's fingerprint and duration in milliseconds"""
+        self.duration += duration
+        self.count += 1
+        self.fingerprints[fingerprint] += 1
+
+    def get_duplicates(self, limit=REQUEST_DUPLICATES_LIMIT):
+        """Get the most repeated (fingerprint, count) pairs, ignoring queries run once"""
+        return [(fingerprint, count) for fingerprint, count in self.fingerprints.most_common(limit) if count > 1]
+
+
+def get_query_budget(view_name):
+    """
+    Get the maximum number of queries a view may run per request, from the QUERY_BUDGETS
+    setting or else QUERY_BUDGET_DEFAULT. Returns None if the view has no budget
+    """
+    budgets = getattr(settings, 'QUERY_BUDGETS', {})
+    if view_name in budgets:
+        return budgets[view_name]
+    return getattr(settings, 'QUERY_BUDGET_DEFAULT', None)
+
+
+def publish_process_snapshot(key, processes_key, snapshot, timeout):
+    """
+    Publish a process's statistics snapshot to the cache and register its key in processes_key.
+    A registration lost to a concurrent update is restored by the process's next publish.
+    """
+    cache.set(key, snapshot, timeout)
+
+    process_keys = cache.get(processes_key) or set()
+    if key not in process_keys:
+        # Forget processes whose snapshots have expired
+        process_keys = set(cache.get_many(process_keys)) | {key}
+        cache.set(processes_key, process_keys, timeout)
+    else:
+        cache.touch(processes_key, timeout)
+
+
+def get_process_snapshots(processes_key):
+    """
+    Get the statistics snapshots published by every process
+    Returns a list of snapshots
+    """
+    return list(cache.get_many(cache.get(processes_key) or set()).values())
+
+
+class RequestStatsCollector:
+    """
+    Rolling statistics of the most recent requests of every view in this process.
+    Samples are kept in memory and published to the cache at most every
+    REQUEST_STATS_FLUSH_INTERVAL seconds, each repeated query fingerprint stored once,
+    for get_request_stats to combine with those of the other processes.
+    """
+
+    def __init__(self):
+        self.key = f'{REQUEST_STATS_KEY_PREFIX}:{uuid.uuid4().hex}'
+        self.lock = threading.Lock()
+        self.views = {}
+        self.last_flush = time.monotonic()
+
+    def record(self, view_name, recorder, latency):
+        """
+        Add a request to the statistics of its view and log it if it ran more queries
+        than the view's budget. latency is in seconds.
+        Returns the recorded sample
+        """
+        budget = get_query_budget(view_name)
+        sample = {
+            'time': time.time(),
+            'queries': recorder.count,
+            'db_time': recorder.duration,
+            'latency': latency * 1000,
+            'duplicates': recorder.get_duplicates(),
+            'over_budget': budget is not None and recorder.count > budget,
+        }
+
+        if sample['over_budget']:
+            logger.warning(
+                'Query budget exceeded by %s: %d queries (budget %d), %.1f ms in the database. Repeated queries: %s',
+                view_name, recorder.count, budget, sample['db_time'],
+                '; '.join(f'{count}x {fingerprint}' for fingerprint, count in sample['duplicates']) or 'none'
+            )
+
+        with self.lock:
+            samples = self.views.get(view_name)
+            if samples is None:
+                samples = self.views[view_name] = deque(maxlen=REQUEST_STATS_WINDOW)
+            samples.append(sample)
+        return sample
+
+    def flush(self, force=False):
+        """
+        Publish this process's statistics to the cache, at most every REQUEST_STATS_FLUSH_INTERVAL seconds
+        Returns True if they were published
+        """
+        if not force and time.monotonic() - self.last_flush < REQUEST_STATS_FLUSH_INTERVAL:
+            return False
+
+        with self.lock:
+            self.last_flush = time.monotonic()
+            views = {view_name: list(samples) for view_name, samples in self.views.items()}
+
+        # Samples refer to repeated queries by their index in the snapshot's query list
+        queries = {}
+        for samples in views.values():
+            for index, sample in enumerate(samples):
+                samples[index] = dict(sample, duplicates=[
+                    (queries.setdefault(fingerprint, len(queries)), count)
+                    for fingerprint, count in sample['duplicates']
+                ])
+        snapshot = {'views': views, 'queries': list(queries)}
+        publish_process_snapshot(self.key, REQUEST_STATS_PROCESSES_KEY, snapshot, REQUEST_STATS_TIMEOUT)
+        return True
+
+    def clear(self):
+        """Forget the requests recorded in this process"""
+        with self.lock:
+            self.views = {}
+
+
+request_stats_collector = RequestStatsCollector()
+
+
+def record_request_stats(view_name, recorder, latency):
+    """
+    Add a request to this process's rolling statistics of its view. latency is in seconds.
+    Returns the recorded sample
+    """
+    return request_stats_collector.record(view_name, recorder, latency)
+
+
+def get_request_stats():
+    """
+    Get rolling percentiles of the recorded requests of every view, combined across processes.
+    Times are in milliseconds.
+    Returns a list of dictionaries, views running the most queries first
+    """
+    # Include this process's latest requests
+    request_stats_collector.flush(force=True)
+
+    views = {}
+    for snapshot in get_process_snapshots(REQUEST_STATS_PROCESSES_KEY):
+        for view_name, samples in snapshot['views'].items():
+            views.setdefault(view_name, []).extend(
+                dict(sample, duplicates=[(snapshot['queries'][index], count) for index, count in sample['duplicates']])
+                for sample in samples
+            )
+    minute_ago = time.time() - 60
+
+    stats = []
+    for view_name, samples in views.items():
+        samples = sorted(samples, key=lambda sample: sample['time'])[-REQUEST_STATS_WINDOW:]
+
+        queries = [sample['queries'] for sample in samples]
+        db_times = [sample['db_time'] for sample in samples]
+        latencies = [sample['latency'] for sample in samples]
+
+        # Number of requests in which each fingerprint was repeated
+        duplicates = Counter()
+        for sample in samples:
+            duplicates.update(fingerprint for fingerprint, _ in sample['duplicates'])
+
+        stats.append({
+            'view_name': view_name,
+            'requests': len(samples),
+            'recent_requests': sum(1 for sample in samples if sample['time'] >= minute_ago),
+            'queries_p50': percentile(queries, 50),
+            'queries_p95': percentile(queries, 95),
+            'queries_max': max(queries),
+            'db_time_p50': percentile(db_times, 50),
+            'db_time_p95': percentile(db_times, 95),
+            'latency_p50': percentile(latencies, 50),
+            'latency_p95': percentile(latencies, 95),
+            'latency_p99': percentile(latencies, 99),
+            'latency_total': sum(latencies),
+            'budget': get_query_budget(view_name),
+            'budget_violations': sum(1 for sample in samples if sample['over_budget']),
+            'duplicate_queries': duplicates.most_common(REQUEST_DUPLICATES_LIMIT),
+        })
+    return sorted(stats, key=lambda view_stats: (-view_stats['queries_p95'], view_stats['view_name']))
+
+
+def get_performance_metrics(request_stats):
+    """
+    Summarize per-view request statistics from get_request_stats into site-wide metrics
+    """
+    requests = sum(view_stats['requests'] for view_stats in request_stats)
+    return {
+        'requests': requests,
+        'average_response_time': sum(view_stats['latency_total'] for view_stats in request_stats) / requests if requests else 0,
+        'requests_per_minute': sum(view_stats['recent_requests'] for view_stats in request_stats),
+        'budget_violations': sum(view_stats['budget_violations'] for view_stats in request_stats),
+        'views_over_budget': sum(1 for view_stats in request_stats if view_stats['budget_violations']),
+    }
+
+
+# Number of query fingerprints each process keeps aggregates for; the least time consuming are dropped first
+QUERY_STATS_TRACKED_LIMIT = 200
+
+# Number of newly seen fingerprints accumulating on probation before they compete for a tracked
+# place; the least recently run are dropped first
+QUERY_STATS_PROBATION_LIMIT = 100
+
+# Number of recent durations kept per fingerprint for percentiles
+QUERY_STATS_SAMPLE_SIZE = 50
+
+# Number of recent slow statements kept per process
+RECENT_SLOW_QUERIES_LIMIT = 20
+
+# How often a process publishes its query aggregates to the cache, in seconds
+QUERY_STATS_FLUSH_INTERVAL = 30
+
+# Cache key prefix of the per-process query aggregates
+QUERY_STATS_KEY_PREFIX = 'dashboard_app:query_stats:1'
+
+# Cache key holding the keys of the published per-process query aggregates
+QUERY_STATS_PROCESSES_KEY = f'{QUERY_STATS_KEY_PREFIX}:processes'
+
+# How long a process's published query aggregates are kept, in seconds
+QUERY_STATS_TIMEOUT = 24 * 60 * 60
+
+# URL name of the view being handled, set by the query budget middleware
+current_view_name = ContextVar('current_view_name', default=None)
+
+# QueryRecorder of the request being handled, set by the query budget middleware
+current_query_recorder = ContextVar('current_query_recorder', default=None)
+
+
+class QueryStatsCollector:
+    """
+    Database execute wrapper that times every statement run in this process.
+    Durations are aggregated by query fingerprint, statements slower than the
+    SLOW_QUERY_THRESHOLD setting (in milliseconds) are written to the slow query log
+    with the view that ran them, and the aggregates are published to the cache for
+    get_query_stats to combine with those of the other processes.
+
+    New fingerprints start on probation and join the tracked ones once there is room or
+    their total time exceeds that of the least time consuming tracked fingerprint, so
+    statements first seen late in a process's life can still build up their aggregates.
+    """
+
+    def __init__(self):
+        self.key = f'{QUERY_STATS_KEY_PREFIX}:{uuid.uuid4().hex}'
+        self.lock = threading.Lock()
+        self.fingerprints = {}
+        self.probation = OrderedDict()
+        self.eviction_threshold = 0.0
+        self.slow_queries = deque(maxlen=RECENT_SLOW_QUERIES_LIMIT)
+        self.last_flush = time.monotonic()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.record(sql, (time.perf_counter() - start) * 1000)
+
+    def record(self, sql, duration):
+        """
+        Add a statement's duration in milliseconds to the aggregates and to the
+        current request's QueryRecorder
+        """
+        fingerprint = fingerprint_sql(sql)
+        view_name = current_view_name.get()
+        is_slow = duration >= getattr(settings, 'SLOW_QUERY_THRESHOLD', 500)
+
+        recorder = current_query_recorder.get()
+        if recorder is not None:
+            recorder.add(fingerprint, duration)
+
+        with self.lock:
+            stats = self.fingerprints.get(fingerprint)
+            on_probation = stats is None
+            if on_probation:
+                stats = self.probation.get(fingerprint)
+                if stats is None:
+                    if len(self.probation) >= QUERY_STATS_PROBATION_LIMIT:
+                        self.probation.popitem(last=False)
+                    stats = self.probation[fingerprint] = {
+                        'count': 0,
+                        'total_time': 0.0,
+                        'max_time': 0.0,
+                        'durations': deque(maxlen=QUERY_STATS_SAMPLE_SIZE),
+                        'view_name': None,
+                    }
+                else:
+                    self.probation.move_to_end(fingerprint)
+            stats['count'] += 1
+            stats['total_time'] += duration
+            stats['max_time'] = max(stats['max_time'], duration)
+            stats['durations'].append(duration)
+            stats['view_name'] = view_name or stats['view_name']
+            if on_probation:
+                self._promote(fingerprint, stats)
+            if is_slow:
+                self.slow_queries.append({
+                    'time': time.time(),
+                    'duration': duration,
+                    'view_name': view_name,
+                    'query': fingerprint,
+                })
+
+        if is_slow:
+            slow_query_logger.warning('%.1f ms in %s: %s', duration, view_name or '-', sql)
+
+    def _promote(self, fingerprint, stats):
+        """Move a fingerprint from probation to the tracked ones if it has earned a place"""
+        if len(self.fingerprints) >= QUERY_STATS_TRACKED_LIMIT:
+            # Tracked totals only grow, so the cached threshold is a lower bound of the current minimum
+            if stats['total_time'] <= self.eviction_threshold:
+                return
+            weakest = min(self.fingerprints, key=lambda key: self.fingerprints[key]['total_time'])
+            self.eviction_threshold = self.fingerprints[weakest]['total_time']
+            if stats['total_time'] <= self.eviction_threshold:
+                return
+            del self.fingerprints[weakest]
+        self.fingerprints[fingerprint] = self.probation.pop(fingerprint)
+
+    def flush(self, force=False):
+        """
+        Publish this process's aggregates to the cache, at most every QUERY_STATS_FLUSH_INTERVAL seconds
+        Returns True if they were published
+        """
+        if not force and time.monotonic() - self.last_flush < QUERY_STATS_FLUSH_INTERVAL:
+            return False
+
+        with self.lock:
+            self.last_flush = time.monotonic()
+            snapshot = {
+                'fingerprints': {
+                    fingerprint: dict(stats, durations=list(stats['durations']))
+                    for fingerprint, stats in (*self.fingerprints.items(), *self.probation.items())
+                },
+                'slow_queries': list(self.slow_queries),
+            }
+        publish_process_snapshot(self.key, QUERY_STATS_PROCESSES_KEY, snapshot, QUERY_STATS_TIMEOUT)
+        return True
+
+
+query_stats_collector = QueryStatsCollector()
+
+
+def install_query_stats_collector(connection):
+    """Time every statement run on a database connection"""
+    if query_stats_collector not in connection.execute_wrappers:
+        connection.execute_wrappers.append(query_stats_collector)
+
+
+def get_query_stats(limit=10):
+    """
+    Combine the published query aggregates of every process. Times are in milliseconds.
+    Returns a dictionary with the top limit fingerprints by total time ('by_total_time'),
+    number of executions ('by_count') and 95th percentile duration ('by_p95'), and the
+    most recent slow statements ('slow_queries')
+    """
+    # Include this process's latest statements
+    query_stats_collector.flush(force=True)
+
+    fingerprints = {}
+    slow_queries = []
+    for snapshot in get_process_snapshots(QUERY_STATS_PROCESSES_KEY):
+        slow_queries.extend(snapshot['slow_queries'])
+        for fingerprint, stats in snapshot['fingerprints'].items():
+            combined = fingerprints.setdefault(fingerprint, {
+                'query': fingerprint,
+                'count': 0,
+                'total_time': 0.0,
+                'max_time': 0.0,
+                'durations': [],
+                'view_name': None,
+            })
+            combined['count'] += stats['count']
+            combined['total_time'] += stats['total_time']
+            combined['max_time'] = max(combined['max_time'], stats['max_time'])
+            combined['durations'] += stats['durations']
+            combined['view_name'] = combined['view_name'] or stats['view_name']
+
+    queries = list(fingerprints.values())
+    for query in queries:
+        query['average_time'] = query['total_time'] / query['count']
+        query['p95_time'] = percentile(query.pop('durations'), 95)
+
+    for slow_query in slow_queries:
+        slow_query['timestamp'] = datetime.fromtimestamp(slow_query['time'], tz=timezone.get_current_timezone())
+    slow_queries.sort(key=lambda slow_query: slow_query['time'], reverse=True)
+
+    return {
+        'by_total_time': sorted(queries, key=lambda query: query['total_time'], reverse=True)[:limit],
+        'by_count': sorted(queries, key=lambda query: query['count'], reverse=True)[:limit],
+        'by_p95': sorted(queries, key=lambda query: query['p95_time'], reverse=True)[:limit],
+        'slow_queries': slow_queries[:RECENT_SLOW_QUERIES_LIMIT],
+    }
@@ -2,13 +2,18 @@ from django.shortcuts import render, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.utils import timezone
-from django.db.models import Count, Sum, Q
+from django.db.models import Count, Sum, Q, Prefetch
 from datetime import timedelta
 
 from accounts_app.models import CustomUser
 from venues_app.models import Venue, Service, Review
 from booking_cart_app.models import Booking, BookingItem
 from payments_app.models import Transaction, Invoice
+from admin_app.utils import get_daily_stats
+from .utils import (
+    get_time_series, get_provider_snapshot, get_upcoming_booking_items, get_upcoming_bookings,
+    get_request_stats, get_performance_metrics, get_query_stats
+)
 
 from .forms import DateRangeForm
 
@@ -37,24 +42,10 @@ def customer_dashboard(request):
     # Dashboard preferences have been removed as per requirements
 
     # Get recent bookings
-    recent_bookings = Booking.objects.filter(user=request.user).order_by('-booking_date')[:5]
+    recent_bookings = Booking.objects.filter(user=request.user).select_related('venue').order_by('-booking_date')[:5]
 
-    # Get upcoming bookings
-    today = timezone.now().date()
-    upcoming_bookings = []
-    for booking in Booking.objects.filter(user=request.user, status='confirmed'):
-        booking_items = booking.items.filter(date__gte=today).order_by('date', 'time_slot')
-        if booking_items.exists():
-            upcoming_bookings.append({
-                'booking': booking,
-                'next_item': booking_items.first()
-            })
-
-    # Sort upcoming bookings by date and time
-    upcoming_bookings.sort(key=lambda x: timezone.make_aware(
-        timezone.datetime.combine(x['next_item'].date, x['next_item'].time_slot)
-    ))
-    upcoming_bookings = upcoming_bookings[:5]
+    # Get the next 5 upcoming bookings, each with its next item, in a single query
+    upcoming_bookings = get_upcoming_bookings(request.user, limit=5)
 
     # Get recent reviews
     recent_reviews = Review.objects.filter(user=request.user).order_by('-created_at')[:5]
@@ -90,17 +81,13 @@ def provider_dashboard(request):
     # Get recent bookings
     recent_bookings = Booking.objects.filter(venue__in=venues).order_by('-booking_date')[:5]
 
-    # Get booking statistics
-    total_bookings = Booking.objects.filter(venue__in=venues).count()
-    pending_bookings = Booking.objects.filter(venue__in=venues, status='pending').count()
-    confirmed_bookings = Booking.objects.filter(venue__in=venues, status='confirmed').count()
-    cancelled_bookings = Booking.objects.filter(venue__in=venues, status='cancelled').count()
-
-    # Get revenue statistics
-    total_revenue = Booking.objects.filter(
-        venue__in=venues,
-        status='confirmed'
-    ).aggregate(total=Sum('total_price'))['total'] or 0
+    # Get booking and revenue statistics from the cached dashboard snapshot
+    snapshot = get_provider_snapshot(request.user.id)
+    total_bookings = snapshot['total_bookings']
+    pending_bookings = snapshot['bookings_by_status'].get('pending', 0)
+    confirmed_bookings = snapshot['bookings_by_status'].get('confirmed', 0)
+    cancelled_bookings = snapshot['bookings_by_status'].get('cancelled', 0)
+    total_revenue = snapshot['revenue_by_status'].get('confirmed', 0)
 
     # Get recent reviews
     recent_reviews = Review.objects.filter(venue__in=venues).order_by('-created_at')[:5]
@@ -115,6 +102,8 @@ def provider_dashboard(request):
         'cancelled_bookings': cancelled_bookings,
         'total_revenue': total_revenue,
         'recent_reviews': recent_reviews,
+        'review_count': snapshot['review_count'],
+        'average_rating': snapshot['average_rating'],
     }
 
     return render(request, 'dashboard_app/provider/dashboard.html', context)
@@ -250,29 +239,24 @@ def customer_active_bookings(request):
         messages.error(request, "You don't have access to the customer dashboard.")
         return redirect('venues_app:home')
 
-    # Get active bookings (confirmed and not completed)
+    # Get active bookings (confirmed and not completed) with their venues and items
     active_bookings = Booking.objects.filter(
         user=request.user,
         status='confirmed'
+    ).select_related('venue__owner').prefetch_related(
+        Prefetch('items', queryset=BookingItem.objects.select_related('service'))
     ).order_by('booking_date')
 
-    # Get upcoming booking items
-    today = timezone.now().date()
+    # Get upcoming booking items, soonest first, in a single query
     now = timezone.now()
-    upcoming_booking_items = []
-
-    for booking in active_bookings:
-        items = booking.items.filter(date__gte=today).order_by('date', 'time_slot')
-        if items.exists():
-            for item in items:
-                upcoming_booking_items.append({
-                    'booking': booking,
-                    'item': item,
-                    'datetime': timezone.make_aware(timezone.datetime.combine(item.date, item.time_slot))
-                })
-
-    # Sort by date and time
-    upcoming_booking_items.sort(key=lambda x: x['datetime'])
+    upcoming_booking_items = [
+        {
+            'booking': item.booking,
+            'item': item,
+            'datetime': timezone.make_aware(timezone.datetime.combine(item.date, item.time_slot))
+        }
+        for item in get_upcoming_booking_items(request.user)
+    ]
 
     context = {
         'active_bookings': active_bookings,
@@ -290,32 +274,24 @@ def customer_favorite_venues(request):
         messages.error(request, "You don't have access to the customer dashboard.")
         return redirect('venues_app:home')
 
-    # Get venues the customer has booked before
-    booked_venues = Venue.objects.filter(
-        bookings__user=request.user
-    ).distinct()
-
-    # Get venues the customer has reviewed
-    reviewed_venues = Venue.objects.filter(
-        reviews__user=request.user
-    ).distinct()
-
-    # Combine and remove duplicates
-    favorite_venues = (booked_venues | reviewed_venues).distinct()
+    # Get venues the customer has booked or reviewed, with the customer's booking count,
+    # the customer's review and the venue images loaded up front
+    favorite_venues = Venue.objects.filter(
+        Q(id__in=Booking.objects.filter(user=request.user).values('venue_id')) |
+        Q(id__in=Review.objects.filter(user=request.user).values('venue_id'))
+    ).annotate(
+        user_booking_count=Count('bookings', filter=Q(bookings__user=request.user))
+    ).prefetch_related(
+        Prefetch('reviews', queryset=Review.objects.filter(user=request.user), to_attr='user_reviews'),
+        'images'
+    )
 
-    # Get booking count for each venue
+    # Get booking count and review for each venue
     venue_booking_counts = {}
-    for venue in favorite_venues:
-        venue_booking_counts[venue.id] = Booking.objects.filter(
-            user=request.user,
-            venue=venue
-        ).count()
-
-    # Get review for each venue
     venue_reviews = {}
     for venue in favorite_venues:
-        review = Review.objects.filter(user=request.user, venue=venue).first()
-        venue_reviews[venue.id] = review
+        venue_booking_counts[venue.id] = venue.user_booking_count
+        venue_reviews[venue.id] = venue.user_reviews[0] if venue.user_reviews else None
 
     context = {
         'favorite_venues': favorite_venues,
@@ -444,6 +420,9 @@ def provider_revenue_reports(request):
             start_date = custom_start
             end_date = custom_end
 
+    # Get the series granularity (day, week or month)
+    granularity = (form.cleaned_data.get('granularity') if form.is_valid() else None) or 'day'
+
     # Get provider's venues
     venues = Venue.objects.filter(owner=request.user)
 
@@ -455,24 +434,20 @@ def provider_revenue_reports(request):
         status='confirmed'
     ).order_by('-booking_date')
 
+    # Calculate revenue by day, week or month in a single grouped query
+    revenue_series = get_time_series(
+        bookings, 'booking_date', start_date, end_date, granularity, revenue=Sum('total_price')
+    )
+    revenue_by_day = {key: point['revenue'] for key, point in revenue_series.items()}
+
     # Calculate total revenue
-    total_revenue = bookings.aggregate(total=Sum('total_price'))['total'] or 0
-
-    # Calculate revenue by venue
-    revenue_by_venue = {}
-    for venue in venues:
-        venue_revenue = bookings.filter(venue=venue).aggregate(total=Sum('total_price'))['total'] or 0
-        revenue_by_venue[venue.id] = venue_revenue
-
-    # Calculate revenue by day
-    revenue_by_day = {}
-    current_date = start_date
-    while current_date <= end_date:
-        day_revenue = bookings.filter(
-            booking_date__date=current_date
-        ).aggregate(total=Sum('total_price'))['total'] or 0
-        revenue_by_day[current_date.strftime('%Y-%m-%d')] = day_revenue
-        current_date += timedelta(days=1)
+    total_revenue = sum(revenue_by_day.values())
+
+    # Calculate revenue by venue in a single grouped query
+    revenue_by_venue = {venue.id: 0 for venue in venues}
+    revenue_by_venue.update(
+        bookings.values_list('venue_id').annotate(total=Sum('total_price')).order_by()
+    )
 
     context = {
         'form': form,
@@ -483,6 +458,7 @@ def provider_revenue_reports(request):
         'total_revenue': total_revenue,
         'revenue_by_venue': revenue_by_venue,
         'revenue_by_day': revenue_by_day,
+        'granularity': granularity,
     }
 
     return render(request, 'dashboard_app/provider/revenue_reports.html', context)
@@ -501,17 +477,13 @@ def provider_service_performance(request):
     # Get all services for the provider's venues
     services = Service.objects.filter(venue__in=venues, is_active=True)
 
-    # Get booking items for each service
+    # Get booking metrics for each service from the cached dashboard snapshot
+    snapshot = get_provider_snapshot(request.user.id)
     service_metrics = {}
     for service in services:
-        # Get booking items for this service
-        booking_items = BookingItem.objects.filter(service=service)
-
-        # Count total bookings
-        total_bookings = booking_items.count()
-
-        # Calculate total revenue
-        total_revenue = booking_items.aggregate(total=Sum('service_price'))['total'] or 0
+        service_stats = snapshot['services'].get(service.id, {})
+        total_bookings = service_stats.get('total_bookings', 0)
+        total_revenue = service_stats.get('total_revenue', 0)
 
         # Store metrics
         service_metrics[service.id] = {
@@ -555,17 +527,13 @@ def provider_discount_performance(request):
         discounted_price__isnull=False
     )
 
-    # Get booking items for each discounted service
+    # Get booking metrics for each discounted service from the cached dashboard snapshot
+    snapshot = get_provider_snapshot(request.user.id)
     discount_metrics = {}
     for service in discounted_services:
-        # Get booking items for this service
-        booking_items = BookingItem.objects.filter(service=service)
-
-        # Count total bookings
-        total_bookings = booking_items.count()
-
-        # Calculate total revenue
-        total_revenue = booking_items.aggregate(total=Sum('service_price'))['total'] or 0
+        service_stats = snapshot['services'].get(service.id, {})
+        total_bookings = service_stats.get('total_bookings', 0)
+        total_revenue = service_stats.get('total_revenue', 0)
 
         # Calculate discount percentage
         discount_percentage = service.get_discount_percentage()
@@ -657,12 +625,12 @@ def admin_platform_overview(request):
             start_date = custom_start
             end_date = custom_end
 
+    # Get daily statistics for the period from the daily rollups
+    daily_stats = get_daily_stats(start_date, end_date, revenue_statuses=['confirmed'])
+
     # Get user statistics
     total_users = CustomUser.objects.count()
-    new_users = CustomUser.objects.filter(
-        date_joined__date__gte=start_date,
-        date_joined__date__lte=end_date
-    ).count()
+    new_users = sum(day['new_users'] for day in daily_stats.values())
     customer_count = CustomUser.objects.filter(is_customer=True).count()
     provider_count = CustomUser.objects.filter(is_service_provider=True).count()
 
@@ -677,50 +645,13 @@ def admin_platform_overview(request):
 
     # Get booking statistics
     total_bookings = Booking.objects.count()
-    new_bookings = Booking.objects.filter(
-        booking_date__date__gte=start_date,
-        booking_date__date__lte=end_date
-    ).count()
+    new_bookings = sum(day['new_bookings'] for day in daily_stats.values())
     confirmed_bookings = Booking.objects.filter(status='confirmed').count()
     cancelled_bookings = Booking.objects.filter(status='cancelled').count()
 
     # Get revenue statistics
     total_revenue = Booking.objects.filter(status='confirmed').aggregate(total=Sum('total_price'))['total'] or 0
-    period_revenue = Booking.objects.filter(
-        status='confirmed',
-        booking_date__date__gte=start_date,
-        booking_date__date__lte=end_date
-    ).aggregate(total=Sum('total_price'))['total'] or 0
-
-    # Get daily statistics for the period
-    daily_stats = {}
-    current_date = start_date
-    while current_date <= end_date:
-        # Get new users for this day
-        day_new_users = CustomUser.objects.filter(
-            date_joined__date=current_date
-        ).count()
-
-        # Get new bookings for this day
-        day_new_bookings = Booking.objects.filter(
-            booking_date__date=current_date
-        ).count()
-
-        # Get revenue for this day
-        day_revenue = Booking.objects.filter(
-            status='confirmed',
-            booking_date__date=current_date
-        ).aggregate(total=Sum('total_price'))['total'] or 0
-
-        # Store daily stats
-        daily_stats[current_date.strftime('%Y-%m-%d')] = {
-            'date': current_date,
-            'new_users': day_new_users,
-            'new_bookings': day_new_bookings,
-            'revenue': day_revenue,
-        }
-
-        current_date += timedelta(days=1)
+    period_revenue = sum(day['revenue'] for day in daily_stats.values())
 
     context = {
         'form': form,
@@ -793,6 +724,9 @@ def admin_user_statistics(request):
             start_date = custom_start
             end_date = custom_end
 
+    # Get the series granularity (day, week or month)
+    granularity = (form.cleaned_data.get('granularity') if form.is_valid() else None) or 'day'
+
     # Get all users
     all_users = CustomUser.objects.all()
 
@@ -802,14 +736,18 @@ def admin_user_statistics(request):
     provider_count = all_users.filter(is_service_provider=True).count()
     staff_count = all_users.filter(is_staff=True).count()
 
-    # Get new users in the period
-    new_users = all_users.filter(
-        date_joined__date__gte=start_date,
-        date_joined__date__lte=end_date
+    # Get user registrations by day, week or month in a single grouped query
+    daily_registrations = get_time_series(
+        all_users, 'date_joined', start_date, end_date, granularity,
+        total=Count('id'),
+        customers=Count('id', filter=Q(is_customer=True)),
+        providers=Count('id', filter=Q(is_service_provider=True))
     )
-    new_users_count = new_users.count()
-    new_customers = new_users.filter(is_customer=True).count()
-    new_providers = new_users.filter(is_service_provider=True).count()
+
+    # Get new users in the period
+    new_users_count = sum(point['total'] for point in daily_registrations.values())
+    new_customers = sum(point['customers'] for point in daily_registrations.values())
+    new_providers = sum(point['providers'] for point in daily_registrations.values())
 
     # Get active users (users with bookings in the period)
     active_users = CustomUser.objects.filter(
@@ -818,23 +756,6 @@ def admin_user_statistics(request):
     ).distinct()
     active_users_count = active_users.count()
 
-    # Get user registration by day
-    daily_registrations = {}
-    current_date = start_date
-    while current_date <= end_date:
-        day_users = all_users.filter(date_joined__date=current_date)
-        day_customers = day_users.filter(is_customer=True).count()
-        day_providers = day_users.filter(is_service_provider=True).count()
-
-        daily_registrations[current_date.strftime('%Y-%m-%d')] = {
-            'date': current_date,
-            'total': day_users.count(),
-            'customers': day_customers,
-            'providers': day_providers,
-        }
-
-        current_date += timedelta(days=1)
-
     # Get top 10 most active customers (by number of bookings)
     top_customers = CustomUser.objects.filter(is_customer=True).annotate(
         booking_count=Count('bookings')
@@ -859,6 +780,7 @@ def admin_user_statistics(request):
         'new_providers': new_providers,
         'active_users_count': active_users_count,
         'daily_registrations': daily_registrations,
+        'granularity': granularity,
         'top_customers': top_customers,
         'top_providers': top_providers,
     }
@@ -924,6 +846,9 @@ def admin_revenue_tracking(request):
             start_date = custom_start
             end_date = custom_end
 
+    # Get the series granularity (day, week or month)
+    granularity = (form.cleaned_data.get('granularity') if form.is_valid() else None) or 'day'
+
     # Get confirmed bookings for the period
     bookings = Booking.objects.filter(
         status='confirmed',
@@ -931,31 +856,21 @@ def admin_revenue_tracking(request):
         booking_date__date__lte=end_date
     )
 
-    # Calculate total revenue
-    total_revenue = bookings.aggregate(total=Sum('total_price'))['total'] or 0
-
-    # Calculate revenue by day
-    daily_revenue = {}
-    current_date = start_date
-    while current_date <= end_date:
-        day_revenue = bookings.filter(
-            booking_date__date=current_date
-        ).aggregate(total=Sum('total_price'))['total'] or 0
-
-        daily_revenue[current_date.strftime('%Y-%m-%d')] = {
-            'date': current_date,
-            'revenue': day_revenue,
-        }
+    # Calculate revenue by day, week or month in a single grouped query
+    daily_revenue = get_time_series(
+        bookings, 'booking_date', start_date, end_date, granularity, revenue=Sum('total_price')
+    )
 
-        current_date += timedelta(days=1)
+    # Calculate total revenue
+    total_revenue = sum(point['revenue'] for point in daily_revenue.values())
 
-    # Calculate revenue by venue category
+    # Calculate revenue by venue category in a single grouped query
     category_revenue = {}
-    for booking in bookings:
-        category = booking.venue.category.name if booking.venue.category else 'Uncategorized'
-        if category not in category_revenue:
-            category_revenue[category] = 0
-        category_revenue[category] += booking.total_price
+    for category, revenue in bookings.values_list('venue__category__name').annotate(
+        revenue=Sum('total_price')
+    ).order_by():
+        category = category or 'Uncategorized'
+        category_revenue[category] = category_revenue.get(category, 0) + revenue
 
     # Sort categories by revenue (descending)
     sorted_categories = sorted(
@@ -973,9 +888,9 @@ def admin_revenue_tracking(request):
 
     # Get top 10 services by revenue
     top_services = Service.objects.filter(
-        booking_items__booking__in=bookings
+        bookingitem__booking__in=bookings
     ).annotate(
-        revenue=Sum('booking_items__service_price')
+        revenue=Sum('bookingitem__service_price')
     ).order_by('-revenue')[:10]
 
     context = {
@@ -985,6 +900,7 @@ def admin_revenue_tracking(request):
         'bookings': bookings,
         'total_revenue': total_revenue,
         'daily_revenue': daily_revenue,
+        'granularity': granularity,
         'category_revenue': category_revenue,
         'sorted_categories': sorted_categories,
         'top_venues': top_venues,
@@ -1030,36 +946,20 @@ def admin_system_health(request):
         },
     ]
 
-    # Get system performance metrics (would typically come from monitoring tools)
-    # For demo purposes, we'll just show some placeholder data
-    performance_metrics = {
-        'cpu_usage': 25,  # percentage
-        'memory_usage': 40,  # percentage
-        'disk_usage': 30,  # percentage
-        'average_response_time': 120,  # milliseconds
-        'requests_per_minute': 10,
-    }
+    # Get per-view request statistics recorded by the query budget middleware
+    request_stats = get_request_stats()
+    performance_metrics = get_performance_metrics(request_stats)
 
-    # Get recent slow queries (would typically come from database monitoring)
-    # For demo purposes, we'll just show some placeholder data
-    slow_queries = [
-        {
-            'timestamp': timezone.now() - timedelta(hours=3),
-            'duration': 2.5,  # seconds
-            'query': 'SELECT * FROM venues_app_venue JOIN venues_app_service ON venue_id=venues_app_venue.id WHERE ...',
-        },
-        {
-            'timestamp': timezone.now() - timedelta(hours=5),
-            'duration': 1.8,  # seconds
-            'query': 'SELECT * FROM booking_cart_app_booking JOIN booking_cart_app_bookingitem ON booking_id=booking_cart_app_booking.id WHERE ...',
-        },
-    ]
+    # Get the most expensive statements and recent slow statements recorded by every process
+    query_stats = get_query_stats()
 
     context = {
         'db_stats': db_stats,
         'recent_errors': recent_errors,
         'performance_metrics': performance_metrics,
-        'slow_queries': slow_queries,
+        'request_stats': request_stats,
+        'query_stats': query_stats,
+        'slow_queries': query_stats['slow_queries'],
     }
 
     return render(request, 'dashboard_app/admin/system_health.html', context)
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import VenueDiscount, ServiceDiscount, PlatformDiscount, DiscountUsage
+from .models import VenueDiscount, ServiceDiscount, PlatformDiscount, DiscountUsage, ServiceEffectivePrice
 
 
 class DiscountBaseAdmin(admin.ModelAdmin):
@@ -99,3 +99,13 @@ class DiscountUsageAdmin(admin.ModelAdmin):
     readonly_fields = ('user', 'discount_type', 'discount_id', 'booking', 'original_price', 'discount_amount', 'final_price', 'used_at')
     date_hierarchy = 'used_at'
 
+
+
+@admin.register(ServiceEffectivePrice)
+class ServiceEffectivePriceAdmin(admin.ModelAdmin):
+    """Admin for the precomputed effective price index"""
+    list_display = ('service', 'original_price', 'final_price', 'discount_model', 'discount_name', 'valid_until', 'updated_at')
+    list_filter = ('discount_model',)
+    search_fields = ('service__title', 'service__venue__name', 'discount_name')
+    readonly_fields = ('service', 'original_price', 'final_price', 'discount_amount', 'discount_model', 'discount_id',
+                       'discount_name', 'discount_type', 'discount_value', 'valid_until', 'updated_at')
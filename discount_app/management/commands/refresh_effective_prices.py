@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+from venues_app.models import Service
+from discount_app.utils import refresh_effective_prices
+
+
+class Command(BaseCommand):
+    help = 'Recompute the precomputed effective price of every active service'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Number of services to refresh per batch'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        services = Service.objects.filter(is_active=True).select_related('venue').order_by('id')
+
+        refreshed_count = 0
+        batch = []
+        for service in services.iterator(chunk_size=batch_size):
+            batch.append(service)
+            if len(batch) >= batch_size:
+                refreshed_count += len(refresh_effective_prices(batch))
+                batch = []
+
+        if batch:
+            refreshed_count += len(refresh_effective_prices(batch))
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Refreshed effective prices for {refreshed_count} services')
+        )
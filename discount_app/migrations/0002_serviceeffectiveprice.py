@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:27
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('discount_app', '0001_initial'),
+        ('venues_app', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ServiceEffectivePrice',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('original_price', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('final_price', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('discount_amount', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('discount_model', models.CharField(blank=True, choices=[('VenueDiscount', 'Venue Discount'), ('ServiceDiscount', 'Service Discount'), ('PlatformDiscount', 'Platform Discount')], max_length=20)),
+                ('discount_id', models.PositiveIntegerField(blank=True, null=True)),
+                ('discount_name', models.CharField(blank=True, max_length=255)),
+                ('discount_type', models.CharField(blank=True, choices=[('percentage', 'Percentage'), ('fixed_amount', 'Fixed Amount')], max_length=20)),
+                ('discount_value', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('valid_until', models.DateTimeField(help_text='Next discount start or end boundary for this service')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('service', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='effective_price', to='venues_app.service')),
+            ],
+            options={
+                'verbose_name': 'Service Effective Price',
+                'verbose_name_plural': 'Service Effective Prices',
+            },
+        ),
+    ]
@@ -135,3 +135,49 @@ class DiscountUsage(models.Model):
     def __str__(self):
         return f"{self.user.email} - {self.discount_type} - {self.used_at.strftime('%Y-%m-%d')}"
 
+
+
+class ServiceEffectivePrice(models.Model):
+    """Precomputed best discount and final price for a service"""
+    service = models.OneToOneField(Service, on_delete=models.CASCADE, related_name='effective_price')
+    original_price = models.DecimalField(max_digits=10, decimal_places=2)
+    final_price = models.DecimalField(max_digits=10, decimal_places=2)
+    discount_amount = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    discount_model = models.CharField(max_length=20, choices=DiscountUsage.DISCOUNT_MODEL_CHOICES, blank=True)
+    discount_id = models.PositiveIntegerField(null=True, blank=True)
+    discount_name = models.CharField(max_length=255, blank=True)
+    discount_type = models.CharField(max_length=20, choices=DiscountType.choices, blank=True)
+    discount_value = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    valid_until = models.DateTimeField(help_text="Next discount start or end boundary for this service")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Service Effective Price'
+        verbose_name_plural = 'Service Effective Prices'
+
+    def __str__(self):
+        return f"{self.service_id} - {self.final_price}"
+
+    def has_discount(self):
+        """Check if a discount applies to the service"""
+        return self.discount_id is not None
+
+    def is_stale(self, service, now=None):
+        """Check if the stored price must be recomputed for the given service"""
+        now = now or timezone.now()
+        return self.valid_until <= now or self.original_price != service.price
+
+    def get_discount_info(self):
+        """Return the discount information in the format used by templates"""
+        if not self.has_discount():
+            return None
+        return {
+            'id': self.discount_id,
+            'model': self.discount_model,
+            'name': self.discount_name,
+            'type': self.discount_type,
+            'value': self.discount_value,
+            'amount': self.discount_amount,
+            'original_price': self.original_price,
+            'final_price': self.final_price,
+        }
@@ -1,7 +1,9 @@
-from django.db.models.signals import post_save, pre_delete
+from django.db.models.signals import post_save, post_delete, pre_delete
 from django.dispatch import receiver
 from django.utils import timezone
+from venues_app.models import Venue
 from .models import VenueDiscount, ServiceDiscount, PlatformDiscount
+from .utils import invalidate_effective_prices
 
 
 @receiver(post_save, sender=VenueDiscount)
@@ -9,6 +11,9 @@ def handle_venue_discount_save(sender, instance, created, **kwargs):
     """
     Signal handler for when a venue discount is saved
     """
+    # Recompute effective prices for the venue's services on next read
+    invalidate_effective_prices(service__venue_id=instance.venue_id)
+
     # If this is a new discount and it's already active, we might want to notify customers
     if created and instance.is_approved and instance.start_date <= timezone.now() <= instance.end_date:
         # This would be a good place to trigger notifications
@@ -20,6 +25,9 @@ def handle_service_discount_save(sender, instance, created, **kwargs):
     """
     Signal handler for when a service discount is saved
     """
+    # Recompute the service's effective price on next read
+    invalidate_effective_prices(service_id=instance.service_id)
+
     # If this is a new discount and it's already active, we might want to notify customers
     if created and instance.is_approved and instance.start_date <= timezone.now() <= instance.end_date:
         # This would be a good place to trigger notifications
@@ -31,7 +39,43 @@ def handle_platform_discount_save(sender, instance, created, **kwargs):
     """
     Signal handler for when a platform discount is saved
     """
+    # Platform discounts can apply to every service, and the category may have changed
+    invalidate_effective_prices()
+
     # If this is a new discount and it's already active, we might want to notify customers
     if created and instance.start_date <= timezone.now() <= instance.end_date:
         # This would be a good place to trigger notifications
         pass
+
+
+@receiver(post_delete, sender=VenueDiscount)
+def handle_venue_discount_delete(sender, instance, **kwargs):
+    """
+    Signal handler for when a venue discount is deleted
+    """
+    invalidate_effective_prices(service__venue_id=instance.venue_id)
+
+
+@receiver(post_delete, sender=ServiceDiscount)
+def handle_service_discount_delete(sender, instance, **kwargs):
+    """
+    Signal handler for when a service discount is deleted
+    """
+    invalidate_effective_prices(service_id=instance.service_id)
+
+
+@receiver(post_delete, sender=PlatformDiscount)
+def handle_platform_discount_delete(sender, instance, **kwargs):
+    """
+    Signal handler for when a platform discount is deleted
+    """
+    invalidate_effective_prices()
+
+
+@receiver(post_save, sender=Venue)
+def handle_venue_save(sender, instance, created, **kwargs):
+    """
+    Signal handler for when a venue is saved; its category decides which platform discounts apply
+    """
+    if not created:
+        invalidate_effective_prices(service__venue_id=instance.id)
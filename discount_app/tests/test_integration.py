@@ -213,19 +213,12 @@ class DiscountIntegrationTest(TestCase):
         self.assertEqual(booking_item.service, self.service)
         self.assertEqual(booking_item.service_title, self.service.title)
 
-        # Create a discount usage record manually (in a real app, this would be done by middleware)
-        discount_usage = DiscountUsage.objects.create(
-            user=self.customer,
-            discount_type='ServiceDiscount',
-            discount_id=self.service_discount.id,
-            booking_id=booking.id,
-            original_price=self.service.price,
-            discount_amount=Decimal('30.00'),
-            final_price=Decimal('70.00')
-        )
+        # Check that checkout priced the item from the effective price index
+        self.assertEqual(booking_item.service_price, Decimal('70.00'))
 
-        # Check that the discount usage was recorded correctly
+        # Check that the discount usage was recorded correctly by checkout
         self.assertEqual(DiscountUsage.objects.count(), 1)
+        discount_usage = DiscountUsage.objects.get()
         self.assertEqual(discount_usage.user, self.customer)
         self.assertEqual(discount_usage.discount_type, 'ServiceDiscount')
         self.assertEqual(discount_usage.discount_id, self.service_discount.id)
@@ -7,10 +7,11 @@ from datetime import timedelta
 from venues_app.models import Category, Venue, Service
 from discount_app.models import (
     VenueDiscount, ServiceDiscount, PlatformDiscount,
-    DiscountUsage, DiscountType, DiscountStatus
+    DiscountUsage, DiscountType, DiscountStatus, ServiceEffectivePrice
 )
 from discount_app.utils import (
-    get_applicable_discounts, get_best_discount, record_discount_usage
+    get_applicable_discounts, get_best_discount, record_discount_usage,
+    get_effective_prices, apply_effective_prices, get_best_discounts
 )
 
 User = get_user_model()
@@ -204,6 +205,67 @@ class DiscountUtilsTest(TestCase):
         # The best discount should now be the better service discount
         self.assertEqual(best_discount[0], better_service_discount)
 
+    def test_get_best_discounts(self):
+        """Test get_best_discounts resolves many services in three queries"""
+        # A cheaper service only qualifies for the platform discount
+        cheap_service = Service.objects.create(
+            venue=self.venue,
+            title='Express Facial',
+            short_description='A quick facial',
+            price=Decimal('40.00'),
+            duration=30,
+            is_active=True
+        )
+        services = list(Service.objects.filter(venue=self.venue).select_related('venue'))
+
+        with self.assertNumQueries(3):
+            best_discounts = get_best_discounts(services)
+
+        # Results match the single-service resolver
+        for service in services:
+            self.assertEqual(best_discounts[service.id], get_best_discount(service))
+
+        self.assertEqual(best_discounts[self.service.id][0], self.active_venue_discount)
+        self.assertEqual(best_discounts[cheap_service.id][0], self.active_platform_discount)
+        self.assertEqual(best_discounts[cheap_service.id][2], Decimal('30.00'))
+
+    def test_get_effective_prices(self):
+        """Test get_effective_prices stores the best discount until the next boundary"""
+        effective_price = get_effective_prices([self.service])[self.service.id]
+
+        # The venue discount (20% off) is the best one
+        self.assertEqual(effective_price.final_price, Decimal('80.00'))
+        self.assertEqual(effective_price.discount_model, 'VenueDiscount')
+        self.assertEqual(effective_price.discount_id, self.active_venue_discount.id)
+
+        # The scheduled venue discount starts tomorrow, so the price must be recomputed then
+        self.assertEqual(effective_price.valid_until, self.tomorrow)
+        self.assertTrue(ServiceEffectivePrice.objects.filter(service=self.service).exists())
+
+    def test_effective_price_invalidated_by_discount_change(self):
+        """Test that saving a discount invalidates the stored effective price"""
+        get_effective_prices([self.service])
+
+        # Withdraw approval of the venue discount
+        self.active_venue_discount.is_approved = False
+        self.active_venue_discount.save()
+        self.assertFalse(ServiceEffectivePrice.objects.filter(service=self.service).exists())
+
+        # The service discount (15% off) is now the best one
+        apply_effective_prices([self.service])
+        self.assertEqual(self.service.discounted_price, Decimal('85.00'))
+        self.assertEqual(self.service.discount_info['name'], 'New Client Special')
+
+    def test_effective_price_refreshed_after_boundary(self):
+        """Test that an effective price past its boundary is recomputed"""
+        get_effective_prices([self.service])
+        ServiceEffectivePrice.objects.filter(service=self.service).update(
+            valid_until=self.yesterday, final_price=Decimal('1.00')
+        )
+
+        effective_price = get_effective_prices([self.service])[self.service.id]
+        self.assertEqual(effective_price.final_price, Decimal('80.00'))
+
     def test_record_discount_usage(self):
         """Test record_discount_usage function"""
         # Skip this test as it requires a real Booking instance
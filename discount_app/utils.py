@@ -1,5 +1,14 @@
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db.models import Q
 from django.utils import timezone
-from .models import VenueDiscount, ServiceDiscount, PlatformDiscount, DiscountUsage
+from venues_app.models import Service, Venue
+from .models import VenueDiscount, ServiceDiscount, PlatformDiscount, DiscountUsage, ServiceEffectivePrice
+
+
+# Upper bound on how long a precomputed price is trusted without a refresh
+EFFECTIVE_PRICE_MAX_AGE = timedelta(hours=24)
 
 
 def get_applicable_discounts(service, user=None):
@@ -111,3 +120,215 @@ def record_discount_usage(discount, user, booking, original_price, discount_amou
     )
     
     return usage
+
+
+def _get_venue_categories(services):
+    """
+    Map venue ids to category ids, reusing venues already loaded on the services
+    """
+    venue_field = Service._meta.get_field('venue')
+    venue_categories = {}
+    for service in services:
+        if venue_field.is_cached(service):
+            venue_categories[service.venue_id] = service.venue.category_id
+
+    missing_venue_ids = {service.venue_id for service in services} - venue_categories.keys()
+    if missing_venue_ids:
+        venue_categories.update(
+            Venue.objects.filter(id__in=missing_venue_ids).values_list('id', 'category_id')
+        )
+
+    return venue_categories
+
+
+def resolve_discounts(services, now=None):
+    """
+    Resolve the discounts of many services at once. All current and upcoming service,
+    venue and platform discounts are loaded in three queries and matched in memory,
+    applying the same minimum value, max discount and category rules as
+    get_applicable_discounts
+    Returns a dictionary mapping service id to a tuple (applicable_discounts, next_boundary)
+    where next_boundary is the next discount start or end that can change the result
+    """
+    now = now or timezone.now()
+    services = list({service.id: service for service in services}.values())
+    if not services:
+        return {}
+
+    venue_categories = _get_venue_categories(services)
+
+    service_discounts = defaultdict(list)
+    for discount in ServiceDiscount.objects.filter(
+        service_id__in=[service.id for service in services],
+        is_approved=True,
+        end_date__gte=now
+    ):
+        service_discounts[discount.service_id].append(discount)
+
+    venue_discounts = defaultdict(list)
+    for discount in VenueDiscount.objects.filter(
+        venue_id__in=venue_categories.keys(),
+        is_approved=True,
+        end_date__gte=now
+    ):
+        venue_discounts[discount.venue_id].append(discount)
+
+    # Venues without a category are offered every platform discount
+    platform_discounts = PlatformDiscount.objects.filter(end_date__gte=now)
+    category_ids = set(venue_categories.values())
+    if None not in category_ids:
+        platform_discounts = platform_discounts.filter(
+            Q(category__isnull=True) | Q(category_id__in=category_ids)
+        )
+    platform_discounts = list(platform_discounts)
+
+    resolved = {}
+    for service in services:
+        original_price = service.price
+        category_id = venue_categories.get(service.venue_id)
+        applicable_discounts = []
+        boundaries = [now + EFFECTIVE_PRICE_MAX_AGE]
+
+        for discount in service_discounts[service.id]:
+            if discount.start_date > now:
+                boundaries.append(discount.start_date)
+                continue
+            boundaries.append(discount.end_date)
+            applicable_discounts.append((
+                discount,
+                discount.calculate_discount(original_price),
+                discount.calculate_discounted_price(original_price)
+            ))
+
+        candidates = venue_discounts[service.venue_id] + [
+            discount for discount in platform_discounts
+            if not category_id or discount.category_id in (None, category_id)
+        ]
+        for discount in candidates:
+            if discount.min_booking_value > original_price:
+                continue
+            if discount.start_date > now:
+                boundaries.append(discount.start_date)
+                continue
+            boundaries.append(discount.end_date)
+
+            discount_amount = discount.calculate_discount(original_price)
+
+            # Apply max discount amount if set
+            if discount.max_discount_amount and discount_amount > discount.max_discount_amount:
+                discount_amount = discount.max_discount_amount
+
+            applicable_discounts.append((discount, discount_amount, original_price - discount_amount))
+
+        # Sort by final price (lowest first)
+        applicable_discounts.sort(key=lambda x: x[2])
+        resolved[service.id] = (applicable_discounts, min(boundaries))
+
+    return resolved
+
+
+def get_best_discounts(services, user=None):
+    """
+    Get the best discount for each of a list of services in three queries
+    Returns a dictionary mapping service id to a tuple (discount_object, discount_amount, final_price)
+    or None if no discount applies
+    """
+    return {
+        service_id: applicable_discounts[0] if applicable_discounts else None
+        for service_id, (applicable_discounts, _) in resolve_discounts(services).items()
+    }
+
+
+def refresh_effective_prices(services):
+    """
+    Recompute and store the effective price of each service
+    Returns a dictionary mapping service id to ServiceEffectivePrice
+    """
+    services = list(services)
+    resolved = resolve_discounts(services)
+    effective_prices = {}
+
+    for service in services:
+        applicable_discounts, valid_until = resolved[service.id]
+        effective_price = ServiceEffectivePrice(
+            service=service,
+            original_price=service.price,
+            final_price=service.price,
+            valid_until=valid_until
+        )
+
+        if applicable_discounts:
+            discount, discount_amount, final_price = applicable_discounts[0]
+            effective_price.final_price = final_price
+            effective_price.discount_amount = discount_amount
+            effective_price.discount_model = discount.__class__.__name__
+            effective_price.discount_id = discount.id
+            effective_price.discount_name = discount.name
+            effective_price.discount_type = discount.discount_type
+            effective_price.discount_value = discount.discount_value
+
+        effective_prices[service.id] = effective_price
+
+    ServiceEffectivePrice.objects.bulk_create(
+        effective_prices.values(),
+        update_conflicts=True,
+        unique_fields=['service'],
+        update_fields=[
+            'original_price', 'final_price', 'discount_amount', 'discount_model', 'discount_id',
+            'discount_name', 'discount_type', 'discount_value', 'valid_until', 'updated_at',
+        ]
+    )
+
+    return effective_prices
+
+
+def get_effective_prices(services):
+    """
+    Get the precomputed effective price for each service in one query,
+    refreshing entries that are missing or past a discount boundary
+    Returns a dictionary mapping service id to ServiceEffectivePrice
+    """
+    services = {service.id: service for service in services}
+    if not services:
+        return {}
+
+    now = timezone.now()
+    effective_prices = {
+        effective_price.service_id: effective_price
+        for effective_price in ServiceEffectivePrice.objects.filter(service_id__in=services.keys())
+    }
+
+    stale_services = [
+        service for service_id, service in services.items()
+        if service_id not in effective_prices or effective_prices[service_id].is_stale(service, now)
+    ]
+    if stale_services:
+        effective_prices.update(refresh_effective_prices(stale_services))
+
+    return effective_prices
+
+
+def apply_effective_prices(services):
+    """
+    Set discounted_price and discount_info on each service from its precomputed effective price.
+    Services without an applicable discount keep their own discounted price
+    """
+    services = [service for service in services if service is not None]
+    effective_prices = get_effective_prices(services)
+
+    for service in services:
+        effective_price = effective_prices.get(service.id)
+        if effective_price and effective_price.has_discount():
+            service.discounted_price = effective_price.final_price
+            service.discount_info = effective_price.get_discount_info()
+        else:
+            service.discount_info = None
+
+    return services
+
+
+def invalidate_effective_prices(**filters):
+    """
+    Delete precomputed effective prices matching the filters so they are recomputed on next read
+    """
+    return ServiceEffectivePrice.objects.filter(**filters).delete()
@@ -1,5 +1,7 @@
 from django.contrib import admin
-from .models import NotificationCategory, Notification, UserNotification, NotificationPreference
+from .models import (
+    NotificationCategory, Notification, UserNotification, UnreadNotificationCounter, NotificationPreference
+)
 
 
 @admin.register(NotificationCategory)
@@ -26,6 +28,13 @@ class UserNotificationAdmin(admin.ModelAdmin):
     readonly_fields = ('read_at', 'deleted_at')
 
 
+@admin.register(UnreadNotificationCounter)
+class UnreadNotificationCounterAdmin(admin.ModelAdmin):
+    list_display = ('user', 'unread_count', 'version', 'updated_at')
+    search_fields = ('user__email',)
+    readonly_fields = ('unread_count', 'version', 'updated_at')
+
+
 @admin.register(NotificationPreference)
 class NotificationPreferenceAdmin(admin.ModelAdmin):
     list_display = ('user', 'category', 'channel', 'is_enabled')
@@ -1,17 +1,22 @@
-from .utils import get_unread_count, get_user_notifications
+from utils.context import get_request_value, lazy_request_value
+from .utils import get_notification_summary
 
 
 def notifications_context(request):
     """
     Context processor to add notification data to all templates
+
+    Values are only computed when a template uses them, from a briefly cached
+    per-user summary.
     """
-    context = {
-        'unread_notifications_count': 0,
-        'recent_notifications': [],
+    def get_summary():
+        if not request.user.is_authenticated:
+            return {'unread_count': 0, 'recent': []}
+        return get_request_value(request, 'notification_summary', lambda: get_notification_summary(request.user))
+
+    return {
+        'unread_notifications_count': lazy_request_value(
+            request, 'unread_notifications_count', lambda: get_summary()['unread_count']
+        ),
+        'recent_notifications': lazy_request_value(request, 'recent_notifications', lambda: get_summary()['recent']),
     }
-    
-    if request.user.is_authenticated:
-        context['unread_notifications_count'] = get_unread_count(request.user)
-        context['recent_notifications'] = get_user_notifications(request.user)[:5]
-    
-    return context
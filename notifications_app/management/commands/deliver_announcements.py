@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from notifications_app.utils import NOTIFICATION_FANOUT_BATCH_SIZE, deliver_pending_announcements
+
+
+class Command(BaseCommand):
+    help = 'Deliver system announcements created for later delivery to every active user (run periodically)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=NOTIFICATION_FANOUT_BATCH_SIZE,
+            help='Number of recipients handled per query'
+        )
+
+    def handle(self, *args, **options):
+        delivered, created = deliver_pending_announcements(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Delivered {delivered} announcements as {created} user notifications'
+        ))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from notifications_app.utils import rebuild_unread_counters
+
+
+class Command(BaseCommand):
+    help = 'Reconcile the denormalized unread notification counters with the notifications (run periodically)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of counters to update per query'
+        )
+
+    def handle(self, *args, **options):
+        corrected = rebuild_unread_counters(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Corrected {corrected} unread notification counters'))
@@ -44,6 +44,9 @@ class Notification(models.Model):
     # For system-wide notifications
     is_system_wide = models.BooleanField(default=False)
 
+    # Set while an announcement waits to be fanned out by the deliver_announcements command
+    pending_delivery = models.BooleanField(default=False, db_index=True)
+
     # For tracking notification status
     is_active = models.BooleanField(default=True)
 
@@ -73,9 +76,26 @@ class UserNotification(models.Model):
         unique_together = ['user', 'notification']
         ordering = ['-notification__created_at']
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Store whether this notification was counted as unread to update the unread counter incrementally
+        if self.pk and not {'is_read', 'is_deleted'} & self.get_deferred_fields():
+            self._old_is_unread = self.is_unread()
+        else:
+            self._old_is_unread = None
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # Update _old_is_unread after save
+        self._old_is_unread = self.is_unread()
+
     def __str__(self):
         return f"{self.user.email} - {self.notification.title}"
 
+    def is_unread(self):
+        """Return True if the notification is counted in the user's unread count"""
+        return not self.is_read and not self.is_deleted
+
     def mark_as_read(self):
         """Mark the notification as read"""
         if not self.is_read:
@@ -98,6 +118,41 @@ class UserNotification(models.Model):
             self.save(update_fields=['is_deleted', 'deleted_at'])
 
 
+class UnreadNotificationCounter(models.Model):
+    """Denormalized number of unread notifications of a user, kept in step by signals"""
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='unread_notification_counter'
+    )
+    unread_count = models.IntegerField(default=0)
+    # Incremented on every change to the user's unread notifications, used for ETags
+    version = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.user_id} - {self.unread_count} unread"
+
+    @classmethod
+    def count_unread(cls, user_id):
+        """Count a user's unread notifications from the notifications themselves"""
+        return UserNotification.objects.filter(user_id=user_id, is_read=False, is_deleted=False).count()
+
+    @classmethod
+    def adjust(cls, user_id, delta):
+        """
+        Apply a change to a user's unread count in the database.
+        Users without a counter are skipped, their counter is created with an exact
+        count when it is first read.
+        """
+        return cls.objects.filter(pk=user_id).update(
+            unread_count=models.F('unread_count') + delta,
+            version=models.F('version') + 1,
+            updated_at=timezone.now()
+        ) > 0
+
+
 class NotificationPreference(models.Model):
     """User preferences for notifications"""
     CHANNEL_CHOICES = [
@@ -1,5 +1,7 @@
-from django.db.models.signals import post_save, pre_delete
+from django.db import transaction
+from django.db.models.signals import post_save, pre_delete, post_delete
 from django.dispatch import receiver
+from functools import partial
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 
@@ -7,7 +9,9 @@ from accounts_app.models import ServiceProviderProfile
 from booking_cart_app.models import Booking
 from review_app.models import Review, ReviewResponse
 
+from .models import UserNotification, UnreadNotificationCounter
 from .utils import (
+    invalidate_notification_summary,
     notify_new_booking, notify_booking_cancellation, notify_new_review,
     notify_review_response, notify_service_provider_approval,
     notify_service_provider_rejection, notify_booking_status_changed
@@ -54,3 +58,30 @@ def service_provider_approval_notification(sender, instance, created, **kwargs):
     # we'll just notify when a new profile is created
     if created:
         notify_service_provider_approval(instance)
+
+
+@receiver(post_save, sender=UserNotification)
+@receiver(post_delete, sender=UserNotification)
+def invalidate_notification_summary_on_change(sender, instance, **kwargs):
+    """Discard the user's cached notification summary once a notification change is committed"""
+    transaction.on_commit(partial(invalidate_notification_summary, instance.user_id))
+
+
+@receiver(post_save, sender=UserNotification)
+def update_unread_counter(sender, instance, created, **kwargs):
+    """Update the user's unread counter when a notification is created, read, unread or deleted"""
+    old_is_unread = False if created else instance._old_is_unread
+    if old_is_unread is None:
+        # Loaded without its status fields, so the previously counted state is unknown
+        return
+
+    is_unread = instance.is_unread()
+    if is_unread != old_is_unread:
+        UnreadNotificationCounter.adjust(instance.user_id, 1 if is_unread else -1)
+
+
+@receiver(post_delete, sender=UserNotification)
+def update_unread_counter_on_delete(sender, instance, **kwargs):
+    """Remove a deleted unread notification from the user's unread counter"""
+    if instance._old_is_unread:
+        UnreadNotificationCounter.adjust(instance.user_id, -1)
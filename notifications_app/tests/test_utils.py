@@ -1,20 +1,27 @@
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.utils import timezone
 from django.contrib.auth import get_user_model
 from django.contrib.contenttypes.models import ContentType
 from unittest.mock import patch, MagicMock
 from datetime import timedelta
+import queue
 
 from notifications_app.models import (
-    NotificationCategory, Notification, UserNotification, NotificationPreference
+    NotificationCategory, Notification, UserNotification, NotificationPreference, UnreadNotificationCounter
 )
 from notifications_app.utils import (
     create_notification, should_notify_user, send_notification_email,
     get_user_notifications, get_unread_count, mark_all_as_read,
     create_system_announcement, notify_new_booking, notify_booking_cancellation,
     notify_new_review, notify_review_response, notify_service_provider_approval,
-    notify_service_provider_rejection, notify_booking_status_changed
+    notify_service_provider_rejection, notify_booking_status_changed, get_unread_counter,
+    fan_out_notification, get_announcement_recipients, queue_notification_emails,
+    deliver_pending_announcements
 )
+from notifications_app import utils as notification_utils
+from django.core import mail
+from django.core.management import call_command
+from io import StringIO
 from venues_app.models import Venue
 from booking_cart_app.models import Booking
 from review_app.models import Review, ReviewResponse
@@ -527,6 +534,166 @@ class MarkAllAsReadTest(NotificationUtilsBaseTest):
         self.assertEqual(provider_unread, 3)
 
 
+class UnreadNotificationCounterTest(TestCase):
+    """Test the denormalized unread notification counter"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.customer = User.objects.create_user(
+            email='customer@example.com',
+            password='testpass123',
+            is_customer=True
+        )
+
+    def create_notifications(self, count):
+        for i in range(count):
+            create_notification(
+                category_name='Booking',
+                title=f'Notification {i}',
+                message=f'This is notification {i}',
+                users=[self.customer]
+            )
+        return list(UserNotification.objects.filter(user=self.customer))
+
+    def test_counter_follows_notification_changes(self):
+        """Test that the counter is updated on create, read, unread, delete and mark all as read"""
+        self.create_notifications(1)
+        self.assertEqual(get_unread_count(self.customer), 1)
+        _, version = get_unread_counter(self.customer)
+
+        # The counter is read with a single query once it exists
+        with self.assertNumQueries(1):
+            self.assertEqual(get_unread_count(self.customer), 1)
+
+        user_notifications = self.create_notifications(3)
+        self.assertEqual(get_unread_count(self.customer), 4)
+
+        user_notifications[0].mark_as_read()
+        user_notifications[1].delete_notification()
+        self.assertEqual(get_unread_count(self.customer), 2)
+
+        user_notifications[0].mark_as_unread()
+        user_notifications[2].delete()
+        self.assertEqual(get_unread_count(self.customer), 2)
+
+        mark_all_as_read(self.customer)
+        unread_count, new_version = get_unread_counter(self.customer)
+        self.assertEqual(unread_count, 0)
+        self.assertGreater(new_version, version)
+
+    def test_rebuild_command_corrects_drift(self):
+        """Test that the rebuild command reconciles counters with the notifications"""
+        self.create_notifications(3)
+        self.assertEqual(get_unread_count(self.customer), 3)
+
+        # Queryset updates bypass the counter
+        UserNotification.objects.filter(user=self.customer).update(is_read=True)
+        self.assertEqual(get_unread_count(self.customer), 3)
+
+        out = StringIO()
+        call_command('rebuild_unread_notification_counters', stdout=out)
+        self.assertIn('Corrected 1 unread notification counters', out.getvalue())
+        self.assertEqual(get_unread_count(self.customer), 0)
+
+
+class FanOutNotificationTest(TestCase):
+    """Test delivering notifications to many users"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.users = [
+            User.objects.create_user(email=f'user{i}@example.com', password='testpass123', is_customer=True)
+            for i in range(4)
+        ]
+        self.category = NotificationCategory.objects.create(name='Booking')
+        NotificationPreference.objects.create(user=self.users[1], category=self.category, channel='none')
+        NotificationPreference.objects.create(user=self.users[2], category=self.category, channel='in_app')
+        self.notification = Notification.objects.create(
+            category=self.category, title='Fan out', message='Delivered to many users'
+        )
+
+    def test_fan_out_respects_preferences(self):
+        """Test that preferences are loaded and notifications inserted in a fixed number of queries"""
+        # One counter exists already and is incremented in place
+        self.assertEqual(get_unread_count(self.users[0]), 0)
+
+        # Preferences, notification insert and counter update
+        with self.assertNumQueries(3):
+            with self.captureOnCommitCallbacks(execute=True):
+                created = fan_out_notification(self.notification, self.users + [self.users[0]])
+
+        self.assertEqual(created, 3)
+        self.assertEqual(
+            set(UserNotification.objects.values_list('user_id', flat=True)),
+            {self.users[0].id, self.users[2].id, self.users[3].id}
+        )
+        self.assertEqual(get_unread_count(self.users[0]), 1)
+
+        # Emails go out together to users whose preferences allow them
+        self.assertEqual(sorted(message.to[0] for message in mail.outbox), ['user0@example.com', 'user3@example.com'])
+
+    def test_fan_out_queues_emails_per_batch(self):
+        """Test that each batch's emails are queued on their own once the transaction commits"""
+        with patch('notifications_app.utils.send_notification_emails') as send_emails:
+            with self.captureOnCommitCallbacks(execute=True):
+                fan_out_notification(self.notification, self.users, batch_size=2)
+
+        self.assertEqual(
+            [call.args[0] for call in send_emails.call_args_list],
+            [['user0@example.com'], ['user3@example.com']]
+        )
+
+    @override_settings(NOTIFICATION_EMAIL_SENDER='background')
+    def test_background_sender_queues_emails(self):
+        """Test that the background mode hands email batches to the sender queue"""
+        with patch.object(notification_utils, '_start_notification_email_sender') as start_sender:
+            queue_notification_emails(['user0@example.com'], self.notification)
+
+        start_sender.assert_called_once()
+        self.assertEqual(
+            notification_utils._notification_email_queue.get_nowait(),
+            (['user0@example.com'], self.notification)
+        )
+        notification_utils._notification_email_queue.task_done()
+        self.assertEqual(mail.outbox, [])
+
+        # A full queue falls back to sending in the caller
+        with patch.object(notification_utils, '_start_notification_email_sender'), \
+                patch.object(notification_utils, '_notification_email_queue', queue.Queue(maxsize=1)) as email_queue:
+            email_queue.put_nowait(([], self.notification))
+            queue_notification_emails(['user0@example.com'], self.notification)
+        self.assertEqual([message.to for message in mail.outbox], [['user0@example.com']])
+
+    def test_system_announcement_reaches_active_users(self):
+        """Test that system announcements are delivered to every active user in batches"""
+        self.users[3].is_active = False
+        self.users[3].save()
+
+        announcement = create_system_announcement(
+            'Maintenance', 'We will be down tonight', users=get_announcement_recipients()
+        )
+
+        self.assertTrue(announcement.is_system_wide)
+        self.assertEqual(UserNotification.objects.filter(notification=announcement).count(), 3)
+
+    def test_announcement_delivered_later(self):
+        """Test that announcements marked for later delivery are fanned out by the command"""
+        announcement = create_system_announcement('Maintenance', 'We will be down tonight', deliver_later=True)
+        self.assertTrue(announcement.pending_delivery)
+        self.assertFalse(UserNotification.objects.filter(notification=announcement).exists())
+
+        # An interrupted delivery resumes without duplicating notifications
+        UserNotification.objects.create(user=self.users[0], notification=announcement)
+        out = StringIO()
+        call_command('deliver_announcements', '--batch-size', '2', stdout=out)
+        self.assertIn('Delivered 1 announcements as 3 user notifications', out.getvalue())
+        self.assertEqual(UserNotification.objects.filter(notification=announcement).count(), 4)
+
+        announcement.refresh_from_db()
+        self.assertFalse(announcement.pending_delivery)
+        self.assertEqual(deliver_pending_announcements(), (0, 0))
+
+
 class CreateSystemAnnouncementTest(NotificationUtilsBaseTest):
     """Test the create_system_announcement utility function"""
     
@@ -532,6 +532,24 @@ class GetUnreadNotificationsViewTest(NotificationViewTestBase):
         self.assertIn('Booking Confirmed', notification_titles)
         self.assertIn('New Review Response', notification_titles)
 
+    def test_unread_notifications_etag(self):
+        """Test that polls are answered with 304 until the unread notifications change"""
+        self.client.login(username='customer@example.com', password='testpass123')
+
+        response = self.client.get(self.unread_url, HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+
+        response = self.client.get(self.unread_url, HTTP_X_REQUESTED_WITH='XMLHttpRequest', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        # Reading a notification changes the ETag
+        UserNotification.objects.filter(user=self.customer, is_read=False).first().mark_as_read()
+        response = self.client.get(self.unread_url, HTTP_X_REQUESTED_WITH='XMLHttpRequest', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.json()['unread_count'], 1)
+
 
 class AdminNotificationViewsTest(NotificationViewTestBase):
     """Test the admin notification views"""
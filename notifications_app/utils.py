@@ -1,10 +1,38 @@
+import atexit
+import logging
+import queue
+import threading
+from functools import partial
+
 from django.utils import timezone
-from django.core.mail import send_mail
+from django.core.cache import cache
+from django.core.mail import EmailMessage, get_connection, send_mail
 from django.conf import settings
+from django.contrib.auth import get_user_model
 from django.contrib.contenttypes.models import ContentType
-from django.db.models import Q
+from django.db import IntegrityError, close_old_connections, transaction
+from django.db.models import Count, F, Q
+
+from .models import (
+    Notification, UserNotification, NotificationCategory, NotificationPreference, UnreadNotificationCounter
+)
+
+logger = logging.getLogger(__name__)
+
+# Lifetime of the per-user notification summary shown in page headers, in seconds
+NOTIFICATION_SUMMARY_TIMEOUT = 30
+
+# Number of recent unread notifications shown in page headers
+RECENT_NOTIFICATIONS_LIMIT = 5
 
-from .models import Notification, UserNotification, NotificationCategory, NotificationPreference
+# Number of recipients whose preferences are loaded and notifications inserted per query
+NOTIFICATION_FANOUT_BATCH_SIZE = 1000
+
+# Number of emails sent per batch over the shared mail connection
+NOTIFICATION_EMAIL_BATCH_SIZE = 100
+
+# Number of email batches the background sender holds before batches are sent in the caller
+NOTIFICATION_EMAIL_QUEUE_SIZE = 100
 
 
 def create_notification(category_name, title, message, users=None, priority='medium',
@@ -16,7 +44,7 @@ def create_notification(category_name, title, message, users=None, priority='med
         category_name (str): Name of the notification category
         title (str): Title of the notification
         message (str): Message content of the notification
-        users (list): List of user objects to receive the notification
+        users (iterable): User objects or a User queryset to receive the notification
         priority (str): Priority level ('low', 'medium', 'high')
         expires_at (datetime): When the notification expires
         related_object (Model instance): Related object for the notification
@@ -46,52 +74,118 @@ def create_notification(category_name, title, message, users=None, priority='med
         notification.save()
 
     # Assign to users
-    if users:
-        for user in users:
-            # Check user preferences before creating notification
-            if should_notify_user(user, category, 'in_app'):
-                UserNotification.objects.create(
-                    user=user,
-                    notification=notification
-                )
-
-                # Send email if user prefers email notifications
-                if should_notify_user(user, category, 'email'):
-                    send_notification_email(user, notification)
+    if users is not None:
+        fan_out_notification(notification, users)
 
     return notification
 
 
-def should_notify_user(user, category, channel='in_app'):
+def fan_out_notification(notification, users, batch_size=NOTIFICATION_FANOUT_BATCH_SIZE):
     """
-    Check if a user should be notified based on their preferences
+    Deliver a notification to many users.
+    For every batch of recipients, preferences are loaded with one query and user
+    notifications are inserted with one bulk_create. Each batch's emails are queued
+    once the transaction commits, so recipient sets never need to fit in memory.
 
     Args:
-        user (User): The user to check
-        category (NotificationCategory): The notification category
-        channel (str): The notification channel ('in_app', 'email')
+        notification (Notification): The notification to deliver
+        users (iterable): User objects or a User queryset
+        batch_size (int): Number of recipients handled per query
 
     Returns:
-        bool: Whether the user should be notified
+        int: Number of user notifications created
     """
-    try:
-        preference = NotificationPreference.objects.get(user=user, category=category)
+    if hasattr(users, 'iterator'):
+        users = users.iterator(chunk_size=batch_size)
+
+    created = 0
+    seen = set()
+    batch = {}
+    for user in users:
+        if user.pk in seen:
+            continue
+        seen.add(user.pk)
+        batch[user.pk] = user
+        if len(batch) >= batch_size:
+            created += _fan_out_batch(notification, batch)
+            batch = {}
+    if batch:
+        created += _fan_out_batch(notification, batch)
+    return created
+
+
+def _fan_out_batch(notification, users_by_id):
+    """Create the user notifications of one batch of recipients and queue their emails"""
+    preferences = {
+        preference.user_id: preference
+        for preference in NotificationPreference.objects.filter(
+            category_id=notification.category_id, user_id__in=users_by_id
+        )
+    }
+
+    recipients = []
+    email_recipients = []
+    for user_id, user in users_by_id.items():
+        preference = preferences.get(user_id)
+        if preference_allows(preference, 'in_app'):
+            recipients.append(user_id)
+            if preference_allows(preference, 'email') and user.email:
+                email_recipients.append(user.email)
 
-        if not preference.is_enabled:
-            return False
+    if not recipients:
+        return 0
 
-        if preference.channel == 'none':
-            return False
+    if email_recipients:
+        transaction.on_commit(partial(queue_notification_emails, email_recipients, notification))
 
-        if preference.channel == 'both':
-            return True
+    # bulk_create skips the signals that maintain unread counters and cached summaries
+    UserNotification.objects.bulk_create(
+        [UserNotification(user_id=user_id, notification=notification) for user_id in recipients]
+    )
+    UnreadNotificationCounter.objects.filter(pk__in=recipients).update(
+        unread_count=F('unread_count') + 1,
+        version=F('version') + 1,
+        updated_at=timezone.now()
+    )
+    transaction.on_commit(partial(invalidate_notification_summaries, recipients))
+    return len(recipients)
 
-        return preference.channel == channel
 
-    except NotificationPreference.DoesNotExist:
-        # Default to notify if no preference is set
+def preference_allows(preference, channel):
+    """
+    Check if a notification preference allows a channel
+
+    Args:
+        preference (NotificationPreference): The user's preference for the category, or None
+        channel (str): The notification channel ('in_app', 'email')
+
+    Returns:
+        bool: Whether the channel is allowed, True when no preference is set
+    """
+    if preference is None:
         return True
 
+    if not preference.is_enabled or preference.channel == 'none':
+        return False
+
+    return preference.channel in ('both', channel)
+
+
+def should_notify_user(user, category, channel='in_app'):
+    """
+    Check if a user should be notified based on their preferences
+
+    Args:
+        user (User): The user to check
+        category (NotificationCategory): The notification category
+        channel (str): The notification channel ('in_app', 'email')
+
+    Returns:
+        bool: Whether the user should be notified
+    """
+    preference = NotificationPreference.objects.filter(user=user, category=category).first()
+    return preference_allows(preference, channel)
+
 
 def send_notification_email(user, notification):
     """
@@ -117,6 +211,100 @@ def send_notification_email(user, notification):
         return False
 
 
+def send_notification_emails(recipients, notification, batch_size=NOTIFICATION_EMAIL_BATCH_SIZE):
+    """
+    Email a notification to many recipients over a single mail connection
+
+    Args:
+        recipients (list): Email addresses to send to
+        notification (Notification): The notification to send
+        batch_size (int): Number of emails handed to the connection at a time
+
+    Returns:
+        int: Number of emails sent
+    """
+    subject = f"CozyWish: {notification.title}"
+    message = f"{notification.message}\n\nThis is an automated message from CozyWish."
+
+    sent = 0
+    connection = get_connection(fail_silently=True)
+    try:
+        connection.open()
+        for start in range(0, len(recipients), batch_size):
+            sent += connection.send_messages([
+                EmailMessage(subject, message, settings.DEFAULT_FROM_EMAIL, [recipient], connection=connection)
+                for recipient in recipients[start:start + batch_size]
+            ]) or 0
+    finally:
+        connection.close()
+    return sent
+
+
+# Email batches waiting for the background notification email sender
+_notification_email_queue = queue.Queue(maxsize=NOTIFICATION_EMAIL_QUEUE_SIZE)
+_notification_email_thread = None
+_notification_email_thread_lock = threading.Lock()
+
+
+def queue_notification_emails(recipients, notification):
+    """
+    Send a batch of notification emails using the configured NOTIFICATION_EMAIL_SENDER.
+    'sync' sends them right away, 'background' hands them to a sender thread so the
+    emails go out off the request path. The background queue is bounded and drained
+    when the process exits; when it is full the batch is sent right away instead.
+
+    Args:
+        recipients (list): Email addresses to send to
+        notification (Notification): The notification to send
+    """
+    if getattr(settings, 'NOTIFICATION_EMAIL_SENDER', 'sync') == 'background':
+        _start_notification_email_sender()
+        try:
+            _notification_email_queue.put_nowait((list(recipients), notification))
+            return
+        except queue.Full:
+            pass
+    send_notification_emails(recipients, notification)
+
+
+def _start_notification_email_sender():
+    """Start the background notification email sender thread of this process if it is not running"""
+    global _notification_email_thread
+
+    if _notification_email_thread is not None and _notification_email_thread.is_alive():
+        return
+    with _notification_email_thread_lock:
+        if _notification_email_thread is None or not _notification_email_thread.is_alive():
+            if _notification_email_thread is None:
+                # Send what is still queued before the process exits
+                atexit.register(flush_notification_email_queue)
+            _notification_email_thread = threading.Thread(
+                target=_run_notification_email_sender, name='notification-email-sender', daemon=True
+            )
+            _notification_email_thread.start()
+
+
+def _run_notification_email_sender():
+    """Send queued notification email batches one at a time"""
+    while True:
+        recipients, notification = _notification_email_queue.get()
+        close_old_connections()
+        try:
+            send_notification_emails(recipients, notification)
+        except Exception:
+            logger.exception('Failed to send %d notification emails', len(recipients))
+        finally:
+            _notification_email_queue.task_done()
+
+
+def flush_notification_email_queue():
+    """
+    Wait until the background sender has sent every notification email queued so far
+    """
+    if _notification_email_thread is not None and _notification_email_thread.is_alive():
+        _notification_email_queue.join()
+
+
 def get_user_notifications(user, include_read=False, include_deleted=False):
     """
     Get notifications for a user
@@ -140,9 +328,35 @@ def get_user_notifications(user, include_read=False, include_deleted=False):
     return UserNotification.objects.filter(query).select_related('notification', 'notification__category')
 
 
+def get_unread_counter(user):
+    """
+    Get a user's unread notification counter, creating it with an exact count on first use
+
+    Args:
+        user (User): The user to get the counter for
+
+    Returns:
+        tuple: (unread_count, version), where version changes whenever the unread notifications do
+    """
+    counter = UnreadNotificationCounter.objects.filter(pk=user.pk).values_list('unread_count', 'version').first()
+    if counter is not None:
+        return counter
+
+    try:
+        with transaction.atomic():
+            counter = UnreadNotificationCounter.objects.create(
+                user=user,
+                unread_count=UnreadNotificationCounter.count_unread(user.pk)
+            )
+    except IntegrityError:
+        # Another request created the counter first
+        return UnreadNotificationCounter.objects.filter(pk=user.pk).values_list('unread_count', 'version').get()
+    return counter.unread_count, counter.version
+
+
 def get_unread_count(user):
     """
-    Get the count of unread notifications for a user
+    Get the count of unread notifications for a user from the denormalized counter
 
     Args:
         user (User): The user to get the count for
@@ -150,7 +364,101 @@ def get_unread_count(user):
     Returns:
         int: Count of unread notifications
     """
-    return UserNotification.objects.filter(user=user, is_read=False, is_deleted=False).count()
+    return get_unread_counter(user)[0]
+
+
+def rebuild_unread_counters(batch_size=1000):
+    """
+    Reconcile all unread notification counters with the notifications, counting them in one grouped query
+
+    Args:
+        batch_size (int): Number of counters to update per query
+
+    Returns:
+        int: Number of counters that were corrected
+    """
+    counts = dict(
+        UserNotification.objects.filter(is_read=False, is_deleted=False)
+        .values_list('user_id')
+        .annotate(count=Count('id'))
+        .order_by()
+    )
+
+    now = timezone.now()
+    corrected = 0
+    batch = []
+    for counter in UnreadNotificationCounter.objects.iterator(chunk_size=batch_size):
+        unread_count = counts.get(counter.pk, 0)
+        if counter.unread_count == unread_count:
+            continue
+        counter.unread_count = unread_count
+        counter.version += 1
+        counter.updated_at = now
+        batch.append(counter)
+        if len(batch) >= batch_size:
+            UnreadNotificationCounter.objects.bulk_update(batch, ['unread_count', 'version', 'updated_at'])
+            corrected += len(batch)
+            batch = []
+
+    if batch:
+        UnreadNotificationCounter.objects.bulk_update(batch, ['unread_count', 'version', 'updated_at'])
+        corrected += len(batch)
+    return corrected
+
+
+def get_notification_summary_cache_key(user_id):
+    """
+    Get the cache key of a user's notification summary
+
+    Args:
+        user_id (int): ID of the user
+
+    Returns:
+        str: Cache key
+    """
+    return f'notifications_app:summary:{user_id}'
+
+
+def get_notification_summary(user):
+    """
+    Get a user's unread notification count and most recent unread notifications,
+    cached briefly per user until their notifications change
+
+    Args:
+        user (User): The user to get the summary for
+
+    Returns:
+        dict: unread_count and recent, a list of UserNotification objects
+    """
+    key = get_notification_summary_cache_key(user.id)
+    summary = cache.get(key)
+    if summary is None:
+        summary = {
+            'unread_count': get_unread_count(user),
+            'recent': list(get_user_notifications(user)[:RECENT_NOTIFICATIONS_LIMIT]),
+        }
+        cache.set(key, summary, NOTIFICATION_SUMMARY_TIMEOUT)
+    return summary
+
+
+def invalidate_notification_summary(user_id):
+    """
+    Discard a user's cached notification summary
+
+    Args:
+        user_id (int): ID of the user
+    """
+    cache.delete(get_notification_summary_cache_key(user_id))
+
+
+def invalidate_notification_summaries(user_ids):
+    """
+    Discard the cached notification summaries of many users
+
+    Args:
+        user_ids (list): IDs of the users
+    """
+    cache.delete_many([get_notification_summary_cache_key(user_id) for user_id in user_ids])
 
 
 def mark_all_as_read(user):
@@ -164,10 +472,15 @@ def mark_all_as_read(user):
         int: Number of notifications marked as read
     """
     now = timezone.now()
-    count = UserNotification.objects.filter(user=user, is_read=False, is_deleted=False).update(
-        is_read=True,
-        read_at=now
-    )
+    with transaction.atomic():
+        count = UserNotification.objects.filter(user=user, is_read=False, is_deleted=False).update(
+            is_read=True,
+            read_at=now
+        )
+        if count:
+            # The queryset update bypasses the signals that maintain the counter
+            UnreadNotificationCounter.adjust(user.id, -count)
+    invalidate_notification_summary(user.id)
     return count
 
 
@@ -344,15 +657,61 @@ def notify_booking_status_changed(booking, old_status):
 #     )
 
 
-def create_system_announcement(title, message, expires_in_days=7):
-    """Create a system-wide announcement"""
+def create_system_announcement(title, message, expires_in_days=7, priority="medium", users=None,
+                               deliver_later=False):
+    """
+    Create a system-wide announcement, delivering it to the given users
+    (e.g. every active user from get_announcement_recipients()) through fan_out_notification.
+    With deliver_later=True it is only marked for the deliver_announcements command, which
+    fans it out to every active user outside of the request.
+    """
     expires_at = timezone.now() + timezone.timedelta(days=expires_in_days)
 
-    return create_notification(
+    notification = create_notification(
         category_name="Announcement",
         title=title,
         message=message,
-        priority="medium",
+        users=None if deliver_later else users,
+        priority=priority,
         expires_at=expires_at,
         is_system_wide=True
     )
+    if deliver_later:
+        notification.pending_delivery = True
+        notification.save(update_fields=['pending_delivery'])
+    return notification
+
+
+def deliver_pending_announcements(batch_size=NOTIFICATION_FANOUT_BATCH_SIZE):
+    """
+    Fan out the announcements marked for later delivery to every active user.
+    Each batch is committed on its own and users who already received an announcement
+    are skipped, so an interrupted delivery resumes where it stopped on the next run.
+
+    Args:
+        batch_size (int): Number of recipients handled per query
+
+    Returns:
+        tuple: Number of announcements delivered and of user notifications created
+    """
+    announcements = Notification.objects.filter(pending_delivery=True, is_active=True).order_by('created_at')
+
+    delivered = 0
+    created = 0
+    for announcement in announcements:
+        if not announcement.is_expired():
+            recipients = get_announcement_recipients().exclude(user_notifications__notification=announcement)
+            created += fan_out_notification(announcement, recipients, batch_size)
+        Notification.objects.filter(pk=announcement.pk).update(pending_delivery=False)
+        delivered += 1
+    return delivered, created
+
+
+def get_announcement_recipients():
+    """
+    Get every active user, loading only the fields needed to deliver an announcement
+
+    Returns:
+        QuerySet: Active users
+    """
+    return get_user_model().objects.filter(is_active=True).only('id', 'email').order_by('id')
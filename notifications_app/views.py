@@ -6,13 +6,16 @@ from django.urls import reverse
 from django.utils import timezone
 from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
 from django.db.models import Q
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
 
 from .models import Notification, UserNotification, NotificationCategory, NotificationPreference
 from .forms import NotificationPreferenceForm, SystemAnnouncementForm, NotificationCategoryForm
 from .utils import (
     create_notification, get_user_notifications, mark_all_as_read,
-    create_system_announcement, get_unread_count
+    create_system_announcement, get_unread_count, get_unread_counter
 )
+from utils.context import get_request_value
 
 
 # Helper function to check if user is admin
@@ -213,12 +216,24 @@ def notification_preferences(request):
     return render(request, 'notifications_app/notification_preferences.html', context)
 
 
+def get_unread_notifications_etag(request):
+    """ETag of the unread notifications poll, which changes whenever the user's unread notifications do"""
+    unread_count, version = get_request_value(request, 'unread_counter', lambda: get_unread_counter(request.user))
+    return f'{request.user.pk}-{version}-{unread_count}'
+
+
 @login_required
+@condition(etag_func=get_unread_notifications_etag)
 def get_unread_notifications(request):
-    """AJAX view to get unread notifications for the navbar dropdown"""
+    """
+    AJAX view to get unread notifications for the navbar dropdown
+
+    Polls that send the ETag of the previous response get 304 Not Modified until
+    the user's unread notifications change, without querying the notifications.
+    """
     if request.headers.get('x-requested-with') == 'XMLHttpRequest':
         notifications = get_user_notifications(request.user)[:5]  # Get 5 most recent unread notifications
-        unread_count = get_unread_count(request.user)
+        unread_count, _ = get_request_value(request, 'unread_counter', lambda: get_unread_counter(request.user))
 
         notifications_data = [{
             'id': n.notification.id,
@@ -229,12 +244,15 @@ def get_unread_notifications(request):
             'priority': n.notification.priority,
         } for n in notifications]
 
-        return JsonResponse({
+        response = JsonResponse({
             'success': True,
             'notifications': notifications_data,
             'unread_count': unread_count,
             'more_url': reverse('notifications_app:notification_list')
         })
+        # Let browsers keep the response but revalidate it on every poll
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
 
     return JsonResponse({'success': False, 'error': 'Invalid request'}, status=400)
 
@@ -286,9 +304,10 @@ def admin_create_announcement(request):
             priority = form.cleaned_data['priority']
             expires_in_days = form.cleaned_data['expires_in_days']
 
-            create_system_announcement(title, message, expires_in_days)
+            # Fanned out to every active user by the deliver_announcements command
+            create_system_announcement(title, message, expires_in_days, priority, deliver_later=True)
 
-            messages.success(request, 'System announcement created successfully.')
+            messages.success(request, 'System announcement created. It will be delivered to all users shortly.')
             return redirect('notifications_app:admin_notification_dashboard')
     else:
         form = SystemAnnouncementForm()
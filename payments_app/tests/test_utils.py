@@ -1,16 +1,21 @@
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 from decimal import Decimal
 from datetime import timedelta
 import uuid
 
-from booking_cart_app.models import Booking, Venue, Category
-from payments_app.models import PaymentMethod, Transaction, Invoice
+from booking_cart_app.models import Booking
+from venues_app.models import Venue, Category
+from admin_app.models import DailyBookingStats
+from notifications_app.models import UserNotification
+from payments_app.models import PaymentMethod, Transaction, Invoice, CheckoutSession, CheckoutSessionBooking
 from payments_app.utils import (
     validate_credit_card, mask_card_number, get_last_four_digits,
     process_payment, get_transaction_history, get_provider_transaction_history,
-    generate_invoice, generate_invoice_pdf
+    generate_invoice, generate_invoice_pdf, settle_checkout_session
 )
 
 User = get_user_model()
@@ -248,3 +253,68 @@ class UtilsTest(TestCase):
         # Check that the PDF was created
         self.assertIsNotNone(pdf)
         self.assertTrue(hasattr(pdf, 'read'))  # Check that it's a file-like object
+
+    def test_settle_checkout_session(self):
+        """Test settling a multi-venue checkout session with set-based writes"""
+        other_provider = User.objects.create_user(
+            email='other_provider@example.com',
+            password='testpass123',
+            is_service_provider=True
+        )
+        other_venue = Venue.objects.create(
+            owner=other_provider,
+            name="Other Spa",
+            category=self.category,
+            venue_type="all",
+            state="New York",
+            county="New York County",
+            city="New York",
+            street_number="456",
+            street_name="Main St",
+            about="Another luxury spa in the heart of the city.",
+            approval_status="approved"
+        )
+        bookings = [self.booking] + [
+            Booking.objects.create(user=self.customer, venue=other_venue, total_price=Decimal("50.00"))
+            for _ in range(3)
+        ]
+        checkout_session = CheckoutSession.objects.create(user=self.customer, total_amount=Decimal("250.00"))
+        CheckoutSessionBooking.objects.bulk_create([
+            CheckoutSessionBooking(checkout_session=checkout_session, booking=booking) for booking in bookings
+        ])
+
+        notification_count = UserNotification.objects.count()
+
+        # Each table is written once whatever the number of bookings, and notifications wait for the commit
+        with self.captureOnCommitCallbacks() as callbacks:
+            with CaptureQueriesContext(connection) as queries:
+                transactions = settle_checkout_session(checkout_session, 'credit_card', 'Credit Card ending in 1234')
+        self.assertEqual(len(transactions), 4)
+        statements = [query['sql'].split(' WHERE ')[0] for query in queries.captured_queries]
+        self.assertEqual(len([sql for sql in statements if sql.startswith('INSERT INTO "payments_app_transaction"')]), 1)
+        self.assertEqual(len([sql for sql in statements if sql.startswith('UPDATE "payments_app_invoice"')]), 1)
+        self.assertEqual(len([sql for sql in statements if sql.startswith('UPDATE "booking_cart_app_booking"')]), 1)
+        self.assertEqual(UserNotification.objects.count(), notification_count)
+
+        for booking in bookings:
+            booking.refresh_from_db()
+            self.assertEqual(booking.status, 'confirmed')
+            invoice = Invoice.objects.get(booking=booking)
+            self.assertEqual(invoice.status, 'paid')
+            self.assertIsNotNone(invoice.paid_date)
+            self.assertEqual(invoice.transaction.booking, booking)
+        checkout_session.refresh_from_db()
+        self.assertTrue(checkout_session.is_paid)
+        self.assertEqual(
+            DailyBookingStats.objects.get(status='confirmed').booking_count, 4
+        )
+        self.assertEqual(DailyBookingStats.objects.get(status='pending').booking_count, 0)
+
+        # One notification for the customer and one for each venue owner
+        for callback in callbacks:
+            callback()
+        payment_notifications = UserNotification.objects.filter(notification__category__name='Payment')
+        self.assertEqual(payment_notifications.filter(user=self.customer).count(), 1)
+        self.assertEqual(payment_notifications.filter(user=self.provider).count(), 1)
+        self.assertEqual(payment_notifications.filter(user=other_provider).count(), 1)
+        self.assertEqual(UserNotification.objects.count(), notification_count + 3)
@@ -1,11 +1,27 @@
 import uuid
+from collections import defaultdict
 from decimal import Decimal
+from functools import partial
 from django.utils import timezone
-from django.db import transaction
+from django.db import models, transaction
+from django.db.models import Case, Value, When
 from django.conf import settings
 
-from booking_cart_app.models import Booking
-from .models import PaymentMethod, Transaction, Invoice
+from admin_app.utils import update_booking_rollups
+from booking_cart_app.models import Booking, BookingItem, ServiceAvailability
+from dashboard_app.utils import invalidate_provider_snapshots
+from .models import PaymentMethod, Transaction, Invoice, CheckoutSession
+
+# Check if notifications_app is installed
+NOTIFICATIONS_ENABLED = 'notifications_app' in settings.INSTALLED_APPS
+if NOTIFICATIONS_ENABLED:
+    try:
+        from notifications_app.utils import create_notification
+    except ImportError:
+        NOTIFICATIONS_ENABLED = False
+
+# Booking statuses that do not hold service availability
+INACTIVE_BOOKING_STATUSES = ['cancelled', 'completed', 'disputed', 'no_show']
 
 def validate_credit_card(card_number):
     """
@@ -115,6 +131,168 @@ def process_payment(user, booking, payment_method_type, payment_method_details,
     
     return transaction_obj
 
+def settle_bookings(user, bookings, payment_method_type, payment_method_details, checkout_session=None):
+    """
+    Settle the payment of several bookings with a fixed number of writes.
+    All transactions are created with one bulk insert, and invoices and bookings are
+    each updated with one set-based UPDATE. As these writes bypass the per-row
+    signals, the booking rollups, service availability and provider dashboard
+    snapshots are updated here, and a single batch of payment notifications is
+    sent once the transaction commits.
+
+    Args:
+        user (User): The user making the payment
+        bookings (list): The bookings being paid for, ideally with venue__owner loaded
+        payment_method_type (str): The type of payment method
+        payment_method_details (str): Details of the payment method
+        checkout_session (CheckoutSession, optional): The checkout session to mark as paid
+
+    Returns:
+        list: The created transactions, in the order of bookings
+    """
+    bookings = list({booking.pk: booking for booking in bookings}.values())
+    if not bookings:
+        return []
+
+    now = timezone.now()
+    booking_ids = [booking.pk for booking in bookings]
+
+    with transaction.atomic():
+        # For MVP, all payments are successful
+        transactions = Transaction.objects.bulk_create([
+            Transaction(
+                user=user,
+                booking=booking,
+                amount=booking.total_price,
+                status='completed',
+                payment_method=payment_method_type,
+                payment_method_details=payment_method_details
+            )
+            for booking in bookings
+        ])
+
+        # Bookings normally get their invoice when created; add any that are missing
+        Invoice.objects.bulk_create([
+            Invoice(
+                user_id=booking.user_id,
+                booking=booking,
+                amount=booking.total_price,
+                due_date=now + timezone.timedelta(hours=24)
+            )
+            for booking in bookings
+        ], ignore_conflicts=True)
+
+        Invoice.objects.filter(booking_id__in=booking_ids).update(
+            status='paid',
+            paid_date=now,
+            transaction=Case(
+                *[When(booking_id=t.booking_id, then=Value(t.pk)) for t in transactions],
+                output_field=models.BigIntegerField()
+            )
+        )
+
+        Booking.objects.filter(pk__in=booking_ids).exclude(status='confirmed').update(
+            status='confirmed',
+            last_status_change=now
+        )
+
+        # Bookings coming back from an inactive status hold their service slots again
+        reactivated = [booking.pk for booking in bookings if booking.status in INACTIVE_BOOKING_STATUSES]
+        if reactivated:
+            for item in BookingItem.objects.filter(booking_id__in=reactivated):
+                ServiceAvailability.reserve(item.service_id, item.date, item.time_slot, item.quantity)
+
+        rollup_changes = []
+        for booking in bookings:
+            if booking.status != 'confirmed':
+                booking.last_status_change = now
+            booking.status = 'confirmed'
+            new_state = booking.get_rollup_state()
+            if booking._old_rollup_state is not None and booking._old_rollup_state != new_state:
+                rollup_changes += [(booking._old_rollup_state, -1), (new_state, 1)]
+            booking._old_status = booking.status
+            booking._old_rollup_state = new_state
+        update_booking_rollups(rollup_changes, {booking.venue_id: booking.venue.category_id for booking in bookings})
+
+        owner_ids = {booking.venue.owner_id for booking in bookings}
+        transaction.on_commit(partial(invalidate_provider_snapshots, owner_ids))
+
+        if checkout_session is not None:
+            CheckoutSession.objects.filter(pk=checkout_session.pk).update(is_paid=True)
+            checkout_session.is_paid = True
+
+        if NOTIFICATIONS_ENABLED:
+            transaction.on_commit(partial(
+                send_settlement_notifications, user, bookings, transactions, checkout_session
+            ))
+
+    return transactions
+
+
+def settle_checkout_session(checkout_session, payment_method_type, payment_method_details):
+    """
+    Settle the payment of every booking in a checkout session.
+
+    Args:
+        checkout_session (CheckoutSession): The checkout session to pay for
+        payment_method_type (str): The type of payment method
+        payment_method_details (str): Details of the payment method
+
+    Returns:
+        list: The created transactions
+    """
+    bookings = Booking.objects.filter(
+        checkout_session_booking__checkout_session=checkout_session
+    ).select_related('venue__owner')
+    return settle_bookings(
+        checkout_session.user, bookings, payment_method_type, payment_method_details,
+        checkout_session=checkout_session
+    )
+
+
+def send_settlement_notifications(user, bookings, transactions, checkout_session=None):
+    """
+    Send one payment notification to the customer and one to each venue owner
+    for a settled set of bookings.
+
+    Args:
+        user (User): The customer who paid
+        bookings (list): The settled bookings
+        transactions (list): The transactions created for the bookings
+        checkout_session (CheckoutSession, optional): The checkout session that was paid
+    """
+    total = sum((t.amount for t in transactions), Decimal('0.00'))
+    if len(bookings) > 1:
+        message = f'Your payment of ${total} for {len(bookings)} bookings has been completed successfully.'
+    else:
+        message = f'Your payment of ${total} has been completed successfully.'
+    create_notification(
+        category_name='Payment',
+        title='Payment Completed',
+        message=message,
+        users=[user],
+        related_object=checkout_session or transactions[0]
+    )
+
+    transactions_by_booking = {t.booking_id: t for t in transactions}
+    bookings_by_owner = defaultdict(list)
+    for booking in bookings:
+        bookings_by_owner[booking.venue.owner_id].append(booking)
+
+    for owner_bookings in bookings_by_owner.values():
+        owner = owner_bookings[0].venue.owner
+        owner_transactions = [transactions_by_booking[booking.pk] for booking in owner_bookings]
+        amount = sum((t.amount for t in owner_transactions), Decimal('0.00'))
+        booking_numbers = ', '.join(f'#{booking.booking_id}' for booking in owner_bookings)
+        create_notification(
+            category_name='Payment',
+            title='Payment Received',
+            message=f'You have received a payment of ${amount} for booking {booking_numbers}.',
+            users=[owner],
+            related_object=owner_transactions[0]
+        )
+
+
 def get_transaction_history(user):
     """
     Get transaction history for a user.
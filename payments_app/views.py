@@ -9,6 +9,7 @@ from django.http import Http404
 from booking_cart_app.models import Booking
 from .models import PaymentMethod, Transaction, Invoice, CheckoutSession, CheckoutSessionBooking
 from .forms import PaymentMethodForm, PaymentForm, RefundForm
+from .utils import settle_bookings
 
 
 # Customer Views
@@ -21,7 +22,9 @@ def payment_process(request, booking_id, checkout_session_id=None):
         return redirect('venues_app:home')
 
     # Get the booking
-    booking = get_object_or_404(Booking, booking_id=booking_id, user=request.user)
+    booking = get_object_or_404(
+        Booking.objects.select_related('venue__owner'), booking_id=booking_id, user=request.user
+    )
 
     # Get checkout session if provided
     checkout_session = None
@@ -38,7 +41,9 @@ def payment_process(request, booking_id, checkout_session_id=None):
                 return redirect('booking_cart_app:booking_detail', booking_id=booking.booking_id)
 
             # Get all bookings associated with this checkout session
-            session_bookings = CheckoutSessionBooking.objects.filter(checkout_session=checkout_session)
+            session_bookings = CheckoutSessionBooking.objects.filter(
+                checkout_session=checkout_session
+            ).select_related('booking__venue__owner')
             related_bookings = [sb.booking for sb in session_bookings]
 
             # Use the total amount from the checkout session
@@ -102,60 +107,16 @@ def payment_process(request, booking_id, checkout_session_id=None):
                     payment_method_type = payment_method.payment_type
                     payment_method_details = f"{payment_method.get_payment_type_display()} ending in {payment_method.last_four}"
 
-                # Process the main booking first
-                main_transaction = Transaction.objects.create(
-                    user=request.user,
-                    booking=booking,
-                    amount=booking.total_price,
-                    status='completed',  # For MVP, all payments are successful
-                    payment_method=payment_method_type,
-                    payment_method_details=payment_method_details
+                # Settle the main booking together with the rest of a multi-venue checkout
+                bookings = [booking] + [
+                    related_booking for related_booking in related_bookings
+                    if related_booking.booking_id != booking.booking_id
+                ]
+                transactions_created = settle_bookings(
+                    request.user, bookings, payment_method_type, payment_method_details,
+                    checkout_session=checkout_session if related_bookings else None
                 )
-                transactions_created.append(main_transaction)
-
-                # Update invoice for main booking
-                invoice.mark_as_paid(transaction=main_transaction)
-
-                # Update main booking status
-                booking.status = 'confirmed'
-                booking.save()
-
-                # Process related bookings if this is a multi-venue checkout
-                if checkout_session and related_bookings:
-                    for related_booking in related_bookings:
-                        # Skip the main booking as it's already processed
-                        if related_booking.booking_id == booking.booking_id:
-                            continue
-
-                        # Create transaction for related booking
-                        related_transaction = Transaction.objects.create(
-                            user=request.user,
-                            booking=related_booking,
-                            amount=related_booking.total_price,
-                            status='completed',  # For MVP, all payments are successful
-                            payment_method=payment_method_type,
-                            payment_method_details=payment_method_details
-                        )
-                        transactions_created.append(related_transaction)
-
-                        # Create and mark invoice as paid
-                        related_invoice, _ = Invoice.objects.get_or_create(
-                            booking=related_booking,
-                            defaults={
-                                'user': request.user,
-                                'amount': related_booking.total_price,
-                                'due_date': timezone.now() + timezone.timedelta(hours=24),
-                            }
-                        )
-                        related_invoice.mark_as_paid(transaction=related_transaction)
-
-                        # Update related booking status
-                        related_booking.status = 'confirmed'
-                        related_booking.save()
-
-                    # Mark checkout session as paid
-                    if checkout_session:
-                        checkout_session.mark_as_paid()
+                main_transaction = transactions_created[0]
 
             # Success message based on number of bookings processed
             if len(transactions_created) > 1:
@@ -56,6 +56,7 @@ LOCAL_APPS = [
     "admin_app",
     "discount_app",
     "notifications_app",
+    "search_app",
     "utils",  # Utility app for image handling
 ]
 
@@ -68,6 +69,7 @@ CRISPY_TEMPLATE_PACK = "bootstrap5"
 # Middleware
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "dashboard_app.middleware.QueryBudgetMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -76,8 +78,25 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "discount_app.middleware.DiscountMiddleware",
     "booking_cart_app.middleware.CartCleanupMiddleware",
+    "admin_app.middleware.AuditLogMiddleware",
 ]
 
+# How audit logs are written: 'sync' inserts each request's entries in one query after
+# the response is built, 'background' hands them to a writer thread
+AUDIT_LOG_WRITER = 'sync'
+
+# How notification emails are sent: 'sync' sends each fan-out batch's emails when its
+# transaction commits, 'background' hands them to an in-process sender thread
+NOTIFICATION_EMAIL_SENDER = 'sync'
+
+# Maximum number of queries per request, by URL name ('app_name:url_name'); requests over
+# budget are logged as warnings by the query budget middleware
+QUERY_BUDGET_DEFAULT = 50
+QUERY_BUDGETS = {}
+
+# Statements taking longer than this many milliseconds are written to logs/slow_queries.log
+SLOW_QUERY_THRESHOLD = 500
+
 ROOT_URLCONF = "project_root.urls"
 
 # Templates
@@ -196,6 +215,14 @@ LOGGING = {
             'class': 'logging.StreamHandler',
             'formatter': 'simple',
         },
+        'slow_queries': {
+            'level': 'WARNING',
+            'class': 'logging.handlers.RotatingFileHandler',
+            'filename': os.path.join(LOGS_DIR, 'slow_queries.log'),
+            'maxBytes': 10 * 1024 * 1024,
+            'backupCount': 5,
+            'formatter': 'verbose',
+        },
     },
     'loggers': {
         'django': {
@@ -203,5 +230,17 @@ LOGGING = {
             'level': 'INFO',
             'propagate': True,
         },
+        # Query budget violations
+        'dashboard_app': {
+            'handlers': ['file', 'console'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
+        # Statements slower than SLOW_QUERY_THRESHOLD
+        'dashboard_app.slow_queries': {
+            'handlers': ['slow_queries'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
     },
 }
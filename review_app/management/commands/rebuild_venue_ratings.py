@@ -0,0 +1,49 @@
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+
+from venues_app.models import Venue
+from review_app.models import Review
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the denormalized rating average, count and histogram of every venue from approved reviews'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Number of venues to update per query'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+
+        # One grouped query for the histograms of all venues
+        histograms = defaultdict(dict)
+        rows = (
+            Review.objects.filter(is_approved=True)
+            .values_list('venue_id', 'rating')
+            .annotate(count=Count('id'))
+            .order_by()
+        )
+        for venue_id, rating, count in rows:
+            histograms[venue_id][rating] = count
+
+        batch = []
+        updated_count = 0
+        for venue in Venue.objects.only('id', *Venue.RATING_FIELDS).iterator(chunk_size=batch_size):
+            venue.set_rating_stats(histograms.get(venue.id, {}))
+            batch.append(venue)
+            if len(batch) >= batch_size:
+                Venue.objects.bulk_update(batch, Venue.RATING_FIELDS)
+                updated_count += len(batch)
+                batch = []
+
+        if batch:
+            Venue.objects.bulk_update(batch, Venue.RATING_FIELDS)
+            updated_count += len(batch)
+
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt rating aggregates for {updated_count} venues'))
@@ -26,8 +26,28 @@ class Review(models.Model):
         verbose_name = "Review"
         verbose_name_plural = "Reviews"
     
+    # Fields that make up the review's state in the venue rating aggregates
+    RATING_STATE_FIELDS = {'venue_id', 'rating', 'is_approved'}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Store the originally counted rating to update venue aggregates incrementally;
+        # it is unknown when the review was loaded without its rating fields
+        self._rating_state_known = not self.RATING_STATE_FIELDS & self.get_deferred_fields()
+        self._old_rating_state = self.get_rating_state() if self.pk and self._rating_state_known else None
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # Update _old_rating_state after save
+        self._old_rating_state = self.get_rating_state()
+        self._rating_state_known = True
+
     def __str__(self):
         return f"{self.user.email} - {self.venue.name} - {self.rating} stars"
+
+    def get_rating_state(self):
+        """Return the (venue_id, rating) counted in venue aggregates, or None if not approved"""
+        return (self.venue_id, self.rating) if self.is_approved else None
     
     def get_response(self):
         """Get the response to this review, if any"""
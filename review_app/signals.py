@@ -1,33 +1,52 @@
+from collections import defaultdict
+
 from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
-from django.db.models import Avg
+
+from venues_app.models import Venue
 from .models import Review, ReviewFlag
 
 
+def _apply_rating_change(review, old_state, new_state):
+    """Move a review's rating between venue aggregates"""
+    if old_state == new_state:
+        return
+
+    deltas = defaultdict(lambda: defaultdict(int))
+    if old_state:
+        venue_id, rating = old_state
+        deltas[venue_id][rating] -= 1
+    if new_state:
+        venue_id, rating = new_state
+        deltas[venue_id][rating] += 1
+
+    for venue_id, rating_deltas in deltas.items():
+        Venue.adjust_rating_stats(venue_id, rating_deltas)
+
+    # Keep an already loaded venue in sync with the stored aggregates
+    if Review.venue.is_cached(review) and review.venue_id in deltas:
+        venue = review.venue
+        stats = Venue.objects.filter(pk=venue.pk).values(*Venue.RATING_FIELDS).first()
+        if stats:
+            for field, value in stats.items():
+                setattr(venue, field, value)
+
+
 @receiver(post_save, sender=Review)
-def update_venue_rating(sender, instance, **kwargs):
-    """Update venue average rating when a review is saved"""
-    venue = instance.venue
-    # Only count approved reviews
-    avg_rating = Review.objects.filter(venue=venue, is_approved=True).aggregate(Avg('rating'))['rating__avg']
-    
-    # Update venue rating if it has a rating field
-    if hasattr(venue, 'rating'):
-        venue.rating = avg_rating or 0
-        venue.save(update_fields=['rating'])
+def update_venue_rating(sender, instance, created, **kwargs):
+    """Update venue rating aggregates when a review is saved"""
+    if not created and not instance._rating_state_known:
+        # Loaded without its rating fields, so the previously counted rating is unknown
+        return
+    old_state = None if created else instance._old_rating_state
+    _apply_rating_change(instance, old_state, instance.get_rating_state())
 
 
 @receiver(post_delete, sender=Review)
 def update_venue_rating_on_delete(sender, instance, **kwargs):
-    """Update venue average rating when a review is deleted"""
-    venue = instance.venue
-    # Only count approved reviews
-    avg_rating = Review.objects.filter(venue=venue, is_approved=True).aggregate(Avg('rating'))['rating__avg']
-    
-    # Update venue rating if it has a rating field
-    if hasattr(venue, 'rating'):
-        venue.rating = avg_rating or 0
-        venue.save(update_fields=['rating'])
+    """Update venue rating aggregates when a review is deleted"""
+    if instance._rating_state_known:
+        _apply_rating_change(instance, instance._old_rating_state, None)
 
 
 @receiver(post_save, sender=ReviewFlag)
@@ -1,4 +1,7 @@
+from io import StringIO
+
 from django.test import TestCase
+from django.core.management import call_command
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
 from django.utils import timezone
@@ -139,6 +142,70 @@ class ReviewModelTest(TestCase):
         # Check that no new flag was created
         self.assertEqual(ReviewFlag.objects.filter(review=self.review).count(), 1)
 
+    def test_venue_rating_aggregates(self):
+        """Test that venue rating aggregates follow review changes"""
+        self.assertEqual(self.venue.rating_count, 1)
+        self.assertEqual(self.venue.get_average_rating(), 4.0)
+
+        # Add a second review
+        other_customer = User.objects.create_user(
+            email='other@example.com',
+            password='testpass123',
+            is_customer=True
+        )
+        other_review = Review.objects.create(
+            venue=self.venue,
+            user=other_customer,
+            rating=1,
+            comment="Not for me."
+        )
+        self.venue.refresh_from_db()
+        self.assertEqual(self.venue.rating_count, 2)
+        self.assertEqual(self.venue.rating_avg, 2.5)
+        self.assertEqual(self.venue.rating_histogram, {5: 0, 4: 1, 3: 0, 2: 0, 1: 1})
+
+        # Change a rating
+        other_review.rating = 2
+        other_review.save()
+        self.venue.refresh_from_db()
+        self.assertEqual(self.venue.rating_avg, 3.0)
+        self.assertEqual(self.venue.rating_1_count, 0)
+        self.assertEqual(self.venue.rating_2_count, 1)
+
+        # Unapproved reviews are not counted
+        self.review.is_approved = False
+        self.review.save()
+        self.venue.refresh_from_db()
+        self.assertEqual(self.venue.rating_count, 1)
+        self.assertEqual(self.venue.rating_avg, 2.0)
+
+        # Deleting the last counted review resets the average
+        other_review.delete()
+        self.venue.refresh_from_db()
+        self.assertEqual(self.venue.rating_count, 0)
+        self.assertEqual(self.venue.rating_avg, 0)
+
+        # Rebuilding from the reviews repairs drifted aggregates
+        self.review.is_approved = True
+        self.review.save()
+        Venue.objects.filter(pk=self.venue.pk).update(rating_count=10, rating_avg=1.5)
+        call_command('rebuild_venue_ratings', stdout=StringIO())
+        self.venue.refresh_from_db()
+        self.assertEqual(self.venue.rating_count, 1)
+        self.assertEqual(self.venue.rating_avg, 4.0)
+
+    def test_reviews_loaded_without_rating_fields(self):
+        """Test that reviews can be loaded and saved with their rating fields deferred"""
+        reviews = list(Review.objects.only('id', 'comment'))
+        self.assertEqual(reviews, [self.review])
+
+        # The previously counted rating is unknown, so the aggregates are left alone
+        reviews[0].comment = "Edited"
+        reviews[0].save(update_fields=['comment'])
+        self.venue.refresh_from_db()
+        self.assertEqual(self.venue.rating_count, 1)
+        self.assertEqual(self.venue.rating_avg, 4.0)
+
 
 class ReviewResponseModelTest(TestCase):
     """Test the ReviewResponse model"""
@@ -252,11 +252,10 @@ def provider_review_summary_view(request):
     # Calculate statistics per venue
     venue_stats = []
     for venue in venues:
-        venue_reviews = reviews.filter(venue=venue)
         venue_stats.append({
             'venue': venue,
-            'total_reviews': venue_reviews.count(),
-            'average_rating': venue_reviews.aggregate(Avg('rating'))['rating__avg'] or 0,
+            'total_reviews': venue.rating_count,
+            'average_rating': venue.rating_avg,
         })
 
     return render(request, 'review_app/provider/review_summary.html', {
@@ -418,13 +417,12 @@ def venue_reviews_view(request, venue_id):
     venue = get_object_or_404(Venue, id=venue_id)
     reviews = Review.objects.filter(venue=venue, is_approved=True).order_by('-created_at')
 
-    # Calculate summary statistics
-    total_reviews = reviews.count()
-    average_rating = reviews.aggregate(Avg('rating'))['rating__avg'] or 0
-    rating_distribution = reviews.values('rating').annotate(count=Count('rating')).order_by('rating')
+    # Summary statistics come from the venue's stored rating aggregates
+    total_reviews = venue.rating_count
+    average_rating = venue.rating_avg
+    rating_counts = venue.rating_histogram
 
     # Prepare rating distribution for display
-    rating_counts = {r['rating']: r['count'] for r in rating_distribution}
     rating_percentages = {}
     for i in range(1, 6):
         count = rating_counts.get(i, 0)
@@ -1,3 +1,11 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import VenueSearchDocument
+
+
+@admin.register(VenueSearchDocument)
+class VenueSearchDocumentAdmin(admin.ModelAdmin):
+    """Admin for the venue search index"""
+    list_display = ('venue', 'name', 'updated_at')
+    search_fields = ('name', 'keywords', 'services')
+    readonly_fields = ('venue', 'name', 'keywords', 'services', 'details', 'updated_at')
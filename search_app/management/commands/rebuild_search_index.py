@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+from venues_app.models import Venue
+from search_app.models import VenueSearchDocument
+from search_app.utils import update_search_documents, remove_from_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the venue search documents and full-text index'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Number of venues to index per batch'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        venue_ids = Venue.objects.order_by('id').values_list('id', flat=True)
+
+        indexed_count = 0
+        batch = []
+        for venue_id in venue_ids.iterator(chunk_size=batch_size):
+            batch.append(venue_id)
+            if len(batch) >= batch_size:
+                indexed_count += update_search_documents(batch)
+                batch = []
+
+        if batch:
+            indexed_count += update_search_documents(batch)
+
+        # Drop documents of venues that no longer exist
+        orphaned = VenueSearchDocument.objects.exclude(venue__in=Venue.objects.all())
+        orphaned_ids = list(orphaned.values_list('pk', flat=True))
+        orphaned.delete()
+        remove_from_index(orphaned_ids)
+
+        self.stdout.write(self.style.SUCCESS(f'Indexed {indexed_count} venues'))
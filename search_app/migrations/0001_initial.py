@@ -0,0 +1,58 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:35
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+import django.db.models.deletion
+from django.db import DatabaseError, migrations, models
+
+
+def create_fts_table(apps, schema_editor):
+    # PostgreSQL indexes search_vector with GIN; SQLite mirrors the document into FTS5
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    try:
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS search_app_venuesearchindex USING fts5("
+            "name, keywords, services, details, tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+        )
+    except DatabaseError:
+        # This SQLite build has no FTS5, search falls back to plain filtering
+        schema_editor.connection.fts5_available = False
+    else:
+        schema_editor.connection.fts5_available = True
+
+
+def drop_fts_table(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute('DROP TABLE IF EXISTS search_app_venuesearchindex')
+        schema_editor.connection.fts5_available = False
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('venues_app', '0002_venue_rating_aggregates'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VenueSearchDocument',
+            fields=[
+                ('venue', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='search_document', serialize=False, to='venues_app.venue')),
+                ('name', models.TextField(help_text='Venue name (highest weight)')),
+                ('keywords', models.TextField(blank=True, help_text='Category and tag names')),
+                ('services', models.TextField(blank=True, help_text='Active service titles')),
+                ('details', models.TextField(blank=True, help_text='Venue description and location')),
+                ('search_vector', django.contrib.postgres.search.SearchVectorField(editable=False, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Venue Search Document',
+                'verbose_name_plural': 'Venue Search Documents',
+                'indexes': [django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='search_app_vector_gin')],
+            },
+        ),
+        migrations.RunPython(create_fts_table, drop_fts_table),
+    ]
@@ -1,3 +1,30 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 
-# Create your models here.
+from venues_app.models import Venue
+
+
+class VenueSearchDocument(models.Model):
+    """
+    Denormalized, tokenized search text for a venue, kept up to date by search_app signals.
+    On PostgreSQL the weighted search_vector is indexed with GIN; on SQLite the same fields
+    are mirrored into an FTS5 table created by the initial migration.
+    """
+    venue = models.OneToOneField(Venue, on_delete=models.CASCADE, primary_key=True, related_name='search_document')
+    name = models.TextField(help_text="Venue name (highest weight)")
+    keywords = models.TextField(blank=True, help_text="Category and tag names")
+    services = models.TextField(blank=True, help_text="Active service titles")
+    details = models.TextField(blank=True, help_text="Venue description and location")
+    search_vector = SearchVectorField(null=True, editable=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Venue Search Document"
+        verbose_name_plural = "Venue Search Documents"
+        indexes = [
+            GinIndex(fields=['search_vector'], name='search_app_vector_gin'),
+        ]
+
+    def __str__(self):
+        return f"Search document for {self.name}"
@@ -0,0 +1,69 @@
+from django.db.models.signals import post_save, pre_delete, post_delete, m2m_changed
+from django.dispatch import receiver
+
+from venues_app.models import Venue, Service, Category, Tag
+from .models import VenueSearchDocument
+from .utils import update_search_documents, remove_from_index
+
+
+@receiver(post_save, sender=Venue)
+def update_search_document_on_venue_save(sender, instance, **kwargs):
+    """Rebuild the search document when a venue is saved"""
+    update_search_documents([instance.pk])
+
+
+@receiver(post_save, sender=Service)
+@receiver(post_delete, sender=Service)
+def update_search_document_on_service_change(sender, instance, **kwargs):
+    """
+    Rebuild the venue's search document when one of its services changes.
+    Only existing documents are refreshed, so a venue being deleted is not re-indexed.
+    """
+    update_search_documents([instance.venue_id], create=False)
+
+
+@receiver(m2m_changed, sender=Venue.tags.through)
+def update_search_document_on_tags_change(sender, instance, action, reverse, pk_set, **kwargs):
+    """Rebuild search documents when tags are added to or removed from venues"""
+    if reverse:
+        # instance is a Tag and pk_set holds venue ids
+        if action == 'pre_clear':
+            instance._search_venue_ids = list(instance.venues.values_list('id', flat=True))
+        elif action == 'post_clear':
+            update_search_documents(getattr(instance, '_search_venue_ids', []), create=False)
+        elif action in ('post_add', 'post_remove'):
+            update_search_documents(pk_set, create=False)
+    elif action in ('post_add', 'post_remove', 'post_clear'):
+        update_search_documents([instance.pk], create=False)
+
+
+@receiver(post_save, sender=Category)
+def update_search_documents_on_category_save(sender, instance, created, **kwargs):
+    """Rebuild the search documents of a category's venues when it is renamed"""
+    if not created:
+        update_search_documents(instance.venues.values_list('id', flat=True), create=False)
+
+
+@receiver(pre_delete, sender=Category)
+def remember_category_venues(sender, instance, **kwargs):
+    """Remember a category's venues before deleting it clears their category"""
+    instance._search_venue_ids = list(instance.venues.values_list('id', flat=True))
+
+
+@receiver(post_delete, sender=Category)
+def update_search_documents_on_category_delete(sender, instance, **kwargs):
+    """Rebuild the search documents of a deleted category's venues"""
+    update_search_documents(getattr(instance, '_search_venue_ids', []), create=False)
+
+
+@receiver(post_save, sender=Tag)
+def update_search_documents_on_tag_save(sender, instance, created, **kwargs):
+    """Rebuild the search documents of a tag's venues when it is renamed"""
+    if not created:
+        update_search_documents(instance.venues.values_list('id', flat=True), create=False)
+
+
+@receiver(post_delete, sender=VenueSearchDocument)
+def remove_search_document_from_index(sender, instance, **kwargs):
+    """Remove a deleted document from the full-text index"""
+    remove_from_index([instance.pk])
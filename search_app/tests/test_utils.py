@@ -0,0 +1,122 @@
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.db import connection
+from decimal import Decimal
+
+from venues_app.models import Category, Tag, Venue, Service
+from search_app.models import VenueSearchDocument
+from search_app.utils import create_fts_table, search_venues, tokenize, update_search_documents
+
+User = get_user_model()
+
+
+class VenueSearchTest(TestCase):
+    """Test the venue search index"""
+
+    @classmethod
+    def setUpClass(cls):
+        # The test database is built without migrations, so the FTS5 table is created here
+        create_fts_table(connection)
+        super().setUpClass()
+
+    def setUp(self):
+        """Set up test data"""
+        self.provider = User.objects.create_user(
+            email='provider@example.com',
+            password='testpass123',
+            is_service_provider=True
+        )
+
+        self.spa = Category.objects.create(name='Spa & Wellness')
+        self.salon = Category.objects.create(name='Hair Salon')
+
+        self.spa_venue = Venue.objects.create(
+            owner=self.provider,
+            name='Serenity Spa',
+            category=self.spa,
+            state='New York',
+            county='New York County',
+            city='New York',
+            street_number='123',
+            street_name='Main St',
+            about='A calm retreat offering massages and facials.',
+            approval_status='approved'
+        )
+        self.salon_venue = Venue.objects.create(
+            owner=self.provider,
+            name='Urban Cuts',
+            category=self.salon,
+            state='California',
+            county='Los Angeles County',
+            city='Los Angeles',
+            street_number='45',
+            street_name='Sunset Blvd',
+            about='Modern haircuts with a relaxing massage chair.',
+            approval_status='approved'
+        )
+
+        self.massage = Service.objects.create(
+            venue=self.spa_venue,
+            title='Deep Tissue Massage',
+            short_description='Relieves tension',
+            price=Decimal('120.00'),
+            duration=60
+        )
+
+    def test_tokenize(self):
+        """Test that text is lowercased and stripped of accents and punctuation"""
+        self.assertEqual(tokenize('Café, Spa & Wellness!'), ['cafe', 'spa', 'wellness'])
+
+    def test_documents_follow_signals(self):
+        """Test that documents are kept up to date from venue, service and tag changes"""
+        document = VenueSearchDocument.objects.get(venue=self.spa_venue)
+        self.assertEqual(document.name, 'serenity spa')
+        self.assertEqual(document.keywords, 'spa wellness')
+        self.assertEqual(document.services, 'deep tissue massage')
+
+        # Services
+        self.massage.title = 'Hot Stone Massage'
+        self.massage.save()
+        self.assertIn('stone', VenueSearchDocument.objects.get(venue=self.spa_venue).services)
+
+        # Tags
+        tag = Tag.objects.create(name='Organic')
+        self.salon_venue.tags.add(tag)
+        self.assertEqual(list(search_venues('organic')), [self.salon_venue])
+        self.salon_venue.tags.remove(tag)
+        self.assertEqual(list(search_venues('organic')), [])
+
+        # Deleting a venue removes it from the index
+        spa_venue_id = self.spa_venue.id
+        self.spa_venue.delete()
+        self.assertFalse(VenueSearchDocument.objects.filter(venue_id=spa_venue_id).exists())
+        self.assertEqual(list(search_venues('serenity')), [])
+
+    def test_search_venues_ranking(self):
+        """Test that matches on the venue name rank above matches in the description"""
+        results = list(search_venues('massage'))
+        self.assertEqual(results, [self.spa_venue, self.salon_venue])
+        self.assertGreater(results[0].search_rank, results[1].search_rank)
+
+        # Terms are prefix-matched and must all match
+        self.assertEqual(list(search_venues('urb cut')), [self.salon_venue])
+        self.assertEqual(list(search_venues('urban spa')), [])
+        self.assertEqual(list(search_venues('!!!')), [])
+
+    def test_search_venues_with_queryset(self):
+        """Test that search results are restricted to the given queryset"""
+        queryset = Venue.objects.filter(city='Los Angeles')
+        self.assertEqual(list(search_venues('massage', queryset)), [self.salon_venue])
+
+        # Filters, counts and slices all apply to the full set of matches
+        results = search_venues('massage', Venue.objects.with_card_data())
+        self.assertEqual(results.count(), 2)
+        self.assertEqual(list(results[1:]), [self.salon_venue])
+
+    def test_update_search_documents(self):
+        """Test rebuilding documents that were removed"""
+        VenueSearchDocument.objects.all().delete()
+        self.assertEqual(list(search_venues('serenity')), [])
+
+        self.assertEqual(update_search_documents([self.spa_venue.id, self.salon_venue.id]), 2)
+        self.assertEqual(list(search_venues('serenity')), [self.spa_venue])
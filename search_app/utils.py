@@ -0,0 +1,198 @@
+import re
+import unicodedata
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import DatabaseError, connection
+from django.db.models import F, FloatField, Prefetch, Q, Value
+
+from venues_app.models import Venue, Service
+from .models import VenueSearchDocument
+
+
+# Document fields with their PostgreSQL weights, most important first
+SEARCH_FIELDS = [('name', 'A'), ('keywords', 'B'), ('services', 'C'), ('details', 'D')]
+
+# Text search configuration used for PostgreSQL search vectors and queries
+SEARCH_CONFIG = 'english'
+
+# SQLite FTS5 mirror of VenueSearchDocument, keyed by venue id
+FTS_TABLE = 'search_app_venuesearchindex'
+
+# bm25 column weights for the FTS5 table, in SEARCH_FIELDS order
+FTS_WEIGHTS = (10.0, 4.0, 2.0, 1.0)
+
+
+def tokenize(text):
+    """
+    Split text into lowercase, accent-free word tokens
+    Returns a list of tokens
+    """
+    text = unicodedata.normalize('NFKD', text or '')
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    return re.findall(r'\w+', text.lower())
+
+
+def normalize_search_text(*parts):
+    """
+    Join text parts into a single space-separated token string
+    """
+    return ' '.join(token for part in parts for token in tokenize(part))
+
+
+def get_search_backend():
+    """
+    Return the search backend for the current database: 'postgresql', 'sqlite' or 'basic'
+    """
+    if connection.vendor == 'postgresql':
+        return 'postgresql'
+    if connection.vendor == 'sqlite':
+        # The FTS5 table only exists if this SQLite build supported it when migrating
+        if not hasattr(connection, 'fts5_available'):
+            connection.fts5_available = FTS_TABLE in connection.introspection.table_names()
+        if connection.fts5_available:
+            return 'sqlite'
+    return 'basic'
+
+
+def create_fts_table(sqlite_connection):
+    """
+    Create the FTS5 table on a SQLite database built without migrations, such as the test database.
+    Records whether this SQLite build supports FTS5 on the connection.
+    """
+    columns = ', '.join(field for field, _ in SEARCH_FIELDS)
+    try:
+        with sqlite_connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+                f"{columns}, tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+            )
+    except DatabaseError:
+        sqlite_connection.fts5_available = False
+    else:
+        sqlite_connection.fts5_available = True
+
+
+def build_search_document(venue):
+    """
+    Build the search document of a venue with category, tags and services prefetched
+    Returns an unsaved VenueSearchDocument
+    """
+    return VenueSearchDocument(
+        venue=venue,
+        name=normalize_search_text(venue.name),
+        keywords=normalize_search_text(
+            venue.category.name if venue.category else '',
+            *[tag.name for tag in venue.tags.all()]
+        ),
+        services=normalize_search_text(*[service.title for service in venue.services.all()]),
+        details=normalize_search_text(venue.about, venue.city, venue.county, venue.state)
+    )
+
+
+def update_search_documents(venue_ids, create=True):
+    """
+    Rebuild the search documents of the given venues in a fixed number of queries.
+    With create=False only venues that already have a document are refreshed.
+    Returns the number of documents written
+    """
+    venue_ids = set(venue_ids)
+    if not create:
+        venue_ids &= set(VenueSearchDocument.objects.filter(pk__in=venue_ids).values_list('pk', flat=True))
+    if not venue_ids:
+        return 0
+
+    venues = Venue.objects.filter(id__in=venue_ids).select_related('category').prefetch_related(
+        'tags',
+        Prefetch('services', queryset=Service.objects.filter(is_active=True).only('id', 'venue_id', 'title'))
+    )
+    documents = [build_search_document(venue) for venue in venues]
+    if not documents:
+        return 0
+
+    VenueSearchDocument.objects.bulk_create(
+        documents,
+        update_conflicts=True,
+        unique_fields=['venue'],
+        update_fields=['name', 'keywords', 'services', 'details', 'updated_at']
+    )
+    _index_documents(documents)
+    return len(documents)
+
+
+def _index_documents(documents):
+    """Refresh the database-specific full-text index for the given documents"""
+    backend = get_search_backend()
+    venue_ids = [document.venue_id for document in documents]
+
+    if backend == 'postgresql':
+        search_vector = SearchVector(SEARCH_FIELDS[0][0], weight=SEARCH_FIELDS[0][1], config=SEARCH_CONFIG)
+        for field, weight in SEARCH_FIELDS[1:]:
+            search_vector += SearchVector(field, weight=weight, config=SEARCH_CONFIG)
+        VenueSearchDocument.objects.filter(pk__in=venue_ids).update(search_vector=search_vector)
+
+    elif backend == 'sqlite':
+        fields = [field for field, _ in SEARCH_FIELDS]
+        remove_from_index(venue_ids)
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f"INSERT INTO {FTS_TABLE} (rowid, {', '.join(fields)}) "
+                f"VALUES (%s, {', '.join(['%s'] * len(fields))})",
+                [[document.venue_id] + [getattr(document, field) for field in fields] for document in documents]
+            )
+
+
+def remove_from_index(venue_ids):
+    """Remove venues from the SQLite FTS5 table; other backends index the document row itself"""
+    venue_ids = list(venue_ids)
+    if not venue_ids or get_search_backend() != 'sqlite':
+        return
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {FTS_TABLE} WHERE rowid IN ({', '.join(['%s'] * len(venue_ids))})",
+            venue_ids
+        )
+
+
+def search_venues(query, queryset=None):
+    """
+    Full-text search over venue search documents
+    Returns the queryset filtered to matching venues, annotated with search_rank and
+    ordered by relevance (best first)
+    """
+    if queryset is None:
+        queryset = Venue.objects.all()
+
+    terms = tokenize(query)
+    if not terms:
+        return queryset.none()
+
+    backend = get_search_backend()
+
+    if backend == 'postgresql':
+        # Every term must match, as a prefix of a stemmed lexeme
+        search_query = SearchQuery(' & '.join(f'{term}:*' for term in terms), search_type='raw', config=SEARCH_CONFIG)
+        return queryset.filter(search_document__search_vector=search_query).annotate(
+            search_rank=SearchRank(F('search_document__search_vector'), search_query)
+        ).order_by('-search_rank', 'name')
+
+    if backend == 'sqlite':
+        # Join the FTS5 table so venue filters, ordering and pagination all run in one query
+        match = ' '.join(f'"{term}"*' for term in terms)
+        venue_table = queryset.model._meta.db_table
+        # bm25 scores are negative, lower is better
+        return queryset.extra(
+            select={'search_rank': f"-bm25({FTS_TABLE}, {', '.join(str(weight) for weight in FTS_WEIGHTS)})"},
+            tables=[FTS_TABLE],
+            where=[f"{FTS_TABLE}.rowid = {venue_table}.id", f"{FTS_TABLE} MATCH %s"],
+            params=[match]
+        ).order_by('-search_rank', 'name')
+
+    # Basic fallback: every term must appear in the single-table document
+    condition = Q()
+    for term in terms:
+        term_condition = Q()
+        for field, _ in SEARCH_FIELDS:
+            term_condition |= Q(**{f'search_document__{field}__contains': term})
+        condition &= term_condition
+    return queryset.filter(condition).annotate(search_rank=Value(0.0, output_field=FloatField())).order_by('name')
@@ -116,3 +116,27 @@ function initializeFilterForm() {
         document.body.appendChild(datalist);
     }
 }
+
+// "Near me" proximity search: fill in the browser position and search within the chosen radius
+document.addEventListener('DOMContentLoaded', function() {
+    const nearMeButton = document.getElementById('near-me');
+    if (!nearMeButton || !navigator.geolocation) {
+        return;
+    }
+
+    nearMeButton.addEventListener('click', function() {
+        const form = nearMeButton.closest('form');
+        const radiusSelect = document.getElementById('radius');
+
+        navigator.geolocation.getCurrentPosition(function(position) {
+            document.getElementById('latitude').value = position.coords.latitude.toFixed(6);
+            document.getElementById('longitude').value = position.coords.longitude.toFixed(6);
+            if (!radiusSelect.value) {
+                radiusSelect.value = '25';
+            }
+            form.submit();
+        }, function(error) {
+            console.error('Error getting location:', error);
+        });
+    });
+});
@@ -0,0 +1,20 @@
+from django.utils.functional import SimpleLazyObject
+
+
+def get_request_value(request, key, func):
+    """
+    Compute a value at most once per request, e.g. for context processors that run on every
+    template rendered while handling it
+    """
+    values = request.__dict__.setdefault('_context_values', {})
+    if key not in values:
+        values[key] = func()
+    return values[key]
+
+
+def lazy_request_value(request, key, func):
+    """
+    Wrap a template context value so it is only computed when a template uses it.
+    The value is then memoized for the rest of the request.
+    """
+    return SimpleLazyObject(lambda: get_request_value(request, key, func))
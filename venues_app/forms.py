@@ -1,7 +1,7 @@
 from django import forms
 from django.core.exceptions import ValidationError
-from django.db.models import Q
 from .models import Venue, Service, VenueImage, OpeningHours, FAQ, TeamMember, Review, USCity
+from .utils import SEARCH_RADIUS_CHOICES, get_location_index
 from utils.forms import VenueImageForm as BaseVenueImageForm, ProfileImageForm
 from utils.image_service import ImageService
 
@@ -33,32 +33,20 @@ class VenueSearchForm(forms.Form):
         required=False,
         widget=forms.HiddenInput()
     )
+    radius = forms.TypedChoiceField(
+        choices=[('', 'Any distance')] + [(str(radius), f'Within {radius} miles') for radius in SEARCH_RADIUS_CHOICES],
+        coerce=int,
+        empty_value=None,
+        required=False,
+        widget=forms.Select(attrs={'class': 'form-select'})
+    )
+    # Set by the browser for "near me" searches
+    latitude = forms.FloatField(required=False, min_value=-90, max_value=90, widget=forms.HiddenInput())
+    longitude = forms.FloatField(required=False, min_value=-180, max_value=180, widget=forms.HiddenInput())
 
     def get_location_suggestions(self, query):
         """Get location suggestions based on the query"""
-        if not query or len(query) < 2:
-            return []
-
-        # Search for cities, states, and counties that match the query
-        locations = USCity.objects.filter(
-            Q(city__icontains=query) |
-            Q(state_name__icontains=query) |
-            Q(county_name__icontains=query)
-        ).distinct().order_by('state_name', 'city')[:10]
-
-        # Format the results
-        suggestions = []
-        for location in locations:
-            suggestions.append({
-                'id': location.id,
-                'text': f"{location.city}, {location.state_id}",
-                'city': location.city,
-                'state': location.state_name,
-                'county': location.county_name,
-                'state_id': location.state_id,
-            })
-
-        return suggestions
+        return get_location_index().suggest(query)
 
 
 class VenueFilterForm(forms.Form):
@@ -79,6 +67,13 @@ class VenueFilterForm(forms.Form):
         ('female', 'Female Only'),
     ]
 
+    MIN_RATING_CHOICES = [
+        ('', 'Any Rating'),
+        ('4', '4+ Stars'),
+        ('3', '3+ Stars'),
+        ('2', '2+ Stars'),
+    ]
+
     sort_by = forms.ChoiceField(
         choices=SORT_CHOICES,
         required=False,
@@ -96,6 +91,14 @@ class VenueFilterForm(forms.Form):
         widget=forms.CheckboxInput(attrs={'class': 'form-check-input'})
     )
 
+    min_rating = forms.TypedChoiceField(
+        choices=MIN_RATING_CHOICES,
+        coerce=int,
+        empty_value=None,
+        required=False,
+        widget=forms.Select(attrs={'class': 'form-select'})
+    )
+
     state = forms.CharField(
         required=False,
         widget=forms.TextInput(attrs={'class': 'form-control'})
@@ -113,23 +116,15 @@ class VenueFilterForm(forms.Form):
 
     def get_states(self):
         """Get list of states for filtering"""
-        return USCity.objects.values_list('state_name', flat=True).distinct().order_by('state_name')
+        return get_location_index().get_states()
 
     def get_counties(self, state=None):
         """Get list of counties for filtering"""
-        counties = USCity.objects.values_list('county_name', flat=True)
-        if state:
-            counties = counties.filter(state_name__iexact=state)
-        return counties.distinct().order_by('county_name')
+        return get_location_index().get_counties(state)
 
     def get_cities(self, state=None, county=None):
         """Get list of cities for filtering"""
-        cities = USCity.objects.values_list('city', flat=True)
-        if state:
-            cities = cities.filter(state_name__iexact=state)
-        if county:
-            cities = cities.filter(county_name__iexact=county)
-        return cities.distinct().order_by('city')
+        return get_location_index().get_cities(state, county)
 
 
 class VenueForm(forms.ModelForm):
@@ -2,12 +2,19 @@ import csv
 import os
 from django.core.management.base import BaseCommand
 from django.db import transaction
+from django.db.models.signals import post_delete
 from venues_app.models import USCity
-from decimal import Decimal
+from venues_app.signals import us_city_changed
+from venues_app.utils import invalidate_location_index
+from decimal import Decimal, InvalidOperation
+
+
+# Fields refreshed when a city already exists
+UPDATE_FIELDS = ['city', 'state_id', 'state_name', 'county_name', 'latitude', 'longitude', 'zip_codes']
 
 
 class Command(BaseCommand):
-    help = 'Import US cities data from us_cities.csv'
+    help = 'Import US cities data from us_cities.csv, inserting new cities and updating existing ones by city_id'
 
     def add_arguments(self, parser):
         parser.add_argument(
@@ -15,52 +22,89 @@ class Command(BaseCommand):
             default='venues_app/us_cities.csv',
             help='Path to the CSV file containing US cities data'
         )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=2000,
+            help='Number of cities to upsert per query'
+        )
+        parser.add_argument(
+            '--prune',
+            action='store_true',
+            help='Delete cities that are not in the file'
+        )
+
+    def iter_cities(self, file):
+        """Parse CSV rows into unsaved USCity objects, skipping invalid rows"""
+        reader = csv.DictReader(file)
+        for line_number, row in enumerate(reader, start=2):
+            try:
+                yield USCity(
+                    city=row['city'],
+                    state_id=row['state_id'],
+                    state_name=row['state_name'],
+                    county_name=row['county_name'],
+                    latitude=Decimal(row['lat']),
+                    longitude=Decimal(row['lng']),
+                    zip_codes=row['zips'],
+                    city_id=row['id']
+                )
+            except (KeyError, TypeError, InvalidOperation) as e:
+                self.stdout.write(self.style.ERROR(f'Error importing line {line_number}: {e}'))
+                self.stdout.write(self.style.ERROR(f'Row data: {row}'))
+
+    def upsert(self, cities):
+        """Insert new cities and update existing ones in a single query"""
+        with transaction.atomic():
+            USCity.objects.bulk_create(
+                list(cities),
+                update_conflicts=True,
+                unique_fields=['city_id'],
+                update_fields=UPDATE_FIELDS
+            )
 
     def handle(self, *args, **options):
         file_path = options['file']
-        
+        batch_size = options['batch_size']
+
         if not os.path.exists(file_path):
             self.stdout.write(self.style.ERROR(f'File not found: {file_path}'))
             return
-        
+
         self.stdout.write(self.style.SUCCESS(f'Starting import from {file_path}'))
-        
-        # Count total rows for progress reporting
-        with open(file_path, 'r') as f:
-            total_rows = sum(1 for _ in csv.reader(f)) - 1  # Subtract header row
-        
-        # Process the CSV file
-        with open(file_path, 'r') as f:
-            reader = csv.DictReader(f)
-            
-            # Use transaction to speed up bulk import
-            with transaction.atomic():
-                # Clear existing data if any
-                USCity.objects.all().delete()
-                self.stdout.write(self.style.SUCCESS('Cleared existing US cities data'))
-                
-                # Import new data
-                counter = 0
-                for row in reader:
-                    try:
-                        USCity.objects.create(
-                            city=row['city'],
-                            state_id=row['state_id'],
-                            state_name=row['state_name'],
-                            county_name=row['county_name'],
-                            latitude=Decimal(row['lat']),
-                            longitude=Decimal(row['lng']),
-                            zip_codes=row['zips'],
-                            city_id=row['id']
-                        )
-                        counter += 1
-                        
-                        # Report progress every 1000 rows
-                        if counter % 1000 == 0:
-                            self.stdout.write(self.style.SUCCESS(f'Imported {counter}/{total_rows} cities...'))
-                    
-                    except Exception as e:
-                        self.stdout.write(self.style.ERROR(f'Error importing row {counter}: {e}'))
-                        self.stdout.write(self.style.ERROR(f'Row data: {row}'))
-        
+
+        # Stream the file once; each batch is committed on its own so readers
+        # always see a complete table and nothing is locked for the whole import
+        counter = 0
+        imported_ids = set()
+        batch = {}
+        with open(file_path, 'r', newline='', encoding='utf-8') as f:
+            for city in self.iter_cities(f):
+                # Keyed by city_id, as an upsert cannot touch the same row twice
+                batch[city.city_id] = city
+                imported_ids.add(city.city_id)
+                if len(batch) >= batch_size:
+                    self.upsert(batch.values())
+                    counter += len(batch)
+                    batch = {}
+                    self.stdout.write(self.style.SUCCESS(f'Imported {counter} cities...'))
+
+        if batch:
+            self.upsert(batch.values())
+            counter += len(batch)
+
+        if options['prune']:
+            stale_ids = list(set(USCity.objects.values_list('city_id', flat=True)) - imported_ids)
+            # The index is invalidated once below, not for every deleted city
+            post_delete.disconnect(us_city_changed, sender=USCity)
+            try:
+                for start in range(0, len(stale_ids), batch_size):
+                    USCity.objects.filter(city_id__in=stale_ids[start:start + batch_size]).delete()
+            finally:
+                post_delete.connect(us_city_changed, sender=USCity)
+            self.stdout.write(self.style.SUCCESS(f'Removed {len(stale_ids)} cities not in the file'))
+
+        # Make every process rebuild its location autocomplete index
+        invalidate_location_index()
+
         self.stdout.write(self.style.SUCCESS(f'Successfully imported {counter} US cities'))
@@ -0,0 +1,74 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:31
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def populate_rating_aggregates(apps, schema_editor):
+    Venue = apps.get_model('venues_app', 'Venue')
+    Review = apps.get_model('review_app', 'Review')
+
+    histograms = {}
+    rows = (
+        Review.objects.filter(is_approved=True)
+        .values_list('venue_id', 'rating')
+        .annotate(count=Count('id'))
+        .order_by()
+    )
+    for venue_id, rating, count in rows:
+        histograms.setdefault(venue_id, {})[rating] = count
+
+    for venue_id, histogram in histograms.items():
+        rating_count = sum(histogram.values())
+        Venue.objects.filter(pk=venue_id).update(
+            rating_avg=sum(rating * count for rating, count in histogram.items()) / rating_count,
+            rating_count=rating_count,
+            **{f'rating_{rating}_count': histogram.get(rating, 0) for rating in range(1, 6)}
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('venues_app', '0001_initial'),
+        ('review_app', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='venue',
+            name='rating_1_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='venue',
+            name='rating_2_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='venue',
+            name='rating_3_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='venue',
+            name='rating_4_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='venue',
+            name='rating_5_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='venue',
+            name='rating_avg',
+            field=models.FloatField(db_index=True, default=0),
+        ),
+        migrations.AddField(
+            model_name='venue',
+            name='rating_count',
+            field=models.PositiveIntegerField(db_index=True, default=0),
+        ),
+        migrations.RunPython(populate_rating_aggregates, migrations.RunPython.noop),
+    ]
@@ -7,7 +7,8 @@ from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.db import models
-from django.db.models import Avg
+from django.db.models import Case, Count, F, FloatField, OuterRef, Subquery, Value, When
+from django.db.models.functions import Cast
 from django.utils.text import slugify
 
 # Local imports
@@ -69,6 +70,21 @@ class Tag(models.Model):
 
 
 
+class VenueQuerySet(models.QuerySet):
+    """Queryset for venues"""
+
+    def with_card_data(self):
+        """
+        Attach the data shown on venue cards, so rendering a card needs no further queries.
+        The rating and review count are stored on the venue, the category is joined and the
+        primary image path is attached with a subquery and used by get_primary_image.
+        """
+        primary_images = VenueImage.objects.filter(venue=OuterRef('pk'), image_order=1).order_by('pk')
+        return self.select_related('category').annotate(
+            primary_image_path=Subquery(primary_images.values('image')[:1])
+        )
+
+
 class Venue(models.Model):
     """Venue model for service providers"""
     APPROVAL_STATUS_CHOICES = [
@@ -111,8 +127,26 @@ class Venue(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Denormalized rating aggregates over approved reviews, kept up to date by review_app signals
+    rating_avg = models.FloatField(default=0, db_index=True)
+    rating_count = models.PositiveIntegerField(default=0, db_index=True)
+    rating_1_count = models.PositiveIntegerField(default=0)
+    rating_2_count = models.PositiveIntegerField(default=0)
+    rating_3_count = models.PositiveIntegerField(default=0)
+    rating_4_count = models.PositiveIntegerField(default=0)
+    rating_5_count = models.PositiveIntegerField(default=0)
+
+    RATING_VALUES = [1, 2, 3, 4, 5]
+    RATING_FIELDS = ['rating_avg', 'rating_count'] + [f'rating_{rating}_count' for rating in RATING_VALUES]
+
+    objects = VenueQuerySet.as_manager()
+
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Bounding-box prefilter for proximity search
+            models.Index(fields=['latitude', 'longitude'], name='venue_lat_lng_idx'),
+        ]
 
     def __str__(self):
         return self.name
@@ -137,6 +171,16 @@ class Venue(models.Model):
                 self.latitude = city_match.latitude
                 self.longitude = city_match.longitude
 
+        # The rating aggregates are only changed with F() updates, so saving an existing
+        # venue must not write back the values it was loaded with
+        if not self._state.adding and kwargs.get('update_fields') is None and not args:
+            deferred_fields = self.get_deferred_fields()
+            kwargs['update_fields'] = [
+                field.attname for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.RATING_FIELDS
+                and field.attname not in deferred_fields
+            ]
+
         super().save(*args, **kwargs)
 
 
@@ -145,19 +189,84 @@ class Venue(models.Model):
         return f"{self.street_number} {self.street_name}, {self.city}, {self.state}"
 
     def get_average_rating(self):
-        """Calculate the average rating for this venue using review_app reviews"""
-        avg = self.review_app_reviews.filter(is_approved=True).aggregate(Avg('rating'))['rating__avg']
-        return round(avg, 1) if avg else 0
+        """Return the average rating for this venue using review_app reviews"""
+        return round(self.rating_avg, 1) if self.rating_count else 0
 
     def get_review_count(self):
         """Return the number of reviews for this venue using review_app reviews"""
-        return self.review_app_reviews.filter(is_approved=True).count()
+        return self.rating_count
+
+    @property
+    def rating_histogram(self):
+        """Return the number of approved reviews for each star rating, highest first"""
+        return {rating: getattr(self, f'rating_{rating}_count') for rating in reversed(self.RATING_VALUES)}
+
+    def set_rating_stats(self, histogram):
+        """Set the rating aggregates from a {rating: count} histogram without saving"""
+        total = 0
+        count = 0
+        for rating in self.RATING_VALUES:
+            rating_count = histogram.get(rating, 0)
+            setattr(self, f'rating_{rating}_count', rating_count)
+            total += rating * rating_count
+            count += rating_count
+        self.rating_count = count
+        self.rating_avg = total / count if count else 0
+
+    def rebuild_rating_stats(self):
+        """Recompute the rating aggregates from the approved reviews of this venue"""
+        histogram = dict(
+            self.review_app_reviews.filter(is_approved=True)
+            .values_list('rating')
+            .annotate(count=Count('id'))
+            .order_by()
+        )
+        self.set_rating_stats(histogram)
+        Venue.objects.filter(pk=self.pk).update(**{field: getattr(self, field) for field in self.RATING_FIELDS})
+
+    @classmethod
+    def adjust_rating_stats(cls, venue_id, rating_deltas):
+        """
+        Apply {rating: delta} changes to the rating aggregates of a venue in the database
+        Returns True if any aggregate was changed
+        """
+        updates = {}
+        count_delta = 0
+        for rating, delta in rating_deltas.items():
+            if delta:
+                field = f'rating_{rating}_count'
+                updates[field] = F(field) + delta
+                count_delta += delta
+
+        if not updates:
+            return False
+
+        updates['rating_count'] = F('rating_count') + count_delta
+        venues = cls.objects.filter(pk=venue_id)
+        venues.update(**updates)
+
+        # Recompute the average from the updated histogram
+        rating_total = sum(rating * F(f'rating_{rating}_count') for rating in cls.RATING_VALUES)
+        venues.update(rating_avg=Case(
+            When(rating_count=0, then=Value(0.0)),
+            default=Cast(rating_total, FloatField()) / F('rating_count'),
+            output_field=FloatField()
+        ))
+        return True
 
     def get_primary_image(self):
-        """Return the primary image for this venue"""
-        primary_image = self.images.filter(image_order=1).first()
-        if primary_image:
-            return primary_image.image.url
+        """
+        Return the URL of the primary image for this venue, using the image path attached by
+        VenueQuerySet.with_card_data or the prefetched images when present
+        """
+        if hasattr(self, 'primary_image_path'):
+            path = self.primary_image_path
+        elif 'images' in getattr(self, '_prefetched_objects_cache', {}):
+            path = next((image.image.name for image in self.images.all() if image.image_order == 1), None)
+        else:
+            path = self.images.filter(image_order=1).order_by('pk').values_list('image', flat=True).first()
+        if path:
+            return VenueImage._meta.get_field('image').storage.url(path)
         return None
 
 
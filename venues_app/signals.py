@@ -1,8 +1,9 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from django.core.mail import send_mail
 from django.conf import settings
-from .models import Venue, Review
+from .models import Venue, Review, USCity
+from .utils import invalidate_location_index
 
 @receiver(post_save, sender=Venue)
 def venue_status_changed(sender, instance, created, **kwargs):
@@ -68,3 +69,10 @@ def review_submitted(sender, instance, created, **kwargs):
             [instance.venue.owner.email],
             fail_silently=True,
         )
+
+
+@receiver(post_save, sender=USCity)
+@receiver(post_delete, sender=USCity)
+def us_city_changed(sender, instance, **kwargs):
+    """Rebuild the location autocomplete index when US city data changes"""
+    invalidate_location_index()
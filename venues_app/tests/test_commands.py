@@ -0,0 +1,73 @@
+import os
+import tempfile
+from io import StringIO
+
+from unittest.mock import patch
+
+from django.test import TestCase
+from django.core.management import call_command
+from decimal import Decimal
+
+from venues_app.models import USCity
+
+
+class ImportUSCitiesCommandTest(TestCase):
+    """Test the import_us_cities management command"""
+
+    HEADER = 'city,state_id,state_name,county_name,lat,lng,zips,id\n'
+
+    def setUp(self):
+        """Set up test data"""
+        self.existing = USCity.objects.create(
+            city='Portland', state_id='OR', state_name='Oregon', county_name='Multnomah',
+            latitude=Decimal('45.0000000'), longitude=Decimal('-122.0000000'),
+            zip_codes='97201', city_id='1840019941'
+        )
+        self.stale = USCity.objects.create(
+            city='Nowhere', state_id='OR', state_name='Oregon', county_name='Nowhere',
+            latitude=Decimal('44.0000000'), longitude=Decimal('-121.0000000'),
+            zip_codes='97999', city_id='1840999999'
+        )
+
+    def import_csv(self, rows, *args):
+        """Write rows to a temporary CSV file and import it"""
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as f:
+            f.write(self.HEADER + ''.join(rows))
+        self.addCleanup(os.remove, f.name)
+
+        out = StringIO()
+        call_command('import_us_cities', '--file', f.name, '--batch-size', '2', *args, stdout=out)
+        return out.getvalue()
+
+    def test_import_upserts_by_city_id(self):
+        """Test that new cities are added and existing ones updated in place"""
+        output = self.import_csv([
+            'Portland,OR,Oregon,Multnomah,45.5152,-122.6784,97201 97202,1840019941\n',
+            'Seattle,WA,Washington,King,47.6211,-122.3244,98101,1840021117\n',
+            'Broken,WA,Washington,King,not-a-number,-122.0,98000,1840000000\n',
+            'Tacoma,WA,Washington,Pierce,47.2431,-122.4531,98402,1840021129\n',
+        ])
+
+        self.assertIn('Successfully imported 3 US cities', output)
+        self.assertIn('Error importing line 4', output)
+
+        # Existing rows keep their primary key, so venue links survive
+        self.existing.refresh_from_db()
+        self.assertEqual(self.existing.zip_codes, '97201 97202')
+        self.assertEqual(self.existing.latitude, Decimal('45.5152000'))
+        self.assertTrue(USCity.objects.filter(city_id='1840021129').exists())
+
+        # Cities missing from the file are kept unless pruning
+        self.assertTrue(USCity.objects.filter(pk=self.stale.pk).exists())
+
+    def test_import_prune(self):
+        """Test that --prune removes cities missing from the file"""
+        with patch('venues_app.signals.invalidate_location_index') as signal_invalidate:
+            self.import_csv([
+                'Portland,OR,Oregon,Multnomah,45.5152,-122.6784,97201,1840019941\n',
+            ], '--prune')
+
+        self.assertEqual(list(USCity.objects.values_list('city_id', flat=True)), ['1840019941'])
+
+        # Deleted cities do not invalidate the location index one by one
+        signal_invalidate.assert_not_called()
@@ -8,6 +8,7 @@ from venues_app.models import (
     Category, Tag, Venue, VenueImage, OpeningHours,
     FAQ, Service, Review, TeamMember, USCity
 )
+from review_app.models import Review as ReviewAppReview
 
 User = get_user_model()
 
@@ -141,6 +142,40 @@ class VenueModelTest(TestCase):
         self.assertEqual(self.venue.tags.count(), 1)
         self.assertEqual(self.venue.tags.first(), self.tag)
 
+    def test_get_primary_image(self):
+        """Test that get_primary_image uses the card data attached by the queryset."""
+        self.assertIsNone(self.venue.get_primary_image())
+
+        VenueImage.objects.create(venue=self.venue, image="venue_images/gallery.jpg", image_order=2)
+        primary = VenueImage.objects.create(venue=self.venue, image="venue_images/primary.jpg", image_order=1)
+        self.assertEqual(self.venue.get_primary_image(), primary.image.url)
+
+        # Card data is loaded with the venues, so rendering cards needs no further queries
+        with self.assertNumQueries(1):
+            venues = list(Venue.objects.with_card_data())
+            self.assertEqual(venues[0].get_primary_image(), primary.image.url)
+            self.assertEqual(venues[0].get_average_rating(), 0)
+            self.assertEqual(venues[0].get_review_count(), 0)
+            self.assertEqual(venues[0].category.name, "Spa")
+
+
+    def test_save_keeps_rating_aggregates(self):
+        """Test that saving a venue does not overwrite rating changes made since it was loaded."""
+        venue = Venue.objects.get(pk=self.venue.pk)
+
+        # A review is added between loading and saving the venue
+        customer = User.objects.create_user(email="customer@example.com", password="testpass123", is_customer=True)
+        ReviewAppReview.objects.create(venue=self.venue, user=customer, rating=5, comment="Wonderful")
+
+        venue.about = "Updated description."
+        venue.save()
+
+        venue.refresh_from_db()
+        self.assertEqual(venue.about, "Updated description.")
+        self.assertEqual(venue.rating_count, 1)
+        self.assertEqual(venue.rating_5_count, 1)
+        self.assertEqual(venue.rating_avg, 5.0)
+
 
 class ServiceModelTest(TestCase):
     """Test the Service model."""
@@ -0,0 +1,185 @@
+from django.test import TestCase
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from decimal import Decimal
+
+from venues_app.models import Category, Venue, USCity
+from venues_app.utils import (
+    get_bounding_box, haversine_distance, filter_within_radius, resolve_location_point,
+    LocationIndex, get_location_index, invalidate_location_index
+)
+
+User = get_user_model()
+
+
+class GeoUtilsTest(TestCase):
+    """Test the proximity search utilities"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.provider = User.objects.create_user(
+            email='provider@example.com',
+            password='testpass123',
+            is_service_provider=True
+        )
+        self.category = Category.objects.create(name='Spa')
+
+        self.manhattan = USCity.objects.create(
+            city='New York',
+            state_id='NY',
+            state_name='New York',
+            county_name='New York',
+            latitude=Decimal('40.7128000'),
+            longitude=Decimal('-74.0060000'),
+            zip_codes='10001 10002 10003',
+            city_id='1840034016'
+        )
+
+        # Roughly 0, 8, 80 and 2450 miles from Manhattan
+        self.near_venue = self.create_venue('Midtown Spa', '40.7580000', '-73.9855000')
+        self.brooklyn_venue = self.create_venue('Brooklyn Spa', '40.6782000', '-73.9442000')
+        self.philly_venue = self.create_venue('Philly Spa', '39.9526000', '-75.1652000')
+        self.la_venue = self.create_venue('LA Spa', '34.0522000', '-118.2437000')
+        self.unlocated_venue = self.create_venue('Unknown Spa', None, None)
+
+    def create_venue(self, name, latitude, longitude):
+        """Create an approved venue at the given coordinates"""
+        venue = Venue.objects.create(
+            owner=self.provider,
+            name=name,
+            category=self.category,
+            state='Nowhere',
+            county='Nowhere County',
+            city='Nowhere',
+            street_number='1',
+            street_name='Main St',
+            about='A venue.',
+            approval_status='approved'
+        )
+        # Bypass the automatic US city lookup in Venue.save
+        Venue.objects.filter(pk=venue.pk).update(
+            latitude=Decimal(latitude) if latitude else None,
+            longitude=Decimal(longitude) if longitude else None
+        )
+        return venue
+
+    def test_haversine_distance(self):
+        """Test the great-circle distance between two cities"""
+        distance = haversine_distance(40.7128, -74.0060, 34.0522, -118.2437)
+        self.assertAlmostEqual(distance, 2445.6, delta=1)
+        self.assertEqual(haversine_distance(40.7128, -74.0060, 40.7128, -74.0060), 0)
+
+    def test_get_bounding_box(self):
+        """Test that the bounding box contains the whole radius"""
+        min_latitude, max_latitude, min_longitude, max_longitude = get_bounding_box(40.7128, -74.0060, 10)
+        self.assertAlmostEqual(haversine_distance(40.7128, -74.0060, max_latitude, -74.0060), 10, places=3)
+        self.assertAlmostEqual(haversine_distance(40.7128, -74.0060, min_latitude, -74.0060), 10, places=3)
+        self.assertLess(min_longitude, -74.0060)
+        self.assertGreater(max_longitude, -74.0060)
+        self.assertGreaterEqual(haversine_distance(40.7128, -74.0060, 40.7128, max_longitude), 10)
+
+    def test_filter_within_radius(self):
+        """Test that venues within the radius are returned nearest first with their distance"""
+        venues = list(filter_within_radius(Venue.objects.all(), 40.7128, -74.0060, 25))
+        self.assertEqual(venues, [self.near_venue, self.brooklyn_venue])
+        self.assertAlmostEqual(
+            venues[0].distance,
+            haversine_distance(40.7128, -74.0060, 40.7580, -73.9855),
+            places=6
+        )
+
+        venues = filter_within_radius(Venue.objects.all(), 40.7128, -74.0060, 100)
+        self.assertEqual(list(venues), [self.near_venue, self.brooklyn_venue, self.philly_venue])
+
+    def test_resolve_location_point(self):
+        """Test resolving zip codes and city names to coordinates"""
+        self.assertEqual(resolve_location_point('10002'), (40.7128, -74.006))
+        self.assertEqual(resolve_location_point('New York, NY'), (40.7128, -74.006))
+        self.assertEqual(resolve_location_point('new york'), (40.7128, -74.006))
+        self.assertIsNone(resolve_location_point('1000'))
+        self.assertIsNone(resolve_location_point('00001'))
+        self.assertIsNone(resolve_location_point('Springfield, NY'))
+
+    def test_venue_list_radius_search(self):
+        """Test proximity search on the venue list page"""
+        response = self.client.get(reverse('venues_app:venue_list'), {'location': '10001', 'radius': '25'})
+        self.assertEqual(list(response.context['venues']), [self.near_venue, self.brooklyn_venue])
+        self.assertEqual(response.context['search_point'], (40.7128, -74.006))
+
+
+class LocationIndexTest(TestCase):
+    """Test the location autocomplete index"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.provider = User.objects.create_user(
+            email='provider@example.com',
+            password='testpass123',
+            is_service_provider=True
+        )
+
+        self.portland_me = USCity.objects.create(
+            city='Portland', state_id='ME', state_name='Maine', county_name='Cumberland',
+            latitude=Decimal('43.6591000'), longitude=Decimal('-70.2568000'),
+            zip_codes='04101 04102', city_id='1840000327'
+        )
+        self.portland_or = USCity.objects.create(
+            city='Portland', state_id='OR', state_name='Oregon', county_name='Multnomah',
+            latitude=Decimal('45.5152000'), longitude=Decimal('-122.6784000'),
+            zip_codes='97201 97202', city_id='1840019941'
+        )
+        self.south_portland = USCity.objects.create(
+            city='South Portland', state_id='ME', state_name='Maine', county_name='Cumberland',
+            latitude=Decimal('43.6415000'), longitude=Decimal('-70.2409000'),
+            zip_codes='04106', city_id='1840000329'
+        )
+
+        # The Oregon city has a venue, so it ranks first
+        Venue.objects.create(
+            owner=self.provider,
+            name='Rose City Spa',
+            state='Oregon',
+            county='Multnomah',
+            city='Portland',
+            street_number='1',
+            street_name='Main St',
+            about='A venue.',
+            approval_status='approved',
+            us_city=self.portland_or
+        )
+
+    def test_suggest(self):
+        """Test prefix suggestions ranked by venue density"""
+        index = LocationIndex.build()
+
+        texts = [suggestion['text'] for suggestion in index.suggest('port')]
+        self.assertEqual(texts, ['Portland, OR', 'Portland, ME', 'South Portland, ME'])
+
+        self.assertEqual([s['text'] for s in index.suggest('Portland,me')], ['Portland, ME'])
+        self.assertEqual([s['text'] for s in index.suggest('portland, oreg')], ['Portland, OR'])
+        self.assertEqual([s['text'] for s in index.suggest('0410')], ['Portland, ME', 'South Portland, ME'])
+        self.assertEqual([s['text'] for s in index.suggest('multn')], ['Portland, OR'])
+        self.assertEqual(index.suggest('p'), [])
+        self.assertEqual(index.suggest('seattle'), [])
+
+    def test_location_data(self):
+        """Test state, county and city lists"""
+        index = LocationIndex.build()
+        self.assertEqual(index.get_states(), ['Maine', 'Oregon'])
+        self.assertEqual(index.get_counties('maine'), ['Cumberland'])
+        self.assertEqual(index.get_cities('Maine', 'Cumberland'), ['Portland', 'South Portland'])
+
+    def test_index_invalidated_on_change(self):
+        """Test that changing US cities rebuilds the shared index"""
+        self.assertEqual(len(get_location_index().suggest('port')), 3)
+
+        self.south_portland.delete()
+        self.assertEqual(len(get_location_index().suggest('port')), 2)
+
+    def test_location_suggestions_api(self):
+        """Test the autocomplete endpoint uses the index and is cacheable"""
+        invalidate_location_index()
+        response = self.client.get(reverse('venues_app:location_suggestions_api'), {'query': 'south'})
+        self.assertEqual(response.json()['suggestions'][0]['text'], 'South Portland, ME')
+        self.assertIn('max-age=3600', response['Cache-Control'])
+        self.assertIn('public', response['Cache-Control'])
@@ -0,0 +1,295 @@
+import math
+import re
+import threading
+import uuid
+from collections import defaultdict
+
+from django.core.cache import cache
+from django.db.models import Count, ExpressionWrapper, F, FloatField, Q, Value
+from django.db.models.functions import ASin, Cast, Cos, Least, Power, Radians, Sin, Sqrt
+
+from .models import USCity, Venue
+
+
+# Mean Earth radius used for distance calculations
+EARTH_RADIUS_MILES = 3958.8
+
+# Radius options offered for proximity search, in miles
+SEARCH_RADIUS_CHOICES = [5, 10, 25, 50, 100]
+
+ZIP_CODE_PATTERN = re.compile(r'^\d{5}$')
+
+
+def get_bounding_box(latitude, longitude, radius_miles):
+    """
+    Get the latitude/longitude box that contains every point within radius_miles of a point
+    Returns a tuple (min_latitude, max_latitude, min_longitude, max_longitude)
+    """
+    latitude_delta = math.degrees(radius_miles / EARTH_RADIUS_MILES)
+    min_latitude = max(latitude - latitude_delta, -90.0)
+    max_latitude = min(latitude + latitude_delta, 90.0)
+
+    # Near the poles every longitude is within range
+    if min_latitude <= -90.0 or max_latitude >= 90.0:
+        return min_latitude, max_latitude, -180.0, 180.0
+
+    longitude_delta = math.degrees(
+        math.asin(min(math.sin(radius_miles / EARTH_RADIUS_MILES) / math.cos(math.radians(latitude)), 1.0))
+    )
+    return min_latitude, max_latitude, longitude - longitude_delta, longitude + longitude_delta
+
+
+def haversine_distance(latitude1, longitude1, latitude2, longitude2):
+    """
+    Calculate the great-circle distance between two points
+    Returns the distance in miles
+    """
+    latitude1, longitude1, latitude2, longitude2 = map(
+        math.radians, (float(latitude1), float(longitude1), float(latitude2), float(longitude2))
+    )
+    a = (
+        math.sin((latitude2 - latitude1) / 2) ** 2 +
+        math.cos(latitude1) * math.cos(latitude2) * math.sin((longitude2 - longitude1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_MILES * math.asin(min(math.sqrt(a), 1.0))
+
+
+def haversine_expression(latitude, longitude, latitude_field='latitude', longitude_field='longitude'):
+    """
+    Build a database expression for the haversine distance in miles from a point to each row
+    """
+    point_latitude = math.radians(latitude)
+    row_latitude = Radians(Cast(F(latitude_field), FloatField()))
+    row_longitude = Radians(Cast(F(longitude_field), FloatField()))
+
+    a = (
+        Power(Sin((row_latitude - Value(point_latitude)) / Value(2.0)), Value(2.0)) +
+        Value(math.cos(point_latitude)) * Cos(row_latitude) *
+        Power(Sin((row_longitude - Value(math.radians(longitude))) / Value(2.0)), Value(2.0))
+    )
+    return ExpressionWrapper(
+        Value(2 * EARTH_RADIUS_MILES) * ASin(Least(Sqrt(a), Value(1.0))),
+        output_field=FloatField()
+    )
+
+
+def filter_within_radius(queryset, latitude, longitude, radius_miles):
+    """
+    Filter a venue queryset to venues within radius_miles of a point.
+    A bounding box on the indexed latitude/longitude columns narrows the candidates before
+    the exact haversine distance is computed for them in the same query.
+    Returns the queryset annotated with distance (in miles) and ordered nearest first
+    """
+    latitude = float(latitude)
+    longitude = float(longitude)
+    min_latitude, max_latitude, min_longitude, max_longitude = get_bounding_box(latitude, longitude, radius_miles)
+
+    return queryset.filter(
+        latitude__range=(min_latitude, max_latitude),
+        longitude__range=(min_longitude, max_longitude)
+    ).annotate(
+        distance=haversine_expression(latitude, longitude)
+    ).filter(
+        distance__lte=radius_miles
+    ).order_by('distance', 'name')
+
+
+def resolve_location_point(location):
+    """
+    Resolve a zip code, "City, ST", "City, State" or city name to coordinates
+    Returns a tuple (latitude, longitude) or None if no US city matches
+    """
+    location = (location or '').strip()
+    if not location:
+        return None
+
+    if ZIP_CODE_PATTERN.match(location):
+        # zip_codes is a space-separated list, so match whole words only
+        cities = USCity.objects.filter(
+            Q(zip_codes=location) |
+            Q(zip_codes__startswith=f'{location} ') |
+            Q(zip_codes__endswith=f' {location}') |
+            Q(zip_codes__contains=f' {location} ')
+        )
+    else:
+        city, _, state = (part.strip() for part in location.partition(','))
+        cities = USCity.objects.filter(city__iexact=city)
+        if state:
+            cities = cities.filter(Q(state_id__iexact=state) | Q(state_name__iexact=state))
+
+    point = cities.values_list('latitude', 'longitude').first()
+    if point is None:
+        return None
+    return float(point[0]), float(point[1])
+
+
+# Number of suggestions kept for every prefix
+LOCATION_SUGGESTION_LIMIT = 10
+
+# Minimum query length before suggestions are returned
+LOCATION_QUERY_MIN_LENGTH = 2
+
+# Browser/CDN cache lifetime of the location autocomplete APIs, in seconds
+LOCATION_API_MAX_AGE = 60 * 60
+
+# Cache key holding the current location index version, shared by all processes
+LOCATION_INDEX_VERSION_KEY = 'venues_app:location_index_version'
+
+
+def normalize_location_text(text):
+    """
+    Lowercase text and collapse whitespace for location matching, e.g. "Austin,TX " -> "austin, tx"
+    """
+    return ' '.join((text or '').lower().replace(',', ', ').split())
+
+
+class LocationIndex:
+    """
+    In-memory prefix index over USCity for autocomplete.
+    This is a trie flattened into a dictionary: every prefix of every city name (and of
+    each later word in it), "city, ST", county name, state name, state code and zip code
+    maps to the ranks of its best matching cities, best first. Cities are ranked by the number of
+    active venues linked to them, then by import order, so a lookup is a single dictionary
+    access with no database query.
+    """
+
+    def __init__(self, cities, venue_counts=None, version=None):
+        venue_counts = venue_counts or {}
+        self.version = version
+
+        # Best cities first, so lower ranks are better suggestions
+        self.cities = sorted(cities, key=lambda city: (-venue_counts.get(city['id'], 0), city['id']))
+
+        self.states = sorted({city['state_name'] for city in self.cities})
+        self.counties = defaultdict(set)
+        self.city_names = defaultdict(set)
+
+        ranks_by_key = defaultdict(list)
+        for rank, city in enumerate(self.cities):
+            state = normalize_location_text(city['state_name'])
+            county = normalize_location_text(city['county_name'])
+            self.counties[state].add(city['county_name'])
+            self.city_names[(state, county)].add(city['city'])
+
+            state_id = normalize_location_text(city['state_id'])
+            words = normalize_location_text(city['city']).split()
+            keys = {' '.join(words[i:]) for i in range(len(words))}
+            keys.update((f"{' '.join(words)}, {state_id}", county, state, state_id))
+            keys.update(city['zip_codes'].split())
+
+            for key in keys:
+                ranks = ranks_by_key[key]
+                if len(ranks) < LOCATION_SUGGESTION_LIMIT:
+                    ranks.append(rank)
+
+        # Merge the best ranks of every key into each of its prefixes
+        prefixes = {}
+        for key, ranks in ranks_by_key.items():
+            for length in range(1, len(key) + 1):
+                prefix = key[:length]
+                current = prefixes.get(prefix)
+                if current is None:
+                    prefixes[prefix] = ranks
+                elif len(current) < LOCATION_SUGGESTION_LIMIT or ranks[0] < current[-1]:
+                    prefixes[prefix] = sorted(set(current).union(ranks))[:LOCATION_SUGGESTION_LIMIT]
+        self.prefixes = {prefix: tuple(ranks) for prefix, ranks in prefixes.items()}
+
+    @classmethod
+    def build(cls, version=None):
+        """
+        Load all US cities and venue counts from the database and build the index
+        """
+        cities = USCity.objects.values(
+            'id', 'city', 'state_id', 'state_name', 'county_name', 'zip_codes'
+        ).order_by()
+        venue_counts = dict(
+            Venue.objects.filter(us_city__isnull=False, approval_status='approved', is_active=True)
+            .values_list('us_city_id')
+            .annotate(count=Count('id'))
+            .order_by()
+        )
+        return cls(list(cities), venue_counts, version)
+
+    def suggest(self, query, limit=LOCATION_SUGGESTION_LIMIT):
+        """
+        Get location suggestions for a partially typed query, e.g. "bro", "10001" or "austin, t"
+        Returns a list of suggestion dictionaries
+        """
+        query = normalize_location_text(query)
+        if len(query) < LOCATION_QUERY_MIN_LENGTH:
+            return []
+
+        ranks = self.prefixes.get(query)
+        if ranks is None and ',' in query:
+            # "City, State name": filter the city's suggestions by state
+            name, _, state = (part.strip() for part in query.partition(','))
+            ranks = [
+                rank for rank in self.prefixes.get(name, ())
+                if normalize_location_text(self.cities[rank]['state_name']).startswith(state)
+            ]
+
+        suggestions = []
+        for rank in (ranks or ())[:limit]:
+            city = self.cities[rank]
+            suggestions.append({
+                'id': city['id'],
+                'text': f"{city['city']}, {city['state_id']}",
+                'city': city['city'],
+                'state': city['state_name'],
+                'county': city['county_name'],
+                'state_id': city['state_id'],
+            })
+        return suggestions
+
+    def get_states(self):
+        """Get the sorted list of state names"""
+        return list(self.states)
+
+    def get_counties(self, state=None):
+        """Get the sorted list of county names, optionally within a state"""
+        if state:
+            return sorted(self.counties.get(normalize_location_text(state), ()))
+        return sorted(set().union(*self.counties.values()))
+
+    def get_cities(self, state=None, county=None):
+        """Get the sorted list of city names, optionally within a state and county"""
+        state = normalize_location_text(state)
+        county = normalize_location_text(county)
+        cities = set()
+        for (city_state, city_county), names in self.city_names.items():
+            if (not state or city_state == state) and (not county or city_county == county):
+                cities.update(names)
+        return sorted(cities)
+
+
+_location_index = None
+_location_index_lock = threading.Lock()
+
+
+def get_location_index():
+    """
+    Get this process's location index, building it on first use or after it was invalidated
+    Returns a LocationIndex
+    """
+    global _location_index
+
+    version = cache.get(LOCATION_INDEX_VERSION_KEY)
+    index = _location_index
+    if index is not None and (version is None or index.version == version):
+        return index
+
+    with _location_index_lock:
+        index = _location_index
+        if index is None or (version is not None and index.version != version):
+            index = _location_index = LocationIndex.build(version)
+    return index
+
+
+def invalidate_location_index():
+    """
+    Discard the location index in this process and, through the shared cache, in all others
+    """
+    global _location_index
+
+    cache.set(LOCATION_INDEX_VERSION_KEY, uuid.uuid4().hex, None)
+    _location_index = None
@@ -1,11 +1,13 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.db.models import Q, Avg, Count
+from django.db.models import Q
 from django.core.paginator import Paginator
 from django.http import JsonResponse
+from django.views.decorators.cache import cache_control
 
 from .models import Venue, Service, Category, Review, OpeningHours, TeamMember, USCity
+from .utils import filter_within_radius, resolve_location_point, LOCATION_API_MAX_AGE
 from .forms import VenueSearchForm, VenueFilterForm, ReviewForm, VenueForm, ServiceForm, VenueImageForm, OpeningHoursForm, FAQForm, TeamMemberForm
 
 
@@ -16,29 +18,24 @@ def home_view(request):
     # Get featured categories
     categories = Category.objects.filter(is_active=True)[:6]
 
-    # Get top rated venues using review_app reviews
+    # Get top rated venues using the stored rating aggregates
     top_venues = Venue.objects.filter(
         approval_status='approved',
         is_active=True
-    ).annotate(
-        avg_rating=Avg('review_app_reviews__rating'),
-        review_count=Count('review_app_reviews')
-    ).order_by('-avg_rating')[:4]
+    ).with_card_data().order_by('-rating_avg', 'name')[:4]
 
-    # Get trending venues (most reviewed) using review_app reviews
+    # Get trending venues (most reviewed) using the stored rating aggregates
     trending_venues = Venue.objects.filter(
         approval_status='approved',
         is_active=True
-    ).annotate(
-        review_count=Count('review_app_reviews')
-    ).order_by('-review_count')[:4]
+    ).with_card_data().order_by('-rating_count', 'name')[:4]
 
     # Get venues with discounts
     discounted_venues = Venue.objects.filter(
         approval_status='approved',
         is_active=True,
         services__discounted_price__isnull=False
-    ).distinct()[:4]
+    ).distinct().with_card_data()[:4]
 
     # Search form
     search_form = VenueSearchForm()
@@ -64,27 +61,35 @@ def venue_list_view(request):
     venues = Venue.objects.filter(
         approval_status='approved',
         is_active=True
-    ).annotate(
-        avg_rating=Avg('review_app_reviews__rating'),
-        review_count=Count('review_app_reviews')
-    ).order_by('-avg_rating', 'name')  # Default to highest rated venues first
+    ).order_by('-rating_avg', 'name')  # Default to highest rated venues first
 
     # Process search form
     search_form = VenueSearchForm(request.GET or None)
+    search_point = None
     if search_form.is_valid():
         query = search_form.cleaned_data.get('query')
         location = search_form.cleaned_data.get('location')
         category = search_form.cleaned_data.get('category')
+        radius = search_form.cleaned_data.get('radius')
+        latitude = search_form.cleaned_data.get('latitude')
+        longitude = search_form.cleaned_data.get('longitude')
 
         if query:
-            venues = venues.filter(
-                Q(name__icontains=query) |
-                Q(tags__name__icontains=query) |
-                Q(services__title__icontains=query) |
-                Q(category__name__icontains=query)
-            ).distinct()
-
-        if location:
+            # Ranked full-text search over the venue search index
+            from search_app.utils import search_venues
+            venues = search_venues(query, venues)
+
+        if radius:
+            # Proximity search around the user's position or the given zip code/city
+            if latitude is not None and longitude is not None:
+                search_point = (latitude, longitude)
+            else:
+                search_point = resolve_location_point(location)
+
+        if search_point:
+            venues = filter_within_radius(venues, search_point[0], search_point[1], radius)
+
+        elif location:
             # Try to find matching US cities first
             city_matches = USCity.objects.filter(
                 Q(city__icontains=location) |
@@ -118,6 +123,7 @@ def venue_list_view(request):
         sort_by = filter_form.cleaned_data.get('sort_by')
         venue_type = filter_form.cleaned_data.get('venue_type')
         has_discount = filter_form.cleaned_data.get('has_discount')
+        min_rating = filter_form.cleaned_data.get('min_rating')
         state = filter_form.cleaned_data.get('state')
         county = filter_form.cleaned_data.get('county')
         city = filter_form.cleaned_data.get('city')
@@ -128,6 +134,9 @@ def venue_list_view(request):
         if has_discount:
             venues = venues.filter(services__discounted_price__isnull=False).distinct()
 
+        if min_rating:
+            venues = venues.filter(rating_avg__gte=min_rating)
+
         # Apply location filters
         if state:
             venues = venues.filter(Q(state__iexact=state) | Q(us_city__state_name__iexact=state))
@@ -140,9 +149,9 @@ def venue_list_view(request):
 
         if sort_by:
             if sort_by == 'rating_high':
-                venues = venues.order_by('-avg_rating', 'name')
+                venues = venues.order_by('-rating_avg', 'name')
             elif sort_by == 'rating_low':
-                venues = venues.order_by('avg_rating', 'name')
+                venues = venues.order_by('rating_avg', 'name')
             elif sort_by == 'price_high':
                 venues = venues.order_by('-services__price', 'name').distinct()
             elif sort_by == 'price_low':
@@ -157,8 +166,8 @@ def venue_list_view(request):
                     where=['venues_app_venue.id = services_service.venue_id'],
                 ).order_by('-discount_pct', 'name')
 
-    # Ensure distinct results
-    venues = venues.distinct()
+    # Ensure distinct results, with the card data of each venue loaded in the same query
+    venues = venues.distinct().with_card_data()
 
     # Pagination
     paginator = Paginator(venues, 12)  # Show 12 venues per page
@@ -174,6 +183,7 @@ def venue_list_view(request):
         'search_form': search_form,
         'filter_form': filter_form,
         'categories': categories,
+        'search_point': search_point,
     }
 
     return render(request, 'venues_app/venue_list.html', context)
@@ -186,8 +196,12 @@ def venue_detail_view(request, slug):
     # Get the venue
     venue = get_object_or_404(Venue, slug=slug, approval_status='approved', is_active=True)
 
-    # Get venue services
-    services = venue.services.filter(is_active=True)
+    # Get venue services with their discounted prices resolved in one batch
+    from discount_app.utils import apply_effective_prices
+    services = list(venue.services.filter(is_active=True))
+    for service in services:
+        service.venue = venue
+    apply_effective_prices(services)
 
     # Get venue opening hours
     opening_hours = venue.opening_hours.all().order_by('day')
@@ -685,10 +699,7 @@ def admin_venue_list_view(request):
         return redirect('accounts_app:home')
 
     # Get all venues
-    venues = Venue.objects.all().annotate(
-        avg_rating=Avg('review_app_reviews__rating'),
-        review_count=Count('review_app_reviews')
-    ).order_by('name')  # Add default ordering to avoid UnorderedObjectListWarning
+    venues = Venue.objects.all().order_by('name')  # Add default ordering to avoid UnorderedObjectListWarning
 
     # Filter by approval status if provided
     status_filter = request.GET.get('status')
@@ -792,6 +803,7 @@ def admin_venue_approval_view(request, slug):
 
 
 # API Views
+@cache_control(public=True, max_age=LOCATION_API_MAX_AGE)
 def location_suggestions_api(request):
     """API endpoint for location autocomplete suggestions"""
     query = request.GET.get('query', '')
@@ -800,6 +812,7 @@ def location_suggestions_api(request):
     return JsonResponse({'suggestions': suggestions})
 
 
+@cache_control(public=True, max_age=LOCATION_API_MAX_AGE)
 def get_location_data_api(request):
     """API endpoint for getting location data (states, counties, cities)"""
     state = request.GET.get('state', '')